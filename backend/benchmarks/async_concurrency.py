@@ -0,0 +1,79 @@
+"""
+Compare the throughput of the sync DRF read endpoints with their native async
+versions under many concurrent connections, through Django's ASGI handler.
+
+    python -m benchmarks.async_concurrency --concurrency 200 --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import percentile, seed, setup_django, test_database
+
+
+def endpoints(now):
+    from datetime import timedelta
+
+    start_date = (now - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    end_date = (now + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    window = f"?start_date={start_date}&end_date={end_date}"
+    return [
+        ("recipes", "/api/recipe/", "/api/async/recipe/"),
+        ("schedule", f"/api/schedule/{window}", f"/api/async/schedule/{window}"),
+        ("items", f"/api/item/{window}", f"/api/async/item/{window}"),
+    ]
+
+
+async def run(url, headers, concurrency, requests):
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one_request():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, (url, response.content)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests/s": round(requests / elapsed, 1),
+        "p50 ms": round(percentile(latencies, 50), 2),
+        "p99 ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--recipes", type=int, default=30, help="per user")
+    options = parser.parse_args()
+
+    setup_django()
+    from django.utils.timezone import now
+
+    with test_database():
+        token = seed(users=5, recipes=options.recipes)[0]
+        headers = {"Authorization": f"Token {token.key}"}
+
+        print(
+            f"{options.requests} requests, {options.concurrency} concurrent "
+            "connections"
+        )
+        for label, sync_url, async_url in endpoints(now()):
+            for kind, url in (("sync", sync_url), ("async", async_url)):
+                result = asyncio.run(
+                    run(url, headers, options.concurrency, options.requests)
+                )
+                print(f"{label:>10} {kind:>5}: {result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Benchmarks run from the `backend` directory, e.g.
+`python -m benchmarks.explain_queries`, with the same environment as
+`manage.py` (SECRET_KEY, DATABASE_URL, ...). They never touch the configured
+database: everything happens in a throwaway test database.
+"""
+
+import os
+import statistics
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def setup_django():
+    sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "manzapi.settings")
+
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """Create and migrate a test database, and drop it on exit."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def seed(users=20, recipes=30, days=60, **options):
+    """
+    Load a reproducible dataset with the seed_data command and return the
+    tokens of the created users. `recipes` are per user, and every user has
+    two meals a day over `days` days.
+    """
+    from django.core.management import call_command
+    from django.db import connection
+    from rest_framework.authtoken.models import Token
+
+    call_command(
+        "seed_data", users=users, recipes=recipes, days=days, verbosity=0, **options
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    return list(Token.objects.order_by("user_id"))
+
+
+def percentile(values, percent):
+    values = sorted(values)
+    index = min(len(values) - 1, round(percent / 100 * (len(values) - 1)))
+    return values[index]
+
+
+def median(values):
+    return statistics.median(values)
@@ -0,0 +1,138 @@
+"""
+Print the query plans and timings of each manz endpoint on a seeded database,
+first without the indexes of migration 0004, then with them.
+
+    python -m benchmarks.explain_queries --users 50 --days 200
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.common import median, seed, setup_django, test_database
+
+
+def indexes_of_0004():
+    """(model, index) pairs of the indexes added by migration 0004."""
+    from django.contrib.auth import get_user_model
+    from django.db import models
+
+    from manz.models import Meal, Recipe
+
+    def index(model, name):
+        return next(index for index in model._meta.indexes if index.name == name)
+
+    return [
+        (Meal, index(Meal, "manz_meal_user_start")),
+        (Recipe, index(Recipe, "manz_recipe_user_created")),
+        # In the database only, see the migration.
+        (get_user_model(), models.Index(fields=["email"], name="manz_user_email")),
+    ]
+
+
+def endpoints(now):
+    from datetime import timedelta
+
+    start_date = (now - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    end_date = (now + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    recipe = {
+        "title": "Benchmark soup",
+        "recipe_items": [
+            {"item": {"name": f"item {n}", "quantity_type": "g"}, "quantity": 1}
+            for n in range(10)
+        ],
+    }
+    return [
+        ("login", "post", "/api/login/", {"email": "user0@example.com"}),
+        ("recipe list", "get", "/api/recipe/", None),
+        ("recipe page", "get", "/api/recipe/?page_size=20", None),
+        (
+            "schedule",
+            "get",
+            f"/api/schedule/?start_date={start_date}&end_date={end_date}",
+            None,
+        ),
+        (
+            "calendar",
+            "get",
+            f"/api/calendar/?start_date={start_date}&end_date={end_date}",
+            None,
+        ),
+        ("shopping list", "get", f"/api/item/?end_date={end_date}", None),
+        ("recipe create", "post", "/api/recipe/", recipe),
+    ]
+
+
+def explain(sql):
+    from django.db import connection
+
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        return [" ".join(str(column) for column in row) for row in cursor.fetchall()]
+
+
+def measure(client, token, runs):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils.timezone import now
+
+    headers = {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+    for label, method, url, data in endpoints(now()):
+        if label == "login":
+            data = dict(data, password="benchmark")
+        kwargs = {"content_type": "application/json"} if data else {}
+        if data:
+            kwargs["data"] = json.dumps(data)
+
+        timings = []
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = getattr(client, method)(url, **kwargs, **headers)
+                timings.append((time.perf_counter() - started) * 1000)
+            assert response.status_code < 400, (label, response.content)
+
+        print(f"\n## {label}: median {median(timings):.2f} ms over {runs} runs")
+        for query in context.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            print(f"  {sql[:160]}")
+            for line in explain(sql):
+                print(f"    -> {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--recipes", type=int, default=30, help="per user")
+    parser.add_argument("--days", type=int, default=60, help="of meals")
+    parser.add_argument("--runs", type=int, default=20)
+    options = parser.parse_args()
+
+    setup_django()
+    from django.db import connection
+    from django.test import Client
+
+    with test_database():
+        tokens = seed(users=options.users, recipes=options.recipes, days=options.days)
+        client = Client()
+
+        # Dropped and created again rather than migrating backwards, which
+        # would also drop the tables of the later migrations.
+        with connection.schema_editor() as schema_editor:
+            for model, index in indexes_of_0004():
+                schema_editor.remove_index(model, index)
+        print("# Without indexes")
+        measure(client, tokens[0], options.runs)
+
+        with connection.schema_editor() as schema_editor:
+            for model, index in indexes_of_0004():
+                schema_editor.add_index(model, index)
+        print("\n# With indexes")
+        measure(client, tokens[0], options.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Compare the encoding time of DRF's JSONRenderer with FastJSONRenderer, and
+the bytes on the wire without compression, with gzip and with brotli, for a
+large recipe list.
+
+    python -m benchmarks.json_compression --recipes 2000 --repeat 20
+"""
+
+import argparse
+import gzip
+import json
+import time
+
+from benchmarks.common import median, seed, setup_django, test_database
+
+
+def timed(function, data, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(data)
+        durations.append((time.perf_counter() - started) * 1000)
+    return result, round(median(durations), 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=2000, help="per user")
+    parser.add_argument("--repeat", type=int, default=20)
+    options = parser.parse_args()
+
+    setup_django()
+    from django.test import Client
+    from rest_framework.renderers import JSONRenderer
+
+    from manz import renderers
+    from manz.middleware import BROTLI_QUALITY, brotli
+
+    with test_database():
+        token = seed(users=1, recipes=options.recipes, days=1)[0]
+        response = Client().get("/api/recipe/", HTTP_AUTHORIZATION=f"Token {token.key}")
+        data = response.data
+
+        drf, drf_ms = timed(JSONRenderer().render, data, options.repeat)
+        fast, fast_ms = timed(renderers.FastJSONRenderer().render, data, options.repeat)
+        assert drf == fast
+        results = {
+            "recipes": len(data),
+            "orjson": renderers.orjson is not None,
+            "encode_ms": {"drf": drf_ms, "fast": fast_ms},
+            "bytes": {"raw": len(fast)},
+            "compress_ms": {},
+        }
+
+        compressors = {"gzip": lambda content: gzip.compress(content, 6)}
+        if brotli is not None:
+            compressors["br"] = lambda content: brotli.compress(
+                content, quality=BROTLI_QUALITY
+            )
+        for name, compress in compressors.items():
+            compressed, compress_ms = timed(compress, fast, options.repeat)
+            results["bytes"][name] = len(compressed)
+            results["compress_ms"][name] = compress_ms
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Compare building the recipe and schedule lists with the DRF serializers and
+with the `.values()` projections of manz.projections, queries included.
+
+    python -m benchmarks.list_projections --recipes 2000 --days 365
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.common import median, seed, setup_django, test_database
+
+
+def timed(function, repeat):
+    durations = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        durations.append((time.perf_counter() - started) * 1000)
+    return result, round(median(durations), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=2000, help="per user")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--repeat", type=int, default=10)
+    options = parser.parse_args()
+
+    setup_django()
+    from django.contrib.auth.models import User
+    from django.db.models import Max, Min
+    from rest_framework.renderers import JSONRenderer
+
+    from manz import projections
+    from manz.models import Meal, Recipe
+    from manz.recurrence import expand, merge_meals, rules_in_window
+    from manz.serializers import MealSerializer, RecipeSerializer
+
+    with test_database():
+        seed(users=1, recipes=options.recipes, days=options.days)
+        user = User.objects.get()
+        recipes = Recipe.objects.filter(user=user)
+        window = Meal.objects.filter(user=user).aggregate(
+            start_date=Min("start_date"), end_date=Max("end_date")
+        )
+        meals = Meal.objects.filter(
+            user=user,
+            start_date__gte=window["start_date"],
+            start_date__lt=window["end_date"],
+        )
+
+        def schedule():
+            rules = rules_in_window(user, window["start_date"], window["end_date"])
+            return expand(rules, window["start_date"], window["end_date"])
+
+        cases = {
+            "recipes": (
+                lambda: RecipeSerializer(recipes.with_items(), many=True).data,
+                lambda: projections.recipe_list(recipes),
+            ),
+            "schedule": (
+                lambda: MealSerializer(merge_meals(meals, schedule()), many=True).data,
+                lambda: projections.meal_list(meals, schedule()),
+            ),
+        }
+        results = {}
+        for name, (serializer, projection) in cases.items():
+            serialized, serializer_ms = timed(serializer, options.repeat)
+            projected, projection_ms = timed(projection, options.repeat)
+            renderer = JSONRenderer()
+            assert renderer.render(serialized) == renderer.render(projected)
+            results[name] = {
+                "rows": len(projected),
+                "serializer_ms": serializer_ms,
+                "projection_ms": projection_ms,
+                "speedup": round(serializer_ms / projection_ms, 1),
+            }
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
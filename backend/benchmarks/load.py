@@ -0,0 +1,258 @@
+"""
+Load test every manz endpoint and report latency percentiles, throughput and
+queries per request as JSON.
+
+In-process, against a seeded throwaway database through Django's ASGI handler:
+
+    python -m benchmarks.load --concurrency 50 --requests 1000 --users 50
+
+Or against a running server (gunicorn + uvicorn workers, `runserver`, ...),
+logging in as an existing user, e.g. one created by `manage.py seed_data`:
+
+    python -m benchmarks.load --url http://localhost:8000 \
+        --email user0@example.com --password benchmark --output results.json
+
+Queries per request are only measured in-process, where the database
+connection can be observed, both with a cold and a warm cache.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import percentile, seed, setup_django, test_database
+
+SCENARIOS = [
+    "login",
+    "recipe list",
+    "recipe create",
+    "schedule list",
+    "schedule create",
+    "shopping list",
+]
+
+
+def scenarios(email, password, recipe_id, now):
+    """Return (name, method, path, body) for each scenario."""
+    start_date = (now - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    end_date = (now + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    recipe = {
+        "title": "Load test soup",
+        "description": "",
+        "recipe_items": [
+            {"item": {"name": f"item {n}", "quantity_type": "g"}, "quantity": 1}
+            for n in range(5)
+        ],
+    }
+    meal = {"recipe_id": recipe_id, "start_date": start_date, "end_date": end_date}
+    return [
+        ("login", "post", "/api/login/", {"email": email, "password": password}),
+        ("recipe list", "get", "/api/recipe/", None),
+        ("recipe create", "post", "/api/recipe/", recipe),
+        (
+            "schedule list",
+            "get",
+            f"/api/schedule/?start_date={start_date}&end_date={end_date}",
+            None,
+        ),
+        ("schedule create", "post", "/api/schedule/", meal),
+        ("shopping list", "get", f"/api/item/?end_date={end_date}", None),
+    ]
+
+
+class InProcessTarget:
+    """Send requests through Django's ASGI handler, without any network."""
+
+    def __init__(self):
+        from django.test import AsyncClient
+
+        self.client = AsyncClient()
+
+    async def request(self, method, path, body, token=None):
+        headers = {"Authorization": f"Token {token}"} if token else {}
+        kwargs = {}
+        if body is not None:
+            kwargs = {"data": json.dumps(body), "content_type": "application/json"}
+        response = await getattr(self.client, method)(path, headers=headers, **kwargs)
+        return response.status_code, response.content
+
+
+class HttpTarget:
+    """Send requests to a running server, one blocking connection per thread."""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def _request(self, method, path, body, token):
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Token {token}"
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(body).encode() if body is not None else None,
+            headers=headers,
+            method=method.upper(),
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as error:
+            return error.code, error.read()
+
+    async def request(self, method, path, body, token=None):
+        return await asyncio.to_thread(self._request, method, path, body, token)
+
+
+async def login(target, email, password):
+    status_code, content = await target.request(
+        "post", "/api/login/", {"email": email, "password": password}
+    )
+    if status_code != 200:
+        sys.exit(f"Could not log in as {email}: {status_code} {content[:200]}")
+    return json.loads(content)["token"]
+
+
+async def benchmark_recipe(target, token):
+    """Return the id of a recipe the benchmarked user can schedule."""
+    status_code, content = await target.request(
+        "get", "/api/recipe/?page_size=1", None, token
+    )
+    results = json.loads(content)["results"] if status_code == 200 else []
+    if results:
+        return results[0]["id"]
+
+    recipe = {"title": "Load test recipe", "description": "", "recipe_items": []}
+    status_code, content = await target.request("post", "/api/recipe/", recipe, token)
+    return json.loads(content)["id"]
+
+
+async def load(target, scenario, token, concurrency, requests):
+    _, method, path, body = scenario
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one_request():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            status_code, _ = await target.request(method, path, body, token)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "requests": requests,
+        "errors": errors,
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+def queries_per_request(scenario, token, samples):
+    """
+    Average number of SQL queries of a scenario, run sequentially: "cold"
+    with the cache (tokens, shopping lists, ETags) cleared before each
+    request, "warm" right after the same request.
+    """
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    _, method, path, body = scenario
+    client = Client(headers={"Authorization": f"Token {token}"})
+    kwargs = {}
+    if body is not None:
+        kwargs = {"data": json.dumps(body), "content_type": "application/json"}
+
+    counts = {"cold": 0, "warm": 0}
+    for _ in range(samples):
+        for state in counts:
+            if state == "cold":
+                cache.clear()
+            else:
+                getattr(client, method)(path, **kwargs)
+            with CaptureQueriesContext(connection) as context:
+                getattr(client, method)(path, **kwargs)
+            counts[state] += len(context.captured_queries)
+    return {state: round(count / samples, 2) for state, count in counts.items()}
+
+
+async def run(target, options, in_process):
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=options.concurrency))
+
+    token = await login(target, options.email, options.password)
+    recipe_id = await benchmark_recipe(target, token)
+    now = datetime.now(timezone.utc)
+
+    results = {}
+    for scenario in scenarios(options.email, options.password, recipe_id, now):
+        name = scenario[0]
+        if options.only and name not in options.only:
+            continue
+        results[name] = await load(
+            target, scenario, token, options.concurrency, options.requests
+        )
+        if in_process:
+            results[name]["queries_per_request"] = await asyncio.to_thread(
+                queries_per_request, scenario, token, options.query_samples
+            )
+        print(f"{name:>16}: {results[name]}", file=sys.stderr)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="benchmark a running server instead")
+    parser.add_argument("--email", default="user0@example.com")
+    parser.add_argument("--password", default="benchmark")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500, help="per endpoint")
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS, metavar="SCENARIO")
+    parser.add_argument("--query-samples", type=int, default=5)
+    parser.add_argument("--users", type=int, default=20, help="in-process only")
+    parser.add_argument("--recipes", type=int, default=30, help="per user")
+    parser.add_argument("--days", type=int, default=60, help="of meals")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    options = parser.parse_args()
+
+    report = {
+        "target": options.url or "in-process",
+        "concurrency": options.concurrency,
+        "requests_per_endpoint": options.requests,
+    }
+    if options.url:
+        report["endpoints"] = asyncio.run(run(HttpTarget(options.url), options, False))
+    else:
+        setup_django()
+        with test_database():
+            seed(users=options.users, recipes=options.recipes, days=options.days)
+            report["dataset"] = {
+                "users": options.users,
+                "recipes_per_user": options.recipes,
+                "days_of_meals": options.days,
+            }
+            report["endpoints"] = asyncio.run(run(InProcessTarget(), options, True))
+
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ManzConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "manz"
+
+    def ready(self):
+        from . import signals  # noqa: F401
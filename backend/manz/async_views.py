@@ -0,0 +1,94 @@
+"""
+Native async versions of the read endpoints.
+
+They run on the event loop under ASGI instead of being handed to a thread one
+at a time, and only leave it for the database through Django's async ORM.
+"""
+
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_GET
+
+from . import projections
+from .authentication import async_token_required
+from .models import Meal, Recipe
+from .recurrence import TooManyOccurrences, expand, rules_in_window
+from .renderers import FastJsonResponse
+from .serializers import FetchUserRecipeItemsSerializer
+from .shopping_list import aget_cached_shopping_list
+
+INVALID_DATE_ERROR = (
+    "Invalid date format. Use ISO 8601 format (e.g., '2025-01-01T00:00:00Z')."
+)
+
+
+async def health_check(request):
+    return FastJsonResponse({"status": "ok"}, status=200)
+
+
+@require_GET
+@async_token_required
+async def recipe_list(request):
+    recipes = Recipe.objects.filter(user=request.user)
+    return FastJsonResponse(await projections.arecipe_list(recipes), safe=False)
+
+
+@require_GET
+@async_token_required
+async def schedule_list(request):
+    start_date_param = request.GET.get("start_date")
+    end_date_param = request.GET.get("end_date")
+
+    if not start_date_param or not end_date_param:
+        return FastJsonResponse(
+            {
+                "error": "Both 'start_date' and 'end_date' query parameters are required."
+            },
+            status=400,
+        )
+
+    try:
+        start_date = parse_datetime(start_date_param)
+        end_date = parse_datetime(end_date_param)
+    except (ValueError, TypeError):
+        return FastJsonResponse({"error": INVALID_DATE_ERROR}, status=400)
+    # parse_datetime() returns None for what does not look like a date.
+    if start_date is None or end_date is None:
+        return FastJsonResponse({"error": INVALID_DATE_ERROR}, status=400)
+
+    meals = Meal.objects.filter(
+        user=request.user, start_date__gte=start_date, start_date__lt=end_date
+    )
+    rules = rules_in_window(request.user, start_date, end_date)
+    try:
+        occurrences = expand([rule async for rule in rules], start_date, end_date)
+    except TooManyOccurrences as error:
+        return FastJsonResponse({"detail": error.detail}, status=error.status_code)
+    return FastJsonResponse(
+        await projections.ameal_list(meals, occurrences), safe=False
+    )
+
+
+@require_GET
+@async_token_required
+async def item_list(request):
+    data = {
+        "end_date": request.GET.get("end_date"),
+        "breakdown": request.GET.get("breakdown", False),
+    }
+    if request.GET.get("start_date"):
+        data["start_date"] = request.GET["start_date"]
+
+    serializer = FetchUserRecipeItemsSerializer(data=data, context={"request": request})
+    if not serializer.is_valid():
+        return FastJsonResponse(serializer.errors, status=400)
+
+    try:
+        shopping_list = await aget_cached_shopping_list(
+            request.user,
+            serializer.validated_data["end_date"],
+            start_date=serializer.validated_data.get("start_date"),
+            breakdown=serializer.validated_data["breakdown"],
+        )
+    except TooManyOccurrences as error:
+        return FastJsonResponse({"detail": error.detail}, status=error.status_code)
+    return FastJsonResponse(shopping_list, safe=False)
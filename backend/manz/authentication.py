@@ -0,0 +1,107 @@
+import functools
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def token_cache_key(key):
+    return f"manz:token:{key}"
+
+
+class CacheStats:
+    """
+    Hit and miss counters of a cache, local to the current process.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+        }
+
+
+token_cache_stats = CacheStats()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication keeping the token and its user in Django's cache, so
+    most requests are authenticated without querying the database.
+
+    Entries expire after MANZ_TOKEN_CACHE_TTL seconds and are removed as soon
+    as the token is deleted or its user is saved, see manz.signals.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+
+        if token is None:
+            token_cache_stats.miss()
+            user, token = super().authenticate_credentials(key)
+            cache.set(cache_key, token, settings.MANZ_TOKEN_CACHE_TTL)
+        else:
+            token_cache_stats.hit()
+
+        return (token.user, token)
+
+
+async def aauthenticate_token(request):
+    """
+    Async counterpart of CachedTokenAuthentication for Django's async views,
+    sharing its cache entries. Return the token's user, or None.
+    """
+    auth = request.headers.get("Authorization", "").split()
+    if len(auth) != 2 or auth[0].lower() != "token":
+        return None
+
+    cache_key = token_cache_key(auth[1])
+    token = await cache.aget(cache_key)
+    if token is None:
+        token_cache_stats.miss()
+        token = await Token.objects.select_related("user").filter(key=auth[1]).afirst()
+        if token is None or not token.user.is_active:
+            return None
+        await cache.aset(cache_key, token, settings.MANZ_TOKEN_CACHE_TTL)
+    else:
+        token_cache_stats.hit()
+
+    return token.user
+
+
+def async_token_required(view):
+    """
+    Authenticate an async view with aauthenticate_token(), answering 401 like
+    DRF when the token is missing or invalid.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aauthenticate_token(request)
+        if user is None:
+            response = JsonResponse({"detail": "Invalid token."}, status=401)
+            response.headers["WWW-Authenticate"] = "Token"
+            return response
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,44 @@
+import functools
+import hashlib
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+
+from .versioning import get_user_version
+
+
+def user_data_etag(request):
+    """
+    ETag of a read of the user's data: it changes with the user's data
+    version (see manz.versioning) and with the query string.
+    """
+    version = get_user_version(request.user.id)
+    validator = f"{version}:{request.get_full_path()}"
+    return f'"{hashlib.sha1(validator.encode()).hexdigest()}"'
+
+
+def conditional_user_get(get):
+    """
+    Decorate the `get` handler of an authenticated APIView to answer
+    `If-None-Match` with 304 Not Modified, without running the handler,
+    while the user's data is unchanged.
+    """
+
+    @functools.wraps(get)
+    def wrapper(view, request, *args, **kwargs):
+        etag = user_data_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = get(view, request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            # Let clients keep the body but revalidate it on every use.
+            patch_cache_control(response, private=True, no_cache=True)
+            patch_vary_headers(response, ["Authorization"])
+        return response
+
+    return wrapper
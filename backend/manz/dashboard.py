@@ -0,0 +1,32 @@
+from .models import Meal, Recipe
+from .recurrence import expand, merge_meals, rules_in_window
+from .serializers import MealSerializer, RecipeSerializer
+from .shopping_list import shopping_list_of_meals
+
+
+def get_dashboard(user, start_date, end_date):
+    """
+    Return the user's recipes, the meals starting in [start_date, end_date)
+    and their shopping list, in the shapes of the recipe, schedule and item
+    endpoints.
+
+    Recipes and their ingredients are loaded once and shared by the meals,
+    whose shopping list is summed from them in memory: four queries whatever
+    the number of recipes and meals.
+    """
+    recipes = list(Recipe.objects.filter(user=user).with_items())
+    recipes_by_id = {recipe.id: recipe for recipe in recipes}
+
+    meals = Meal.objects.filter(
+        user=user, start_date__gte=start_date, start_date__lt=end_date
+    )
+    rules = rules_in_window(user, start_date, end_date)
+    meals = merge_meals(meals, expand(rules, start_date, end_date))
+    for meal in meals:
+        meal.recipe = recipes_by_id[meal.recipe_id]
+
+    return {
+        "recipes": RecipeSerializer(recipes, many=True).data,
+        "schedule": MealSerializer(meals, many=True).data,
+        "shopping_list": shopping_list_of_meals(meals),
+    }
@@ -0,0 +1,290 @@
+"""
+Streamed exports of a user's data as NDJSON or CSV.
+
+Rows are read with chunked `.iterator()` queries and written as they come,
+so memory stays flat whatever the size of the account. Under ASGI the `a`
+versions read them with `.aiterator()` instead: a sync generator would be
+consumed whole in a thread before the first byte is sent.
+
+Occurrences of recurring meals are expanded by the view before the response
+starts, so a window holding too many of them answers a 400 rather than a
+stream cut short.
+"""
+
+import csv
+import heapq
+import json
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Meal, Recipe
+from .recurrence import meal_order, merge_shopping_list_rows
+from .shopping_list import shopping_list_entries, shopping_list_rows
+
+CHUNK_SIZE = 2000
+
+
+def _recipe_rows(user):
+    return (
+        Recipe.objects.filter(user=user)
+        .order_by("id", "recipe_items__id")
+        .values(
+            "id",
+            "title",
+            "description",
+            "recipe_items__quantity",
+            "recipe_items__item_id",
+            "recipe_items__item__name",
+            "recipe_items__item__image_url",
+            "recipe_items__item__quantity_type",
+        )
+    )
+
+
+def _recipe(rows):
+    return {
+        "id": rows[0]["id"],
+        "title": rows[0]["title"],
+        "description": rows[0]["description"],
+        "recipe_items": [
+            {
+                "item": {
+                    "id": row["recipe_items__item_id"],
+                    "name": row["recipe_items__item__name"],
+                    "image_url": row["recipe_items__item__image_url"],
+                    "quantity_type": row["recipe_items__item__quantity_type"],
+                },
+                "quantity": row["recipe_items__quantity"],
+            }
+            for row in rows
+            if row["recipe_items__item_id"] is not None
+        ],
+    }
+
+
+def recipes(user):
+    """Yield each recipe with its ingredients, shaped like RecipeSerializer."""
+    rows = _recipe_rows(user).iterator(chunk_size=CHUNK_SIZE)
+    for _, recipe_rows in groupby(rows, key=itemgetter("id")):
+        yield _recipe(list(recipe_rows))
+
+
+async def arecipes(user):
+    recipe_rows = []
+    async for row in _recipe_rows(user).aiterator(chunk_size=CHUNK_SIZE):
+        if recipe_rows and row["id"] != recipe_rows[0]["id"]:
+            yield _recipe(recipe_rows)
+            recipe_rows = []
+        recipe_rows.append(row)
+    if recipe_rows:
+        yield _recipe(recipe_rows)
+
+
+RECIPE_CSV_HEADER = [
+    "recipe_id",
+    "title",
+    "description",
+    "item_name",
+    "quantity",
+    "quantity_type",
+]
+
+
+def _recipe_csv_row(row):
+    return [
+        row["id"],
+        row["title"],
+        row["description"],
+        row["recipe_items__item__name"],
+        row["recipe_items__quantity"],
+        row["recipe_items__item__quantity_type"],
+    ]
+
+
+def recipe_csv_rows(user):
+    """Yield one row per recipe ingredient, or per recipe without any."""
+    yield RECIPE_CSV_HEADER
+    for row in _recipe_rows(user).iterator(chunk_size=CHUNK_SIZE):
+        yield _recipe_csv_row(row)
+
+
+async def arecipe_csv_rows(user):
+    yield RECIPE_CSV_HEADER
+    async for row in _recipe_rows(user).aiterator(chunk_size=CHUNK_SIZE):
+        yield _recipe_csv_row(row)
+
+
+def _meal_rows(user, start_date=None, end_date=None):
+    meals = Meal.objects.filter(user=user)
+    if start_date is not None:
+        meals = meals.filter(start_date__gte=start_date)
+    if end_date is not None:
+        meals = meals.filter(start_date__lt=end_date)
+    return meals.order_by("start_date", "id").values(
+        "id", "start_date", "end_date", "recipe_id", "recipe__title"
+    )
+
+
+def _meal(row):
+    return {
+        "id": row["id"],
+        "start_date": row["start_date"],
+        "end_date": row["end_date"],
+        "recipe_id": row["recipe_id"],
+        "recipe_title": row["recipe__title"],
+        "recurring_meal_id": None,
+    }
+
+
+def _occurrences(occurrences):
+    return [
+        {
+            "id": None,
+            "start_date": meal.start_date,
+            "end_date": meal.end_date,
+            "recipe_id": meal.recipe_id,
+            "recipe_title": meal.recipe.title,
+            "recurring_meal_id": meal.recurring_meal_id,
+        }
+        for meal in sorted(occurrences, key=meal_order)
+    ]
+
+
+def _meal_order(meal):
+    # manz.recurrence.meal_order() of the dicts.
+    return (
+        meal["start_date"],
+        meal["id"] is None,
+        meal["id"] or meal["recurring_meal_id"],
+    )
+
+
+def meals(user, occurrences=(), start_date=None, end_date=None):
+    """
+    Yield each meal starting in the window in start date order, with the
+    title of its recipe, merged with the `occurrences` of recurring meals
+    like the schedule.
+    """
+    rows = _meal_rows(user, start_date, end_date).iterator(chunk_size=CHUNK_SIZE)
+    yield from heapq.merge(map(_meal, rows), _occurrences(occurrences), key=_meal_order)
+
+
+async def ameals(user, occurrences=(), start_date=None, end_date=None):
+    pending = deque(_occurrences(occurrences))
+    rows = _meal_rows(user, start_date, end_date).aiterator(chunk_size=CHUNK_SIZE)
+    async for row in rows:
+        meal = _meal(row)
+        while pending and _meal_order(pending[0]) < _meal_order(meal):
+            yield pending.popleft()
+        yield meal
+    for meal in pending:
+        yield meal
+
+
+MEAL_CSV_HEADER = [
+    "id",
+    "start_date",
+    "end_date",
+    "recipe_id",
+    "recipe_title",
+    "recurring_meal_id",
+]
+
+
+def _meal_csv_row(meal):
+    return [
+        meal["id"],
+        meal["start_date"].isoformat(),
+        meal["end_date"].isoformat(),
+        meal["recipe_id"],
+        meal["recipe_title"],
+        meal["recurring_meal_id"],
+    ]
+
+
+def meal_csv_rows(user, occurrences=(), start_date=None, end_date=None):
+    yield MEAL_CSV_HEADER
+    for meal in meals(user, occurrences, start_date, end_date):
+        yield _meal_csv_row(meal)
+
+
+async def ameal_csv_rows(user, occurrences=(), start_date=None, end_date=None):
+    yield MEAL_CSV_HEADER
+    async for meal in ameals(user, occurrences, start_date, end_date):
+        yield _meal_csv_row(meal)
+
+
+def shopping_list(user, recurring_rows, end_date, start_date=None):
+    """
+    Yield the rows of get_shopping_list(), read in chunks, merged with the
+    `recurring_rows` of manz.shopping_list.recurring_rows().
+    """
+    rows = shopping_list_rows(user, end_date, start_date)
+    rows = merge_shopping_list_rows(
+        rows.iterator(chunk_size=CHUNK_SIZE), recurring_rows
+    )
+    yield from shopping_list_entries(rows)
+
+
+async def ashopping_list(user, recurring_rows, end_date, start_date=None):
+    # One row per item: small enough to be merged in memory.
+    rows = [
+        row async for row in shopping_list_rows(user, end_date, start_date).aiterator()
+    ]
+    for entry in shopping_list_entries(merge_shopping_list_rows(rows, recurring_rows)):
+        yield entry
+
+
+SHOPPING_LIST_CSV_HEADER = ["item_name", "quantity", "quantity_type"]
+
+
+def _shopping_list_csv_row(item):
+    return [item["item_name"], item["quantity"], item["quantity_type"]]
+
+
+def shopping_list_csv_rows(user, recurring_rows, end_date, start_date=None):
+    yield SHOPPING_LIST_CSV_HEADER
+    for item in shopping_list(user, recurring_rows, end_date, start_date):
+        yield _shopping_list_csv_row(item)
+
+
+async def ashopping_list_csv_rows(user, recurring_rows, end_date, start_date=None):
+    yield SHOPPING_LIST_CSV_HEADER
+    async for item in ashopping_list(user, recurring_rows, end_date, start_date):
+        yield _shopping_list_csv_row(item)
+
+
+def _ndjson_line(obj):
+    return json.dumps(obj, cls=DjangoJSONEncoder) + "\n"
+
+
+def ndjson_lines(objects):
+    for obj in objects:
+        yield _ndjson_line(obj)
+
+
+async def andjson_lines(objects):
+    async for obj in objects:
+        yield _ndjson_line(obj)
+
+
+class _Echo:
+    """File-like object handing back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    for row in rows:
+        yield writer.writerow(row)
+
+
+async def acsv_lines(rows):
+    writer = csv.writer(_Echo())
+    async for row in rows:
+        yield writer.writerow(row)
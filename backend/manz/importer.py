@@ -0,0 +1,160 @@
+from django.db import transaction
+from django.db.models.functions import Lower, Trim
+
+from .models import Item, Recipe, RecipeItem
+from .signals import skip_user_data_receivers
+from .versioning import items_changed, user_data_changed
+
+
+def normalize_item_name(name):
+    """Key under which item names are unique, see Item.Meta.constraints."""
+    return name.strip().lower()
+
+
+def resolve_items(items_data):
+    """
+    Map each normalized item name to an Item, creating the missing ones.
+
+    Existing items are looked up in one query and the missing ones are
+    inserted with a single bulk_create, whatever the number of names. Rows
+    inserted concurrently by another request are skipped on conflict and read
+    back, so two imports cannot create the same item twice.
+    """
+    items_data_by_name = {}
+    for item_data in items_data:
+        items_data_by_name.setdefault(normalize_item_name(item_data["name"]), item_data)
+
+    items = _find_items(items_data_by_name)
+
+    missing_items = [
+        Item(
+            name=item_data["name"].strip(),
+            image_url=item_data.get("image_url"),
+            quantity_type=item_data.get("quantity_type") or "",
+        )
+        for name, item_data in items_data_by_name.items()
+        if name not in items
+    ]
+    if missing_items:
+        Item.objects.bulk_create(missing_items, ignore_conflicts=True)
+        # bulk_create sends no signal: reload the item search indexes.
+        items_changed()
+        missing_items_data = {
+            name: item_data
+            for name, item_data in items_data_by_name.items()
+            if name not in items
+        }
+        items.update(_find_items(missing_items_data))
+    return items
+
+
+def _find_items(items_data_by_name):
+    # SQLite only lowercases ASCII, so also match the names as they were sent.
+    names = set(items_data_by_name)
+    names.update(item_data["name"].strip() for item_data in items_data_by_name.values())
+
+    items = Item.objects.annotate(lower_name=Lower(Trim("name"))).filter(
+        lower_name__in=names
+    )
+    return {normalize_item_name(item.name): item for item in items}
+
+
+@transaction.atomic
+def create_recipes(user, recipes_data):
+    """
+    Create recipes and their recipe items from validated RecipeSerializer data.
+
+    Runs a fixed number of queries however many recipes and ingredients are
+    given, and writes everything or nothing.
+    """
+    items = resolve_items(
+        recipe_item_data["item"]
+        for recipe_data in recipes_data
+        for recipe_item_data in recipe_data["recipe_items"]
+    )
+
+    recipes = Recipe.objects.bulk_create(
+        [
+            Recipe(
+                user=user,
+                title=recipe_data["title"],
+                description=recipe_data.get("description"),
+            )
+            for recipe_data in recipes_data
+        ]
+    )
+
+    RecipeItem.objects.bulk_create(
+        [
+            RecipeItem(
+                recipe=recipe,
+                item=items[normalize_item_name(recipe_item_data["item"]["name"])],
+                quantity=recipe_item_data["quantity"],
+            )
+            for recipe, recipe_data in zip(recipes, recipes_data)
+            for recipe_item_data in recipe_data["recipe_items"]
+        ]
+    )
+    # bulk_create sends no signal, see manz.signals.
+    user_data_changed(user.id)
+    return recipes
+
+
+@transaction.atomic
+def update_recipe(recipe, recipe_data):
+    """
+    Update a recipe from validated RecipeSerializer data, which may be
+    partial. Submitted recipe items replace the existing ones.
+
+    Only the difference is written: one bulk_update of the changed
+    quantities, one bulk_create of the new ingredients and one delete of the
+    removed ones, however many ingredients the recipe has. updated_at is
+    bumped even when nothing else changed.
+    """
+    for field in ("title", "description"):
+        if field in recipe_data:
+            setattr(recipe, field, recipe_data[field])
+
+    with skip_user_data_receivers():
+        recipe.save(update_fields=["title", "description", "updated_at"])
+        if "recipe_items" in recipe_data:
+            _replace_recipe_items(recipe, recipe_data["recipe_items"])
+
+    user_data_changed(recipe.user_id)
+    return recipe
+
+
+def _replace_recipe_items(recipe, recipe_items_data):
+    items = resolve_items(
+        recipe_item_data["item"] for recipe_item_data in recipe_items_data
+    )
+
+    # Existing rows of each item, matched in order with the submitted ones so
+    # an item listed twice keeps both rows.
+    existing = {}
+    for recipe_item in recipe.recipe_items.order_by("id"):
+        existing.setdefault(recipe_item.item_id, []).append(recipe_item)
+
+    changed, created = [], []
+    for recipe_item_data in recipe_items_data:
+        item = items[normalize_item_name(recipe_item_data["item"]["name"])]
+        rows = existing.get(item.id)
+        if rows:
+            recipe_item = rows.pop(0)
+            if recipe_item.quantity != recipe_item_data["quantity"]:
+                recipe_item.quantity = recipe_item_data["quantity"]
+                changed.append(recipe_item)
+        else:
+            created.append(
+                RecipeItem(
+                    recipe=recipe, item=item, quantity=recipe_item_data["quantity"]
+                )
+            )
+    removed = [recipe_item.id for rows in existing.values() for recipe_item in rows]
+
+    if changed:
+        RecipeItem.objects.bulk_update(changed, ["quantity"])
+    if created:
+        RecipeItem.objects.bulk_create(created)
+    if removed:
+        RecipeItem.objects.filter(id__in=removed).delete()
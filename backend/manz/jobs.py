@@ -0,0 +1,144 @@
+"""
+Background jobs, stored in the Job table and run by `manage.py run_jobs`
+workers, so long computations need no broker and hold no request.
+
+Workers claim a job with a conditional UPDATE from pending to running: when
+several race for the same job only one update changes a row, the others
+move on to the next job. Jobs left running by a worker that died are
+pending again after MANZ_JOB_TIMEOUT seconds.
+
+A job's writes and its outcome are committed in one transaction, so a job
+run again after its worker failed or died never repeats committed writes:
+either the job finished, or none of its writes were kept.
+"""
+
+import logging
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils.timezone import now
+
+from .importer import create_recipes
+from .models import Job
+from .shopping_list import get_cached_shopping_list
+
+logger = logging.getLogger(__name__)
+
+# Pending jobs read at once by a worker looking for one to claim.
+CLAIM_CANDIDATES = 10
+
+# Attempts at storing the outcome of a job, e.g. while SQLite is locked by
+# another writer, and seconds between them.
+STORE_ATTEMPTS = 3
+STORE_RETRY_DELAY = 0.5
+
+
+def shopping_list_job(user, payload):
+    return get_cached_shopping_list(
+        user,
+        datetime.fromisoformat(payload["end_date"]),
+        start_date=(
+            datetime.fromisoformat(payload["start_date"])
+            if payload.get("start_date")
+            else None
+        ),
+        breakdown=payload.get("breakdown", False),
+    )
+
+
+def recipe_import_job(user, payload):
+    recipes = create_recipes(user, payload["recipes"])
+    return {"created": len(recipes), "ids": [recipe.id for recipe in recipes]}
+
+
+# Function computing the result of each kind of job from its user and payload.
+HANDLERS = {
+    "shopping_list": shopping_list_job,
+    "recipe_import": recipe_import_job,
+}
+
+
+def submit(user, kind, payload):
+    """Queue a job, `payload` being JSON serializable."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(user=user, kind=kind, payload=payload)
+
+
+def claim_job(worker):
+    """Claim the oldest pending job for `worker`, or return None."""
+    candidates = Job.objects.filter(status=Job.PENDING).order_by("id")
+    for job_id in candidates.values_list("id", flat=True)[:CLAIM_CANDIDATES]:
+        claimed = Job.objects.filter(id=job_id, status=Job.PENDING).update(
+            status=Job.RUNNING, worker=worker, started_at=now()
+        )
+        if claimed:
+            return Job.objects.select_related("user").get(id=job_id)
+    return None
+
+
+def _run(job):
+    try:
+        # A savepoint, so that a failed handler leaves the transaction usable.
+        with transaction.atomic():
+            result = HANDLERS[job.kind](job.user, job.payload)
+    except Exception:
+        logger.exception("Job %s failed", job.id)
+        job.status = Job.FAILED
+        job.result = None
+        job.error = traceback.format_exc()
+    else:
+        job.status = Job.SUCCEEDED
+        job.result = result
+    job.finished_at = now()
+
+    # Only while the job is still ours: a requeued job belongs to another run,
+    # which will make the same writes.
+    stored = Job.objects.filter(
+        id=job.id, status=Job.RUNNING, worker=job.worker
+    ).update(
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        finished_at=job.finished_at,
+    )
+    if not stored:
+        logger.warning("Job %s was requeued, dropping this run", job.id)
+        transaction.set_rollback(True)
+
+
+def run_job(job):
+    """
+    Run a claimed job and store its result or its error, in the transaction
+    of the job's own writes.
+    """
+    for attempt in range(1, STORE_ATTEMPTS + 1):
+        try:
+            with transaction.atomic():
+                _run(job)
+        except DatabaseError:
+            # Nothing was kept: the job runs again from scratch.
+            if attempt == STORE_ATTEMPTS:
+                raise
+            logger.warning("Storing job %s failed, retrying", job.id, exc_info=True)
+            time.sleep(STORE_RETRY_DELAY)
+        else:
+            return job
+
+
+def release_job(job):
+    """Make a job claimed by `job.worker` pending again for another run."""
+    return Job.objects.filter(id=job.id, status=Job.RUNNING, worker=job.worker).update(
+        status=Job.PENDING, worker="", started_at=None
+    )
+
+
+def requeue_stale_jobs():
+    """Make the jobs running for longer than MANZ_JOB_TIMEOUT pending again."""
+    started_before = now() - timedelta(seconds=settings.MANZ_JOB_TIMEOUT)
+    return Job.objects.filter(status=Job.RUNNING, started_at__lt=started_before).update(
+        status=Job.PENDING, worker="", started_at=None
+    )
@@ -0,0 +1,103 @@
+import logging
+import os
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+
+from manz.jobs import claim_job, release_job, requeue_stale_jobs, run_job
+
+logger = logging.getLogger("manz.jobs")
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the background jobs submitted to the API, e.g. shopping lists "
+        "and recipe imports, with --concurrency worker threads."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="seconds to wait when no job is pending",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="exit once no job is pending"
+        )
+
+    def handle(self, *args, **options):
+        if not settings.MANZ_SHARED_CACHE:
+            # The jobs' writes would not invalidate what the API cached.
+            raise CommandError(
+                "run_jobs requires a CACHE_URL shared with the API, "
+                "e.g. redis://127.0.0.1:6379/1."
+            )
+
+        requeued = requeue_stale_jobs()
+        if requeued and options["verbosity"]:
+            self.stdout.write(f"Requeued {requeued} stale jobs")
+
+        self.stop = threading.Event()
+        name = f"{socket.gethostname()}:{os.getpid()}"
+        if options["concurrency"] == 1:
+            self.work(f"{name}:0", options)
+            return
+
+        threads = [
+            threading.Thread(target=self.work, args=(f"{name}:{index}", options))
+            for index in range(options["concurrency"])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            # Let the running jobs finish.
+            self.stop.set()
+            for thread in threads:
+                thread.join()
+
+    def work(self, worker, options):
+        try:
+            while not self.stop.is_set():
+                # Also drops a connection left unusable by an error.
+                close_old_connections()
+                try:
+                    job = claim_job(worker)
+                except Exception:
+                    logger.exception("Worker %s could not claim a job", worker)
+                    self.stop.wait(options["poll_interval"])
+                    continue
+                if job is None:
+                    if options["once"]:
+                        break
+                    self.stop.wait(options["poll_interval"])
+                    continue
+
+                try:
+                    job = run_job(job)
+                except Exception:
+                    logger.exception(
+                        "Worker %s could not finish job %s", worker, job.id
+                    )
+                    self.release(job)
+                    self.stop.wait(options["poll_interval"])
+                    continue
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{worker}: {job}")
+        finally:
+            connections.close_all()
+
+    def release(self, job):
+        # run_job() kept none of the job's writes, so it can run again. Left
+        # running otherwise, until requeue_stale_jobs() after MANZ_JOB_TIMEOUT.
+        try:
+            release_job(job)
+        except Exception:
+            logger.exception("Job %s could not be released", job.id)
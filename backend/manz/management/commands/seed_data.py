@@ -0,0 +1,193 @@
+import hashlib
+import random
+import re
+import time
+from datetime import date, datetime, time as day_time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import get_current_timezone, localdate, make_aware
+from rest_framework.authtoken.models import Token
+
+from manz.models import Item, Meal, Recipe, RecipeItem
+from manz.versioning import items_changed
+
+QUANTITY_TYPES = ["g", "ml", "units"]
+
+# Times of day meals are scheduled at, in order, up to --meals-per-day.
+MEAL_TIMES = [day_time(12), day_time(19), day_time(8), day_time(16)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a reproducible synthetic dataset of users, tokens, items, "
+        "recipes and meals, with batched bulk inserts. For development and "
+        "benchmarks only: the passwords and tokens it creates are predictable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--recipes", type=int, default=30, help="per user")
+        parser.add_argument("--items", type=int, default=500)
+        parser.add_argument(
+            "--items-per-recipe",
+            type=int,
+            default=8,
+            help="average number of ingredients of a recipe",
+        )
+        parser.add_argument("--days", type=int, default=365, help="meal horizon")
+        parser.add_argument(
+            "--meals-per-day", type=int, default=2, choices=range(len(MEAL_TIMES) + 1)
+        )
+        parser.add_argument(
+            "--start-date",
+            type=date.fromisoformat,
+            help="first day of meals, defaults to half the horizon before today",
+        )
+        parser.add_argument("--prefix", default="user", help="of the usernames")
+        parser.add_argument("--password", default="benchmark")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        if User.objects.filter(
+            username__regex=rf"^{re.escape(prefix)}[0-9]+$"
+        ).exists():
+            raise CommandError(
+                f"Users named {prefix}* already exist, pick another --prefix."
+            )
+
+        self.seed = options["seed"]
+        self.rng = random.Random(self.seed)
+        self.batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        items = self.create_items(options["items"])
+        start_date = options["start_date"] or (
+            localdate() - timedelta(days=options["days"] // 2)
+        )
+        meal_times = [
+            make_aware(
+                datetime.combine(start_date + timedelta(days=day), meal_time),
+                get_current_timezone(),
+            )
+            for day in range(options["days"])
+            for meal_time in MEAL_TIMES[: options["meals_per_day"]]
+        ]
+        password = make_password(options["password"])
+
+        counts = {"users": 0, "recipes": 0, "recipe items": 0, "meals": 0}
+        # Users are generated a few at a time, so that memory stays flat
+        # whatever the size of the dataset.
+        users_per_batch = max(1, self.batch_size // max(1, options["recipes"]))
+        for first in range(0, options["users"], users_per_batch):
+            last = min(options["users"], first + users_per_batch)
+            with transaction.atomic():
+                batch = self.create_users(prefix, range(first, last), password)
+                recipes, recipe_items = self.create_recipes(
+                    batch, options["recipes"], items, options["items_per_recipe"]
+                )
+                meals = self.create_meals(batch, recipes, meal_times)
+            counts["users"] += len(batch)
+            counts["recipes"] += len(recipes)
+            counts["recipe items"] += recipe_items
+            counts["meals"] += meals
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{counts['users']}/{options['users']} users")
+
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        if options["verbosity"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Created {summary} in {time.perf_counter() - started:.1f}s."
+                )
+            )
+
+    def create_items(self, count):
+        """Create the shared items, reusing those already in the database."""
+        names = [f"item {n}" for n in range(count)]
+        Item.objects.bulk_create(
+            (
+                Item(name=name, quantity_type=self.rng.choice(QUANTITY_TYPES))
+                for name in names
+            ),
+            batch_size=self.batch_size,
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no signal: reload the item search indexes.
+        items_changed()
+        return list(Item.objects.filter(name__in=names).order_by("id"))
+
+    def create_users(self, prefix, numbers, password):
+        users = User.objects.bulk_create(
+            (
+                User(
+                    username=f"{prefix}{n}",
+                    email=f"{prefix}{n}@example.com",
+                    password=password,
+                )
+                for n in numbers
+            ),
+            batch_size=self.batch_size,
+        )
+        # Token keys are derived from the seed and username, to be
+        # reproducible too.
+        Token.objects.bulk_create(
+            (
+                Token(
+                    user=user,
+                    key=hashlib.sha1(
+                        f"{self.seed}:{user.username}".encode()
+                    ).hexdigest(),
+                )
+                for user in users
+            ),
+            batch_size=self.batch_size,
+        )
+        return users
+
+    def create_recipes(self, users, count, items, items_per_recipe):
+        recipes = Recipe.objects.bulk_create(
+            (
+                Recipe(user=user, title=f"Recipe {n}", description="")
+                for user in users
+                for n in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        recipe_items = [
+            RecipeItem(recipe=recipe, item=item, quantity=self.rng.randint(1, 500))
+            for recipe in recipes
+            for item in self.rng.sample(
+                items, self.ingredient_count(items_per_recipe, len(items))
+            )
+        ]
+        RecipeItem.objects.bulk_create(recipe_items, batch_size=self.batch_size)
+        return recipes, len(recipe_items)
+
+    def ingredient_count(self, average, available):
+        """Most recipes have close to the average number of ingredients."""
+        count = round(self.rng.triangular(1, 2 * average - 1, average))
+        return max(1, min(available, count))
+
+    def create_meals(self, users, recipes, meal_times):
+        recipes_by_user = {}
+        for recipe in recipes:
+            recipes_by_user.setdefault(recipe.user_id, []).append(recipe)
+
+        meals = [
+            Meal(
+                user=user,
+                recipe=self.rng.choice(recipes_by_user[user.id]),
+                start_date=start_date,
+                end_date=start_date + timedelta(hours=1),
+            )
+            for user in users
+            if recipes_by_user.get(user.id)
+            for start_date in meal_times
+        ]
+        Meal.objects.bulk_create(meals, batch_size=self.batch_size)
+        return len(meals)
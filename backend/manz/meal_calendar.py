@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.db.models import prefetch_related_objects
+from django.utils import timezone
+
+from .models import Meal, recipe_items_prefetch
+from .recurrence import expand, merge_meals, rules_in_window
+from .serializers import CalendarMealSerializer
+
+# Meals end at an exclusive bound: one ending at midnight is not on the next day.
+_JUST_BEFORE = timedelta(microseconds=1)
+
+
+def calendar_meals(user, start_date, end_date):
+    """
+    Meals of a user overlapping [start_date, end_date), stored or expanded
+    from recurring meals, with their recipe and ingredients: one query on the
+    meal indexes, one on the recurring meals and one prefetch.
+    """
+    meals = (
+        Meal.objects.filter(user=user, start_date__lt=end_date, end_date__gt=start_date)
+        .select_related("recipe")
+        .order_by("start_date", "id")
+    )
+    rules = rules_in_window(user, start_date, end_date).select_related("recipe")
+    meals = merge_meals(meals, expand(rules, start_date, end_date, overlap=True))
+
+    prefetch_related_objects([meal.recipe for meal in meals], recipe_items_prefetch())
+    return meals
+
+
+def get_calendar(user, start_date, end_date, tz):
+    """
+    Return the days of the window holding meals, in the `tz` time zone, each
+    with the meals overlapping it. A meal running past midnight is listed on
+    every day it overlaps, and dates are rendered in `tz`.
+    """
+    first_day = timezone.localtime(start_date, tz).date()
+    last_day = timezone.localtime(end_date - _JUST_BEFORE, tz).date()
+
+    meals = calendar_meals(user, start_date, end_date)
+    with timezone.override(tz):
+        serialized_meals = CalendarMealSerializer(meals, many=True).data
+
+    days = {}
+    for meal, serialized_meal in zip(meals, serialized_meals):
+        day = max(first_day, timezone.localtime(meal.start_date, tz).date())
+        meal_last_day = timezone.localtime(meal.end_date - _JUST_BEFORE, tz).date()
+        while day <= min(last_day, meal_last_day):
+            days.setdefault(day, []).append(serialized_meal)
+            day += timedelta(days=1)
+
+    return [{"date": day, "meals": days[day]} for day in sorted(days)]
@@ -0,0 +1,246 @@
+"""
+Request instrumentation: where the time of each request goes, sent back in a
+Server-Timing header and aggregated in histograms served at /metrics in the
+Prometheus text format.
+
+Serialization is the time spent building the response data, by the
+serializers and manz.projections; rendering is the time spent encoding it.
+
+Like the token cache stats, the histograms are local to the current process:
+Prometheus scrapes each worker, or sums them with its own aggregation.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .authentication import token_cache_stats
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERIES_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+_current_timings = ContextVar("manz_request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    What a request spent, filled in while it runs.
+
+    It is shared through a context variable, which sync_to_async copies, so
+    queries run by the async ORM in a worker thread are counted as well.
+    """
+
+    __slots__ = (
+        "started",
+        "queries",
+        "db_duration",
+        "serialize",
+        "serializing",
+        "render_started",
+        "render",
+    )
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_duration = 0.0
+        self.serialize = 0.0
+        self.serializing = False
+        self.render_started = None
+        self.render = 0.0
+
+    def start_render(self):
+        self.render_started = time.perf_counter()
+
+    def end_render(self, response=None):
+        if self.render_started is not None:
+            self.render = time.perf_counter() - self.render_started
+
+    def server_timing(self, total):
+        return ", ".join(
+            [
+                f'db;dur={self.db_duration * 1000:.2f};desc="{self.queries} queries"',
+                f"serialize;dur={self.serialize * 1000:.2f}",
+                f"render;dur={self.render * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+
+
+def start_request():
+    """Start recording a request, returns the token to pass to end_request."""
+    timings = RequestTimings()
+    return timings, _current_timings.set(timings)
+
+
+def end_request(token):
+    _current_timings.reset(token)
+
+
+def current_timings():
+    return _current_timings.get()
+
+
+@contextmanager
+def serializing():
+    """
+    Count the block as serialization time of the current request, less the
+    queries it runs, e.g. for a queryset evaluated by a serializer. Nested
+    blocks count once.
+    """
+    timings = _current_timings.get()
+    if timings is None or timings.serializing:
+        yield
+        return
+
+    timings.serializing = True
+    started = time.perf_counter()
+    db_duration = timings.db_duration
+    try:
+        yield
+    finally:
+        timings.serializing = False
+        timings.serialize += (
+            time.perf_counter() - started - (timings.db_duration - db_duration)
+        )
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper timing the queries of the current request."""
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db_duration += time.perf_counter() - started
+        timings.queries += 1
+
+
+class Histogram:
+    """
+    Cumulative histogram of observations, one series per label values.
+    """
+
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values, value):
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Bucket counts, then sum: bucket n counts values <= buckets[n],
+                # the last one the values above every bucket.
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1)
+                series.append(0.0)
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def exposition(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = sorted((key, list(value)) for key, value in self._series.items())
+
+        for label_values, counts in series:
+            labels = ",".join(
+                f'{label}="{_escape(value)}"'
+                for label, value in zip(self.labels, label_values)
+            )
+            total = 0
+            for bucket, count in zip(self.buckets, counts):
+                total += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{bucket}"}} {total}')
+            total += counts[-2]
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {total}')
+            lines.append(f"{self.name}_sum{{{labels}}} {counts[-1]}")
+            lines.append(f"{self.name}_count{{{labels}}} {total}")
+        return lines
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LABELS = ("view", "method")
+
+request_duration = Histogram(
+    "manz_request_duration_seconds",
+    "Wall time of a request.",
+    REQUEST_LABELS,
+    SECONDS_BUCKETS,
+)
+db_duration = Histogram(
+    "manz_db_duration_seconds",
+    "Time spent running the SQL queries of a request.",
+    REQUEST_LABELS,
+    SECONDS_BUCKETS,
+)
+db_queries = Histogram(
+    "manz_db_queries",
+    "Number of SQL queries run by a request.",
+    REQUEST_LABELS,
+    QUERIES_BUCKETS,
+)
+serialize_duration = Histogram(
+    "manz_serialize_duration_seconds",
+    "Time spent building the response data of a request, queries excluded.",
+    REQUEST_LABELS,
+    SECONDS_BUCKETS,
+)
+render_duration = Histogram(
+    "manz_render_duration_seconds",
+    "Time spent encoding the response data of a request, e.g. to JSON.",
+    REQUEST_LABELS,
+    SECONDS_BUCKETS,
+)
+
+HISTOGRAMS = [
+    request_duration,
+    db_duration,
+    db_queries,
+    serialize_duration,
+    render_duration,
+]
+
+
+def observe_request(label_values, timings, total):
+    request_duration.observe(label_values, total)
+    db_duration.observe(label_values, timings.db_duration)
+    db_queries.observe(label_values, timings.queries)
+    serialize_duration.observe(label_values, timings.serialize)
+    render_duration.observe(label_values, timings.render)
+
+
+def render_metrics():
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines += histogram.exposition()
+
+    stats = token_cache_stats.as_dict()
+    for name in ("hits", "misses"):
+        metric = f"manz_token_cache_{name}_total"
+        lines += [
+            f"# HELP {metric} Token cache {name}.",
+            f"# TYPE {metric} counter",
+            f"{metric} {stats[name]}",
+        ]
+    return "\n".join(lines) + "\n"
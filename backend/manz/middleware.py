@@ -0,0 +1,210 @@
+import time
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_sequence, compress_string
+
+from . import metrics, routers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Brotli quality for responses compressed on the fly: close to gzip's speed
+# for noticeably smaller bodies.
+BROTLI_QUALITY = 5
+
+
+class InstrumentationMiddleware:
+    """
+    Record the wall time, SQL queries and render time of every request, send
+    them back in a Server-Timing header and add them to the /metrics
+    histograms.
+
+    Queries are timed by the execute wrapper installed on every database
+    connection (see manz.signals); keep this middleware first so the wall
+    time covers the others.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        timings, token = metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings, token = metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.end_request(token)
+        return self.finish(request, response, timings)
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after the view returns.
+        timings = metrics.current_timings()
+        if timings is not None:
+            timings.start_render()
+            response.add_post_render_callback(timings.end_render)
+        return response
+
+    def finish(self, request, response, timings):
+        total = time.perf_counter() - timings.started
+        if settings.MANZ_SERVER_TIMING:
+            response["Server-Timing"] = timings.server_timing(total)
+
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        metrics.observe_request((view, request.method), timings, total)
+        return response
+
+
+class ReplicaMiddleware:
+    """
+    Let manz.routers.ReplicaRouter send the reads of safe requests to the
+    read replicas. Unused when there are none.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.MANZ_REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        token = routers.start_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            routers.end_request(token)
+
+    async def __acall__(self, request):
+        token = routers.start_request(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            routers.end_request(token)
+
+
+def accepted_encodings(header):
+    """Content codings of an Accept-Encoding header whose q-value is not 0."""
+    encodings = set()
+    for part in header.split(","):
+        coding, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0
+        if coding.strip() and quality > 0:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def _brotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in sequence:
+        compressed = compressor.process(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.finish()
+
+
+async def _abrotli_sequence(sequence):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    async for chunk in sequence:
+        compressed = compressor.process(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.finish()
+
+
+async def _agzip_sequence(sequence):
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    async for chunk in sequence:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses of at least MANZ_COMPRESSION_MIN_SIZE bytes, and
+    streamed exports, with brotli when it is installed (`pip install brotli`)
+    and accepted by the client, else with gzip.
+
+    Unlike Django's GZipMiddleware no random bytes are added against BREACH:
+    the API authenticates with a token header, never with a cookie a page
+    from another site could make the browser send.
+    """
+
+    def process_response(self, request, response):
+        if response.has_header("Content-Encoding"):
+            return response
+        if not response.streaming and (
+            len(response.content) < settings.MANZ_COMPRESSION_MIN_SIZE
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encodings = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        if brotli is not None and "br" in encodings:
+            encoding = "br"
+        elif encodings & {"gzip", "*"}:
+            encoding = "gzip"
+        else:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                compress = _abrotli_sequence if encoding == "br" else _agzip_sequence
+            else:
+                compress = _brotli_sequence if encoding == "br" else compress_sequence
+            response.streaming_content = compress(response.streaming_content)
+            del response.headers["Content-Length"]
+        else:
+            if encoding == "br":
+                compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+            else:
+                compressed = compress_string(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # The compressed body is another representation: its ETag is weak,
+        # which still matches If-None-Match, see RFC 9110 section 8.8.1.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:24
+
+from django.db import migrations
+from django.db.models.functions import Lower
+
+
+def merge_duplicate_items(apps, schema_editor):
+    """
+    Keep the oldest of the items sharing a name regardless of case, so the
+    unique constraint on the item name can be created.
+    """
+    Item = apps.get_model("manz", "Item")
+    RecipeItem = apps.get_model("manz", "RecipeItem")
+
+    kept_item_ids = {}
+    duplicate_item_ids = {}
+    items = Item.objects.annotate(lower_name=Lower("name")).order_by("id")
+    for item_id, lower_name in items.values_list("id", "lower_name"):
+        if lower_name in kept_item_ids:
+            duplicate_item_ids[item_id] = kept_item_ids[lower_name]
+        else:
+            kept_item_ids[lower_name] = item_id
+
+    for duplicate_item_id, kept_item_id in duplicate_item_ids.items():
+        RecipeItem.objects.filter(item_id=duplicate_item_id).update(
+            item_id=kept_item_id
+        )
+    Item.objects.filter(id__in=duplicate_item_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manz", "0002_meal"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:24
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+def _user_email_index(apps):
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+    return User, models.Index(fields=["email"], name="manz_user_email")
+
+
+def add_user_email_index(apps, schema_editor):
+    # EmailAuthenticationBackend looks users up by email on every login.
+    # auth.User belongs to another app, whose model state this app cannot
+    # change: AddIndex, and the state side of SeparateDatabaseAndState, only
+    # apply to the models of the migration's own app. So the index exists
+    # in the database only, created and dropped by this migration, and
+    # makemigrations never sees it.
+    schema_editor.add_index(*_user_email_index(apps))
+
+
+def remove_user_email_index(apps, schema_editor):
+    schema_editor.remove_index(*_user_email_index(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manz", "0003_merge_duplicate_items"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="meal",
+            index=models.Index(
+                fields=["user", "start_date", "id"], name="manz_meal_user_start"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["user", "created_at", "id"], name="manz_recipe_user_created"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="item",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("name"),
+                name="manz_item_name_unique",
+            ),
+        ),
+        migrations.RunPython(add_user_email_index, remove_user_email_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 09:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manz", "0004_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="meal",
+            index=models.Index(fields=["user", "end_date"], name="manz_meal_user_end"),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manz", "0005_meal_end_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecurringMeal",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateTimeField()),
+                ("end_date", models.DateTimeField()),
+                (
+                    "frequency",
+                    models.CharField(
+                        choices=[("daily", "daily"), ("weekly", "weekly")],
+                        max_length=10,
+                    ),
+                ),
+                ("interval", models.PositiveIntegerField(default=1)),
+                ("count", models.PositiveIntegerField(blank=True, null=True)),
+                ("until", models.DateTimeField(blank=True, null=True)),
+                ("exceptions", models.JSONField(blank=True, default=list)),
+                (
+                    "last_end_date",
+                    models.DateTimeField(blank=True, editable=False, null=True),
+                ),
+                (
+                    "recipe",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_meals",
+                        to="manz.recipe",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurring_meals",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "start_date"],
+                        name="manz_recurringmeal_user_start",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.4 on 2026-10-18 13:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def merge_duplicate_items(apps, schema_editor):
+    """
+    Keep the oldest of the items sharing a name regardless of case and
+    surrounding spaces, so the unique constraint can include the trim.
+    """
+    Item = apps.get_model("manz", "Item")
+    RecipeItem = apps.get_model("manz", "RecipeItem")
+
+    kept_item_ids = {}
+    duplicate_item_ids = {}
+    items = Item.objects.annotate(key=Lower(Trim("name"))).order_by("id")
+    for item_id, key in items.values_list("id", "key"):
+        if key in kept_item_ids:
+            duplicate_item_ids[item_id] = kept_item_ids[key]
+        else:
+            kept_item_ids[key] = item_id
+
+    for duplicate_item_id, kept_item_id in duplicate_item_ids.items():
+        RecipeItem.objects.filter(item_id=duplicate_item_id).update(
+            item_id=kept_item_id
+        )
+    Item.objects.filter(id__in=duplicate_item_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("manz", "0007_job"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_items, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name="item",
+            name="manz_item_name_unique",
+        ),
+        migrations.AddConstraint(
+            model_name="item",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower(
+                    django.db.models.functions.text.Trim("name")
+                ),
+                name="manz_item_name_unique",
+            ),
+        ),
+    ]
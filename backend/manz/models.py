@@ -1,7 +1,28 @@
+from datetime import timedelta
+
 from django.db import models
+from django.db.models import Prefetch
+from django.db.models.functions import Lower, Trim
 from django.conf import settings
 
 
+def recipe_items_prefetch():
+    """The recipe items of recipes with their item, in insertion order."""
+    return Prefetch(
+        "recipe_items",
+        queryset=RecipeItem.objects.select_related("item").order_by("id"),
+    )
+
+
+class RecipeQuerySet(models.QuerySet):
+    def with_items(self):
+        """
+        Prefetch the recipe items and their item in one extra query, so
+        serializing any number of recipes costs a fixed number of queries.
+        """
+        return self.prefetch_related(recipe_items_prefetch())
+
+
 class Recipe(models.Model):
     title = models.CharField(max_length=255, blank=False)
     description = models.TextField(blank=True, null=True)  # Optional
@@ -11,6 +32,16 @@ class Recipe(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RecipeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Recipe list of a user, paginated on (created_at, id).
+            models.Index(
+                fields=["user", "created_at", "id"], name="manz_recipe_user_created"
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
@@ -20,6 +51,13 @@ class Item(models.Model):
     image_url = models.URLField(blank=True, verbose_name="Image URL", null=True)
     quantity_type = models.CharField(max_length=50, blank=True)
 
+    class Meta:
+        constraints = [
+            # Item names are shared by every recipe, whatever their case and
+            # surrounding spaces, see manz.importer.normalize_item_name.
+            models.UniqueConstraint(Lower(Trim("name")), name="manz_item_name_unique"),
+        ]
+
     def __str__(self):
         return f"{self.name}"
 
@@ -47,5 +85,123 @@ class Meal(models.Model):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
 
+    class Meta:
+        indexes = [
+            # Schedule and shopping list windows, paginated on (start_date, id).
+            models.Index(
+                fields=["user", "start_date", "id"], name="manz_meal_user_start"
+            ),
+            # Other bound of the calendar's overlap query.
+            models.Index(fields=["user", "end_date"], name="manz_meal_user_end"),
+        ]
+
     def __str__(self):
         return f"Meal: {self.recipe.title} from {self.start_date} to {self.end_date}"
+
+
+class RecurringMeal(models.Model):
+    """
+    A meal repeated daily or weekly from its first occurrence, stored as one
+    rule instead of one Meal per occurrence. Occurrences are expanded on
+    read, only within the requested window, see manz.recurrence.
+    """
+
+    FREQUENCIES = {"daily": 1, "weekly": 7}
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recurring_meals",
+    )
+    recipe = models.ForeignKey(
+        Recipe, on_delete=models.CASCADE, related_name="recurring_meals"
+    )
+    # First occurrence.
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    frequency = models.CharField(
+        max_length=10, choices=[(name, name) for name in FREQUENCIES]
+    )
+    interval = models.PositiveIntegerField(default=1)
+    # At most one of count and until, or neither for an endless recurrence.
+    count = models.PositiveIntegerField(blank=True, null=True)
+    until = models.DateTimeField(blank=True, null=True)
+    # Start dates of the cancelled occurrences, as ISO 8601 strings.
+    exceptions = models.JSONField(default=list, blank=True)
+    # End of the last occurrence, null when endless, to skip finished rules.
+    last_end_date = models.DateTimeField(blank=True, null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["user", "start_date"], name="manz_recurringmeal_user_start"
+            ),
+        ]
+
+    @property
+    def step(self):
+        return timedelta(days=self.FREQUENCIES[self.frequency] * self.interval)
+
+    @property
+    def duration(self):
+        return self.end_date - self.start_date
+
+    def last_index(self):
+        """Index of the last occurrence, None when endless."""
+        if self.count is not None:
+            return self.count - 1
+        if self.until is not None:
+            return max(0, (self.until - self.start_date) // self.step)
+        return None
+
+    def save(self, *args, **kwargs):
+        last_index = self.last_index()
+        self.last_end_date = (
+            None if last_index is None else self.end_date + last_index * self.step
+        )
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "last_end_date"}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Recurring meal: {self.recipe.title} {self.frequency} from {self.start_date}"
+
+
+class Job(models.Model):
+    """
+    A computation run in the background by `manage.py run_jobs` instead of
+    inside a request, see manz.jobs.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUSES = [PENDING, RUNNING, SUCCEEDED, FAILED]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="jobs"
+    )
+    kind = models.CharField(max_length=50)
+    status = models.CharField(
+        max_length=10,
+        choices=[(status, status) for status in STATUSES],
+        default=PENDING,
+    )
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    # Worker running the job, set when it is claimed.
+    worker = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Workers claim the oldest pending job.
+            models.Index(fields=["status", "id"], name="manz_job_status"),
+        ]
+
+    def __str__(self):
+        return f"Job {self.id}: {self.kind} {self.status}"
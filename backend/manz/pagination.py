@@ -0,0 +1,185 @@
+import base64
+import binascii
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .recurrence import iter_occurrences, merge_meals
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on a (datetime field, id) ordering.
+
+    Each page filters on the last row seen instead of using an OFFSET, so a
+    deep page costs the same as the first one. Pagination is opt-in: clients
+    that send neither `cursor` nor `page_size` keep getting a plain list.
+    """
+
+    ordering = None
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Invalid cursor"
+
+    def is_requested(self, request):
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.MANZ_PAGE_SIZE
+        return max(1, min(page_size, settings.MANZ_MAX_PAGE_SIZE))
+
+    def dump_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def load_cursor(self, request):
+        """Position held by the cursor parameter, None without one."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except (binascii.Error, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, instance):
+        field, _ = self.ordering
+        return self.dump_cursor([getattr(instance, field).isoformat(), instance.pk])
+
+    def decode_cursor(self, request):
+        position = self.load_cursor(request)
+        if position is None:
+            return None
+        try:
+            value, pk = position
+            value = parse_datetime(value)
+            pk = int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        field, _ = self.ordering
+
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            value, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk}),
+                **{f"{field}__gte": value},
+            )
+
+        # Fetch one extra row to know whether there is a next page.
+        page = list(queryset[: self.page_size + 1])
+        self.next_cursor = None
+        if len(page) > self.page_size:
+            page = page[: self.page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+
+class RecipePagination(KeysetPagination):
+    ordering = ("created_at", "id")
+
+
+class MealPagination(KeysetPagination):
+    """
+    Pages of a schedule: stored meals merged with the occurrences of recurring
+    meals, in manz.recurrence.meal_order(). An occurrence has no id, so its
+    cursor holds the id of its rule as a third value instead.
+    """
+
+    ordering = ("start_date", "id")
+
+    def encode_cursor(self, meal):
+        if meal.id is not None:
+            return super().encode_cursor(meal)
+        return self.dump_cursor(
+            [meal.start_date.isoformat(), None, meal.recurring_meal_id]
+        )
+
+    def decode_cursor(self, request):
+        """Return (start date, meal id, rule id), one of both ids being None."""
+        position = self.load_cursor(request)
+        if position is None:
+            return None
+        try:
+            if len(position) == 2:
+                position = [*position, None]
+            value, meal_id, rule_id = position
+            value = parse_datetime(value)
+            meal_id = None if meal_id is None else int(meal_id)
+            rule_id = None if rule_id is None else int(rule_id)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if value is None or (meal_id is None) == (rule_id is None):
+            raise NotFound(self.invalid_cursor_message)
+        return value, meal_id, rule_id
+
+    def paginate_schedule(self, meals, rules, request, start_date, end_date):
+        """
+        Return a page of the stored `meals` and of the occurrences of `rules`
+        starting in [start_date, end_date). Occurrences are built from the
+        cursor on, page_size + 1 at most, whatever the size of the window.
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+
+        meals = meals.order_by(*self.ordering)
+        lower, meal_id, rule_id = self.decode_cursor(request) or (
+            start_date,
+            None,
+            None,
+        )
+        if meal_id is not None:
+            meals = meals.filter(
+                Q(start_date__gt=lower) | Q(start_date=lower, id__gt=meal_id),
+                start_date__gte=lower,
+            )
+        elif rule_id is not None:
+            # Stored meals come before the occurrences starting with them.
+            meals = meals.filter(start_date__gt=lower)
+
+        occurrences = iter_occurrences(rules, lower, end_date)
+        if rule_id is not None:
+            occurrences = (
+                meal
+                for meal in occurrences
+                if meal.start_date > lower or meal.recurring_meal_id > rule_id
+            )
+
+        # Fetch one extra meal to know whether there is a next page.
+        page = merge_meals(
+            meals[: self.page_size + 1], islice(occurrences, self.page_size + 1)
+        )[: self.page_size + 1]
+        self.next_cursor = None
+        if len(page) > self.page_size:
+            page = page[: self.page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
@@ -0,0 +1,56 @@
+import codecs
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .renderers import FastJSONRenderer, loads
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser decoding with orjson when it is installed, see manz.renderers.
+    """
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+
+        try:
+            content = stream.read()
+            if codecs.lookup(encoding).name != "utf-8":
+                content = content.decode(encoding)
+            return loads(content)
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse newline-delimited JSON into a list, one element per non-empty line.
+
+    Parsing stops one element past the `max_items` of the view, if it has
+    one: the view rejects the list without the rest of the stream being read.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", "utf-8")
+        max_items = getattr(parser_context.get("view"), "max_items", None)
+
+        data = []
+        for line_number, line in enumerate(stream, start=1):
+            if max_items is not None and len(data) > max_items:
+                break
+            line = line.decode(encoding).strip()
+            if not line:
+                continue
+            try:
+                data.append(loads(line))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {line_number} - {exc}")
+        return data
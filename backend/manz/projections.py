@@ -0,0 +1,107 @@
+"""
+Read path of the recipe and schedule lists built from `.values()` rows
+instead of model instances and serializers, whose per row cost dominates
+once lists reach thousands of rows.
+
+The dicts are those of RecipeSerializer and MealSerializer, key for key, so
+the rendered responses are the same bytes.
+"""
+
+from rest_framework.fields import DateTimeField
+
+from .metrics import serializing
+from .models import RecipeItem
+
+RECIPE_FIELDS = ("id", "title", "description")
+
+RECIPE_ITEM_FIELDS = (
+    "recipe_id",
+    "item_id",
+    "item__name",
+    "item__image_url",
+    "item__quantity_type",
+    "quantity",
+)
+
+MEAL_FIELDS = ("id", "user_id", "start_date", "end_date")
+
+_datetime = DateTimeField().to_representation
+
+
+def _recipe_items(recipe_ids):
+    # Same order as Recipe.objects.with_items().
+    return (
+        RecipeItem.objects.filter(recipe_id__in=recipe_ids)
+        .order_by("id")
+        .values_list(*RECIPE_ITEM_FIELDS)
+    )
+
+
+def _group_recipes(recipe_rows, item_rows):
+    recipe_items = {}
+    for recipe_id, item_id, name, image_url, quantity_type, quantity in item_rows:
+        recipe_items.setdefault(recipe_id, []).append(
+            {
+                "item": {
+                    "id": item_id,
+                    "name": name,
+                    "image_url": image_url,
+                    "quantity_type": quantity_type,
+                },
+                "quantity": quantity,
+            }
+        )
+    return [
+        {**row, "recipe_items": recipe_items.get(row["id"], [])} for row in recipe_rows
+    ]
+
+
+def recipe_list(recipes):
+    """RecipeSerializer(recipes, many=True).data of a Recipe queryset."""
+    with serializing():
+        rows = list(recipes.values(*RECIPE_FIELDS))
+        return _group_recipes(rows, _recipe_items([row["id"] for row in rows]))
+
+
+async def arecipe_list(recipes):
+    with serializing():
+        rows = [row async for row in recipes.values(*RECIPE_FIELDS)]
+        recipe_item_rows = [
+            row async for row in _recipe_items([row["id"] for row in rows])
+        ]
+        return _group_recipes(rows, recipe_item_rows)
+
+
+def _merge_meal_rows(meal_rows, occurrences):
+    # Stored meals then occurrences, sorted like manz.recurrence.merge_meals.
+    rows = [(*row, None) for row in meal_rows]
+    rows += [
+        (None, meal.user_id, meal.start_date, meal.end_date, meal.recurring_meal_id)
+        for meal in occurrences
+    ]
+    rows.sort(key=lambda row: (row[2], row[0] is None, row[0] or row[4]))
+    return [
+        {
+            "id": meal_id,
+            "user": user_id,
+            "start_date": _datetime(start_date),
+            "end_date": _datetime(end_date),
+            "recurring_meal_id": recurring_meal_id,
+        }
+        for meal_id, user_id, start_date, end_date, recurring_meal_id in rows
+    ]
+
+
+def meal_list(meals, occurrences):
+    """
+    MealSerializer(merge_meals(meals, occurrences), many=True).data of a Meal
+    queryset and the occurrences expanded from recurring meals.
+    """
+    with serializing():
+        return _merge_meal_rows(meals.values_list(*MEAL_FIELDS), occurrences)
+
+
+async def ameal_list(meals, occurrences):
+    with serializing():
+        meal_rows = [row async for row in meals.values_list(*MEAL_FIELDS)]
+        return _merge_meal_rows(meal_rows, occurrences)
@@ -0,0 +1,248 @@
+"""
+Expansion of recurring meals into the occurrences of a window.
+
+Occurrences are computed from the rule, starting at the first one that can
+fall in the window, so a read costs the number of occurrences it returns
+whatever the age of the rule. They are returned as unsaved Meal instances,
+with the id of their rule in `recurring_meal_id`.
+
+Reads expanding a whole window are capped by MANZ_MAX_OCCURRENCES_PER_REQUEST,
+checked from the rules before any occurrence is built: an endless rule read
+up to year 9999 would otherwise build millions of meals.
+"""
+
+import heapq
+import itertools
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import F, Max, Min, Q, Sum
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .models import Meal, RecipeItem, RecurringMeal
+from .units import base_unit_expression, factor_expression, unit_key
+
+
+class TooManyOccurrences(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = "too_many_occurrences"
+
+    def __init__(self):
+        super().__init__(
+            "The window holds more than "
+            f"{settings.MANZ_MAX_OCCURRENCES_PER_REQUEST} occurrences of "
+            "recurring meals, narrow it."
+        )
+
+
+def _exceptions(rule):
+    return {datetime.fromisoformat(value) for value in rule.exceptions}
+
+
+def _index_range(rule, lower, upper, overlap, include_upper):
+    # Indexes of the first and last occurrences in the window, the last one
+    # being None when neither the rule nor the window ends.
+    step = rule.step
+    last_index = rule.last_index()
+
+    index = 0
+    if lower is not None:
+        # First occurrence starting at or after the lower bound, or ending
+        # after it when looking for overlaps.
+        first_start = lower - rule.duration if overlap else lower
+        if first_start > rule.start_date:
+            index = -((rule.start_date - first_start) // step)
+        if overlap and rule.start_date + index * step == first_start:
+            index += 1
+
+    if upper is not None:
+        upper_index = (upper - rule.start_date) // step
+        if not include_upper and rule.start_date + upper_index * step == upper:
+            upper_index -= 1
+        last_index = upper_index if last_index is None else min(last_index, upper_index)
+    return index, last_index
+
+
+def occurrence_starts(rule, lower=None, upper=None, overlap=False, include_upper=False):
+    """
+    Yield the start dates of the occurrences of `rule` starting from `lower`
+    (or overlapping it with `overlap`) and before `upper` (or at it with
+    `include_upper`). Either bound may be None.
+    """
+    exceptions = _exceptions(rule)
+    first_index, last_index = _index_range(rule, lower, upper, overlap, include_upper)
+    indexes = (
+        itertools.count(first_index)
+        if last_index is None
+        else range(first_index, last_index + 1)
+    )
+    for index in indexes:
+        start_date = rule.start_date + index * rule.step
+        if start_date not in exceptions:
+            yield start_date
+
+
+def check_occurrence_count(rules, lower, upper, overlap=False, include_upper=False):
+    """
+    Raise TooManyOccurrences when `rules` have more occurrences in the window
+    than MANZ_MAX_OCCURRENCES_PER_REQUEST, counting them from the rules alone
+    (cancelled ones included).
+    """
+    total = 0
+    for rule in rules:
+        first_index, last_index = _index_range(
+            rule, lower, upper, overlap, include_upper
+        )
+        if last_index is None:
+            raise TooManyOccurrences()
+        total += max(0, last_index - first_index + 1)
+        if total > settings.MANZ_MAX_OCCURRENCES_PER_REQUEST:
+            raise TooManyOccurrences()
+
+
+def rules_in_window(user, start_date=None, end_date=None):
+    """Recurring meals of a user which may have occurrences in the window."""
+    rules = RecurringMeal.objects.filter(user=user)
+    if end_date is not None:
+        rules = rules.filter(start_date__lte=end_date)
+    if start_date is not None:
+        rules = rules.filter(
+            Q(last_end_date__isnull=True) | Q(last_end_date__gt=start_date)
+        )
+    return rules
+
+
+def _occurrence(rule, start_date):
+    meal = Meal(
+        user_id=rule.user_id,
+        recipe_id=rule.recipe_id,
+        start_date=start_date,
+        end_date=start_date + rule.duration,
+    )
+    if RecurringMeal.recipe.is_cached(rule):
+        meal.recipe = rule.recipe
+    meal.recurring_meal_id = rule.id
+    return meal
+
+
+def expand(rules, lower, upper, overlap=False):
+    """
+    Return the occurrences of `rules` in the window as unsaved Meal
+    instances, sharing the rule's recipe when it was loaded. Raise
+    TooManyOccurrences above MANZ_MAX_OCCURRENCES_PER_REQUEST.
+    """
+    rules = list(rules)
+    check_occurrence_count(rules, lower, upper, overlap)
+    return [
+        _occurrence(rule, start_date)
+        for rule in rules
+        for start_date in occurrence_starts(rule, lower, upper, overlap)
+    ]
+
+
+def _rule_occurrences(rule, lower, upper):
+    for start_date in occurrence_starts(rule, lower, upper):
+        yield _occurrence(rule, start_date)
+
+
+def iter_occurrences(rules, lower, upper):
+    """
+    Yield the occurrences of `rules` starting in the window in meal_order(),
+    built as they are read: for pages of a window too large to expand.
+    """
+    return heapq.merge(
+        *(_rule_occurrences(rule, lower, upper) for rule in rules), key=meal_order
+    )
+
+
+def meal_order(meal):
+    """
+    Sort key of a schedule: start date, then stored meals by id before
+    occurrences by rule id.
+    """
+    return (meal.start_date, meal.id is None, meal.id or meal.recurring_meal_id)
+
+
+def merge_meals(meals, occurrences):
+    """Merge stored meals and occurrences in meal_order()."""
+    return sorted([*meals, *occurrences], key=meal_order)
+
+
+def recurring_shopping_list_rows(rules, end_date, start_date=None, breakdown=False):
+    """
+    Rows of the recurring meals' ingredients for a shopping list, shaped like
+    manz.shopping_list.shopping_list_rows(): quantities of each recipe are
+    multiplied by its number of occurrences in the window. Raise
+    TooManyOccurrences above MANZ_MAX_OCCURRENCES_PER_REQUEST.
+    """
+    rules = list(rules)
+    check_occurrence_count(rules, start_date, end_date, include_upper=True)
+    occurrences = {}
+    for rule in rules:
+        count = sum(
+            1 for _ in occurrence_starts(rule, start_date, end_date, include_upper=True)
+        )
+        if count:
+            occurrences[rule.recipe_id] = occurrences.get(rule.recipe_id, 0) + count
+    if not occurrences:
+        return []
+
+    recipe_rows = (
+        RecipeItem.objects.filter(recipe_id__in=occurrences)
+        .annotate(unit_key=unit_key("item__quantity_type"))
+        .annotate(base_unit=base_unit_expression("unit_key", "item__quantity_type"))
+        .values("item__name", "base_unit", "recipe_id", "recipe__title")
+        .annotate(
+            quantity=Sum(F("quantity") * factor_expression("unit_key")),
+            first_unit=Min("unit_key"),
+            last_unit=Max("unit_key"),
+        )
+    )
+
+    rows = {}
+    for row in recipe_rows:
+        meals = occurrences[row["recipe_id"]]
+        key = (row["item__name"], row["base_unit"])
+        if breakdown:
+            key += (row["recipe_id"],)
+        merged = rows.setdefault(key, dict(row, quantity=0, meals=0))
+        # A recipe counts once per occurrence, like a stored meal.
+        merged["quantity"] += row["quantity"] * meals
+        merged["meals"] += meals
+        merged["first_unit"] = min(merged["first_unit"], row["first_unit"])
+        merged["last_unit"] = max(merged["last_unit"], row["last_unit"])
+    return list(rows.values())
+
+
+def merge_shopping_list_rows(rows, recurring_rows, breakdown=False):
+    """
+    Yield the rows of stored meals merged with those of recurring meals,
+    adding up the rows of the same group.
+    """
+    fields = ["item__name", "base_unit"] + (["recipe_id"] if breakdown else [])
+    pending = {tuple(row[field] for field in fields): row for row in recurring_rows}
+
+    for row in rows:
+        extra = pending.pop(tuple(row[field] for field in fields), None)
+        if extra is not None:
+            row = dict(
+                row,
+                quantity=row["quantity"] + extra["quantity"],
+                first_unit=min(row["first_unit"], extra["first_unit"]),
+                last_unit=max(row["last_unit"], extra["last_unit"]),
+            )
+            if breakdown:
+                row["meals"] += extra["meals"]
+        yield row
+
+    # Groups without stored meals come last, in the same order.
+    yield from sorted(pending.values(), key=row_order(breakdown))
+
+
+def row_order(breakdown=False):
+    """Sort key of shopping list rows, as ordered by the database."""
+    fields = ["item__name", "base_unit"]
+    if breakdown:
+        fields += ["recipe__title", "recipe_id"]
+    return lambda row: tuple(row[field] for field in fields)
@@ -0,0 +1,90 @@
+"""
+Read replicas: the reads of safe requests (GET, HEAD, OPTIONS) go to one of
+the databases of DATABASE_REPLICA_URLS, everything else to the primary.
+
+Replicas lag behind the primary. A user who wrote is pinned to the primary
+for MANZ_REPLICA_PIN_SECONDS, see pin_user(), so they read their own writes;
+tokens and users are always read from the primary so a fresh login works
+right away, and so are background jobs, whose status is written by workers
+and polled right after they are submitted.
+"""
+
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.functional import LazyObject
+
+# Apps and models whose reads must see the latest writes.
+PRIMARY_APPS = {"admin", "auth", "authtoken", "contenttypes", "sessions"}
+PRIMARY_MODELS = {"manz.job"}
+
+_current_request = ContextVar("manz_replica_request", default=None)
+
+
+def _pin_key(user_id):
+    return f"manz:primary:{user_id}"
+
+
+def pin_user(user_id):
+    """Send the reads of a user to the primary while replicas catch up."""
+    if settings.MANZ_REPLICA_DATABASES:
+        cache.set(_pin_key(user_id), True, settings.MANZ_REPLICA_PIN_SECONDS)
+
+
+class _ReadRequest:
+    """A safe request, reading from one replica unless its user is pinned."""
+
+    __slots__ = ("request", "alias", "pinned")
+
+    def __init__(self, request):
+        self.request = request
+        self.alias = random.choice(settings.MANZ_REPLICA_DATABASES)
+        self.pinned = None
+
+    def read_alias(self):
+        # Only once the user is authenticated, which DRF does in the view:
+        # the lazy user of AuthenticationMiddleware would query the sessions.
+        user = vars(self.request).get("user")
+        if user is None or isinstance(user, LazyObject) or not user.is_authenticated:
+            return None
+        if self.pinned is None:
+            self.pinned = cache.get(_pin_key(user.pk)) is not None
+        return None if self.pinned else self.alias
+
+
+def start_request(request):
+    """
+    Route the reads of `request` to a replica when it is safe, returns the
+    token to pass to end_request.
+    """
+    read_request = (
+        _ReadRequest(request) if request.method in ("GET", "HEAD", "OPTIONS") else None
+    )
+    return _current_request.set(read_request)
+
+
+def end_request(token):
+    _current_request.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        read_request = _current_request.get()
+        if (
+            read_request is None
+            or model._meta.app_label in PRIMARY_APPS
+            or model._meta.label_lower in PRIMARY_MODELS
+        ):
+            return DEFAULT_DB_ALIAS
+        return read_request.read_alias() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Also for instances read from a replica.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
@@ -0,0 +1,159 @@
+"""
+Item autocomplete, served from an in-memory index of every item name.
+
+Each process keeps its own index, loaded when the server starts (see
+manzapi.asgi and manzapi.wsgi) and kept current on Item saves and deletes.
+Writes bump a version shared through the cache (see manz.versioning): an
+index that missed one, e.g. made by another worker or by a bulk insert, is
+reloaded on the next search.
+"""
+
+import difflib
+import logging
+import threading
+from bisect import bisect_left
+
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+
+from .models import Item
+from .versioning import get_items_version
+
+logger = logging.getLogger(__name__)
+
+# Only names at least this similar to the query are fuzzy matches.
+FUZZY_CUTOFF = 0.75
+
+
+def _search_key(name):
+    return " ".join(name.casefold().split())
+
+
+class _Snapshot:
+    """
+    Immutable state of the index: searches read one without locking while a
+    writer prepares the next.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        # Sorted (key, id) pairs, for the names and for every later word
+        # of each name, so "oil" finds "olive oil". Patched snapshots are
+        # sorted again, which is linear on the almost sorted pairs.
+        self.names = sorted(
+            (_search_key(item["name"]), item_id) for item_id, item in items.items()
+        )
+        self.words = sorted(
+            (word, item_id) for key, item_id in self.names for word in key.split()[1:]
+        )
+
+    def replace(self, item=None, removed_id=None):
+        items = dict(self.items)
+        items.pop(removed_id, None)
+        if item is not None:
+            items[item["id"]] = item
+        return _Snapshot(items)
+
+
+class ItemIndex:
+    def __init__(self):
+        self._snapshot = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            # Read the version first: a write committed while loading makes
+            # the next search load again rather than being missed.
+            version = get_items_version()
+            # From the primary: a lagging replica would store old items under
+            # the new version.
+            items = Item.objects.using(DEFAULT_DB_ALIAS).values(
+                "id", "name", "quantity_type", "image_url"
+            )
+            self._snapshot = _Snapshot({item["id"]: item for item in items})
+            self._version = version
+        return self._snapshot
+
+    def _current(self):
+        snapshot = self._snapshot
+        if snapshot is None or self._version != get_items_version():
+            snapshot = self._load()
+        return snapshot
+
+    def warm_up(self):
+        """
+        Load the index ahead of the first search, which would otherwise pay
+        for it. A database that cannot be read yet, e.g. not migrated, leaves
+        the loading to that search.
+        """
+        try:
+            self._load()
+        except DatabaseError:
+            logger.warning("Could not load the item index", exc_info=True)
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = self._version = None
+
+    def search(self, query, limit=10):
+        """
+        Return up to `limit` items whose name starts with `query`, then those
+        with a later word starting with it, then, when nothing matched, names
+        close to it to forgive typos.
+        """
+        snapshot = self._current()
+        query = _search_key(query)
+        if not query:
+            return []
+
+        ids = []
+        for pairs in (snapshot.names, snapshot.words):
+            index = bisect_left(pairs, (query,))
+            while len(ids) < limit and index < len(pairs):
+                key, item_id = pairs[index]
+                if not key.startswith(query):
+                    break
+                if item_id not in ids:
+                    ids.append(item_id)
+                index += 1
+
+        if not ids:
+            # Typos rarely hit the first letter: only compare names sharing
+            # it, which keeps the fuzzy pass cheap on large indexes.
+            start = bisect_left(snapshot.names, (query[0],))
+            end = bisect_left(snapshot.names, (chr(ord(query[0]) + 1),))
+            candidates = dict(snapshot.names[start:end])
+            ids = [
+                candidates[key]
+                for key in difflib.get_close_matches(
+                    query, candidates, n=limit, cutoff=FUZZY_CUTOFF
+                )
+            ]
+        return [snapshot.items[item_id] for item_id in ids]
+
+    @staticmethod
+    def entry(item):
+        return {
+            "id": item.id,
+            "name": item.name,
+            "quantity_type": item.quantity_type,
+            "image_url": item.image_url,
+        }
+
+    def item_saved(self, entry, version):
+        self._apply(entry, None, version)
+
+    def item_deleted(self, item_id, version):
+        self._apply(None, item_id, version)
+
+    def _apply(self, item, removed_id, version):
+        with self._lock:
+            # Only an index that saw every previous write can be patched,
+            # any other is reloaded on the next search.
+            if self._snapshot is None or self._version != version - 1:
+                return
+            self._snapshot = self._snapshot.replace(item, removed_id)
+            self._version = version
+
+
+item_index = ItemIndex()
@@ -1,8 +1,30 @@
-from .models import Recipe, Item, RecipeItem, Meal
+from .models import Recipe, Item, RecipeItem, Meal, RecurringMeal, Job
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.core.validators import validate_email
 from django.utils.timezone import now
+from django.conf import settings
+from django.db import transaction
+from datetime import timedelta
+import zoneinfo
+from django.utils import timezone
+from .importer import create_recipes, update_recipe
+from .metrics import serializing
+from .shopping_list import get_cached_shopping_list
+from .versioning import user_data_changed
+
+
+class TimedDataMixin:
+    """Count building `data` as serialization time, see manz.metrics."""
+
+    @property
+    def data(self):
+        with serializing():
+            return super().data
+
+
+class TimedListSerializer(TimedDataMixin, serializers.ListSerializer):
+    pass
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -59,36 +81,56 @@ class RecipeItemSerializer(serializers.ModelSerializer):
         fields = ["item", "quantity"]
 
 
-class RecipeSerializer(serializers.ModelSerializer):
+class RecipeSerializer(TimedDataMixin, serializers.ModelSerializer):
     recipe_items = RecipeItemSerializer(many=True)
 
     class Meta:
         model = Recipe
         fields = ["id", "title", "description", "recipe_items"]
+        list_serializer_class = TimedListSerializer
 
     def create(self, validated_data):
-        recipe_items_data = validated_data.pop("recipe_items")
         user = self.context["request"].user
-        recipe = Recipe.objects.create(user=user, **validated_data)
+        return create_recipes(user, [validated_data])[0]
+
+    def update(self, instance, validated_data):
+        return update_recipe(instance, validated_data)
+
+
+class MealListSerializer(TimedDataMixin, serializers.ListSerializer):
+    """
+    Schedule many meals at once: recipe ownership is checked for the whole
+    batch in one query and every meal is inserted with one bulk_create.
+    """
 
-        for recipe_item_data in recipe_items_data:
-            item_data = recipe_item_data.pop("item")
-            item, created = Item.objects.get_or_create(
-                name=item_data["name"],
-                defaults={
-                    "image_url": item_data.get("image_url"),
-                    "quantity_type": item_data.get("quantity_type"),
-                },
+    def validate(self, data):
+        user = self.context["request"].user
+        recipe_ids = {meal["recipe_id"] for meal in data}
+        owned_recipe_ids = set(
+            Recipe.objects.filter(user=user, id__in=recipe_ids).values_list(
+                "id", flat=True
             )
-            RecipeItem.objects.create(
-                recipe=recipe, item=item, quantity=recipe_item_data["quantity"]
+        )
+        if recipe_ids - owned_recipe_ids:
+            raise serializers.ValidationError(
+                "The selected recipe does not belong to the user."
             )
+        return data
 
-        return recipe
+    def create(self, validated_data):
+        user = self.context["request"].user
+        with transaction.atomic():
+            meals = Meal.objects.bulk_create(
+                [Meal(user=user, **meal_data) for meal_data in validated_data]
+            )
+            # bulk_create sends no signal, see manz.signals.
+            user_data_changed(user.id)
+        return meals
 
 
-class MealSerializer(serializers.ModelSerializer):
+class MealSerializer(TimedDataMixin, serializers.ModelSerializer):
     recipe_id = serializers.IntegerField(write_only=True)
+    recurring_meal_id = serializers.SerializerMethodField()
 
     class Meta:
         model = Meal
@@ -98,17 +140,23 @@ class MealSerializer(serializers.ModelSerializer):
             "start_date",
             "end_date",
             "recipe_id",
+            "recurring_meal_id",
         ]
+        read_only_fields = ["user"]
+        list_serializer_class = MealListSerializer
 
     def validate(self, data):
-        user = self.context["request"].user
-        recipe = Recipe.objects.filter(user=user, id=data["recipe_id"]).first()
         if data["start_date"] >= data["end_date"]:
             raise serializers.ValidationError(
                 "Start date must be earlier than end date."
             )
 
-        if not recipe:
+        # A batch checks every recipe at once in MealListSerializer.validate.
+        if isinstance(self.parent, serializers.ListSerializer):
+            return data
+
+        user = self.context["request"].user
+        if not Recipe.objects.filter(user=user, id=data["recipe_id"]).exists():
             raise serializers.ValidationError(
                 "The selected recipe does not belong to the user."
             )
@@ -117,44 +165,281 @@ class MealSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = self.context["request"].user
-        recipe = Recipe.objects.filter(id=validated_data["recipe_id"]).first()
         meal = Meal.objects.create(
             user=user,
-            recipe=recipe,
+            recipe_id=validated_data["recipe_id"],
             start_date=validated_data["start_date"],
             end_date=validated_data["end_date"],
         )
         return meal
 
+    def get_recurring_meal_id(self, meal):
+        # Set on the occurrences expanded from a recurring meal.
+        return getattr(meal, "recurring_meal_id", None)
 
-class UserRecipeItemSerializer(serializers.ModelSerializer):
-    recipe_title = serializers.CharField(source="recipe.title")
-    item_name = serializers.CharField(source="item.name")
-    quantity = serializers.FloatField()
-    quantity_type = serializers.CharField(source="item.quantity_type")
+
+class CalendarMealSerializer(TimedDataMixin, serializers.ModelSerializer):
+    """
+    Meal with its recipe and ingredients, each recipe being serialized once
+    however many meals share it.
+    """
+
+    recipe = serializers.SerializerMethodField()
+    recurring_meal_id = serializers.SerializerMethodField()
 
     class Meta:
-        model = RecipeItem
-        fields = ["recipe_title", "item_name", "quantity", "quantity_type"]
+        model = Meal
+        fields = ["id", "start_date", "end_date", "recurring_meal_id", "recipe"]
+        list_serializer_class = TimedListSerializer
+
+    def get_recurring_meal_id(self, meal):
+        return getattr(meal, "recurring_meal_id", None)
+
+    def get_recipe(self, meal):
+        recipes = self.context.setdefault("recipes", {})
+        if meal.recipe_id not in recipes:
+            recipes[meal.recipe_id] = RecipeSerializer(meal.recipe).data
+        return recipes[meal.recipe_id]
+
+
+class CalendarSerializer(serializers.Serializer):
+    """
+    Calendar window: meals overlapping [start_date, end_date), grouped by day
+    in the `tz` time zone, in which dates without an offset are read too.
+    """
+
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+
+    def to_internal_value(self, data):
+        try:
+            tz = zoneinfo.ZoneInfo(data.get("tz") or settings.TIME_ZONE)
+        except (ValueError, zoneinfo.ZoneInfoNotFoundError):
+            raise serializers.ValidationError({"tz": ["Unknown time zone."]})
+
+        with timezone.override(tz):
+            validated_data = super().to_internal_value(data)
+        validated_data["tz"] = tz
+        return validated_data
+
+    def validate(self, data):
+        if data["start_date"] >= data["end_date"]:
+            raise serializers.ValidationError(
+                "Start date must be earlier than end date."
+            )
+        return data
+
+
+class DashboardSerializer(serializers.Serializer):
+    """
+    Window of the dashboard: meals starting in [start_date, end_date), of at
+    most MANZ_DASHBOARD_MAX_DAYS since every recipe is loaded with it.
+    """
+
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+
+    def validate(self, data):
+        if data["start_date"] >= data["end_date"]:
+            raise serializers.ValidationError(
+                "Start date must be earlier than end date."
+            )
+        max_days = settings.MANZ_DASHBOARD_MAX_DAYS
+        if data["end_date"] - data["start_date"] > timedelta(days=max_days):
+            raise serializers.ValidationError(
+                f"The window must not exceed {max_days} days."
+            )
+        return data
+
+
+class MealExportSerializer(serializers.Serializer):
+    """Window of the meals export, open on the side of a missing date."""
+
+    start_date = serializers.DateTimeField(required=False)
+    end_date = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if data.keys() >= {"start_date", "end_date"} and (
+            data["start_date"] >= data["end_date"]
+        ):
+            raise serializers.ValidationError(
+                "Start date must be earlier than end date."
+            )
+        return data
+
+
+class RecurrenceSerializer(serializers.Serializer):
+    frequency = serializers.ChoiceField(choices=["daily", "weekly"])
+    interval = serializers.IntegerField(min_value=1, default=1)
+    count = serializers.IntegerField(min_value=1, required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if ("count" in data) == ("until" in data):
+            raise serializers.ValidationError("Provide either 'count' or 'until'.")
+        return data
+
+
+class MealRecurrenceSerializer(serializers.Serializer):
+    """
+    Describe a meal repeated daily or weekly, from its first occurrence.
+    """
+
+    recipe_id = serializers.IntegerField()
+    start_date = serializers.DateTimeField()
+    end_date = serializers.DateTimeField()
+    recurrence = RecurrenceSerializer()
+
+    def validate(self, data):
+        recurrence = data["recurrence"]
+        if "until" in recurrence and recurrence["until"] < data["start_date"]:
+            raise serializers.ValidationError(
+                "The recurrence must end after the first meal."
+            )
+        if len(self._expand(data)) > settings.MANZ_MAX_MEALS_PER_REQUEST:
+            raise serializers.ValidationError(
+                "Cannot schedule more than "
+                f"{settings.MANZ_MAX_MEALS_PER_REQUEST} meals at once."
+            )
+        return data
+
+    def _expand(self, data):
+        recurrence = data["recurrence"]
+        days = 7 if recurrence["frequency"] == "weekly" else 1
+        step = timedelta(days=days * recurrence["interval"])
+        duration = data["end_date"] - data["start_date"]
+        # Stop one past the limit so validate() can reject longer recurrences.
+        max_meals = settings.MANZ_MAX_MEALS_PER_REQUEST + 1
+        count = min(recurrence.get("count", max_meals), max_meals)
+
+        meals = []
+        start_date = data["start_date"]
+        while len(meals) < count:
+            if "until" in recurrence and start_date > recurrence["until"]:
+                break
+            meals.append(
+                {
+                    "recipe_id": data["recipe_id"],
+                    "start_date": start_date,
+                    "end_date": start_date + duration,
+                }
+            )
+            start_date += step
+        return meals
+
+    def get_meals(self):
+        """Return one MealSerializer payload per occurrence."""
+        return self._expand(self.validated_data)
+
+
+class RecurringMealSerializer(TimedDataMixin, serializers.ModelSerializer):
+    """
+    Meal repeated daily or weekly, forever or up to a count or a date, except
+    on the start dates listed in `exceptions`.
+    """
+
+    recipe_id = serializers.IntegerField()
+    exceptions = serializers.ListField(
+        child=serializers.DateTimeField(), required=False
+    )
+
+    class Meta:
+        model = RecurringMeal
+        fields = [
+            "id",
+            "recipe_id",
+            "start_date",
+            "end_date",
+            "frequency",
+            "interval",
+            "count",
+            "until",
+            "exceptions",
+        ]
+        extra_kwargs = {"interval": {"min_value": 1}, "count": {"min_value": 1}}
+        list_serializer_class = TimedListSerializer
+
+    def validate_recipe_id(self, value):
+        user = self.context["request"].user
+        if not Recipe.objects.filter(user=user, id=value).exists():
+            raise serializers.ValidationError(
+                "The selected recipe does not belong to the user."
+            )
+        return value
+
+    def validate_exceptions(self, value):
+        # Stored in UTC, to be compared with the expanded start dates.
+        return sorted(
+            {date.astimezone(zoneinfo.ZoneInfo("UTC")).isoformat() for date in value}
+        )
+
+    def validate(self, data):
+        # A partial update is checked against the rest of the rule.
+        rule = {
+            field: getattr(self.instance, field)
+            for field in ["start_date", "end_date", "count", "until"]
+            if self.instance is not None
+        }
+        rule.update(data)
+
+        if rule["start_date"] >= rule["end_date"]:
+            raise serializers.ValidationError(
+                "Start date must be earlier than end date."
+            )
+        if rule.get("count") is not None and rule.get("until") is not None:
+            raise serializers.ValidationError("Provide either 'count' or 'until'.")
+        if rule.get("until") is not None and rule["until"] < rule["start_date"]:
+            raise serializers.ValidationError(
+                "The recurrence must end after the first meal."
+            )
+        return data
+
+    def create(self, validated_data):
+        user = self.context["request"].user
+        return RecurringMeal.objects.create(user=user, **validated_data)
 
 
 class FetchUserRecipeItemsSerializer(serializers.Serializer):
     user = serializers.HiddenField(default=serializers.CurrentUserDefault())
+    start_date = serializers.DateTimeField(required=False)
     end_date = serializers.DateTimeField()
+    breakdown = serializers.BooleanField(default=False)
 
     def validate_end_date(self, value):
         if value <= now():
             raise serializers.ValidationError("End date must be in the future.")
         return value
 
+    def validate(self, data):
+        start_date = data.get("start_date")
+        if start_date is not None and start_date >= data["end_date"]:
+            raise serializers.ValidationError(
+                "Start date must be earlier than end date."
+            )
+        return data
+
+    def get_job_payload(self):
+        """Validated data as the payload of a shopping_list job."""
+        start_date = self.validated_data.get("start_date")
+        return {
+            "end_date": self.validated_data["end_date"].isoformat(),
+            "start_date": start_date.isoformat() if start_date else None,
+            "breakdown": self.validated_data["breakdown"],
+        }
+
     def get_user_recipe_items(self):
         user = self.context["request"].user
-        end_date = self.validated_data.get("end_date")
 
-        # Filter meals belonging to the user, ending before the specified date
-        meals = Meal.objects.filter(user=user, start_date__lte=end_date)
-        recipe_ids = meals.values_list("recipe_id", flat=True)
+        return get_cached_shopping_list(
+            user,
+            self.validated_data["end_date"],
+            start_date=self.validated_data.get("start_date"),
+            breakdown=self.validated_data["breakdown"],
+        )
+
 
-        # Fetch all RecipeItems belonging to the user's recipes
-        recipe_items = RecipeItem.objects.filter(recipe_id__in=recipe_ids)
-        return UserRecipeItemSerializer(recipe_items, many=True).data
+class JobSerializer(TimedDataMixin, serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ["id", "kind", "status", "created_at", "started_at", "finished_at"]
+        list_serializer_class = TimedListSerializer
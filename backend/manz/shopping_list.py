@@ -0,0 +1,275 @@
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max, Min, Sum
+
+from .models import RecipeItem
+from .recurrence import (
+    TooManyOccurrences,
+    merge_shopping_list_rows,
+    recurring_shopping_list_rows,
+    row_order,
+    rules_in_window,
+)
+from .units import (
+    base_unit_expression,
+    convert_to_base,
+    display_unit,
+    factor_expression,
+    render_quantity,
+    unit_key,
+)
+from .versioning import aget_user_version, get_user_version
+
+# Number of windows per user kept up to date by the eager rebuild.
+REBUILT_WINDOWS = 5
+
+
+def shopping_list_rows(user, end_date, start_date=None, breakdown=False):
+    """
+    Grouped `values()` queryset behind get_shopping_list(), one row per item
+    and base unit, or per item, base unit and recipe for a breakdown.
+
+    Quantities are converted to the base unit of their dimension in the
+    query itself (see manz.units), so the whole row set is summed at once.
+    """
+    # Every lookup goes in the same filter() call so they all apply to the
+    # same meal row: each RecipeItem is joined once per matching meal.
+    meal_filters = {
+        "recipe__meals__user": user,
+        "recipe__meals__start_date__lte": end_date,
+    }
+    if start_date is not None:
+        meal_filters["recipe__meals__start_date__gte"] = start_date
+
+    recipe_items = (
+        RecipeItem.objects.filter(**meal_filters)
+        .annotate(unit_key=unit_key("item__quantity_type"))
+        .annotate(base_unit=base_unit_expression("unit_key", "item__quantity_type"))
+    )
+    aggregates = {
+        "quantity": Sum(F("quantity") * factor_expression("unit_key")),
+        "first_unit": Min("unit_key"),
+        "last_unit": Max("unit_key"),
+    }
+
+    if not breakdown:
+        return (
+            recipe_items.values("item__name", "base_unit")
+            .annotate(**aggregates)
+            .order_by("item__name", "base_unit")
+        )
+
+    return (
+        recipe_items.values("item__name", "base_unit", "recipe_id", "recipe__title")
+        .annotate(**aggregates, meals=Count("recipe__meals", distinct=True))
+        .order_by("item__name", "base_unit", "recipe__title", "recipe_id")
+    )
+
+
+def shopping_list_entries(rows):
+    """Yield the shopping list of rows grouped without breakdown."""
+    for row in rows:
+        unit = display_unit(
+            row["base_unit"], row["quantity"], (row["first_unit"], row["last_unit"])
+        )
+        yield {
+            "item_name": row["item__name"],
+            "quantity": render_quantity(row["quantity"], unit),
+            "quantity_type": unit.symbol if unit else row["base_unit"],
+        }
+
+
+def shopping_list_of_meals(meals):
+    """
+    Shopping list of meals loaded with their recipe and its prefetched
+    items, summed in memory the way shopping_list_rows() sums in the
+    database, so without any query.
+    """
+    rows = {}
+    for meal in meals:
+        for recipe_item in meal.recipe.recipe_items.all():
+            key, base_unit, factor = convert_to_base(recipe_item.item.quantity_type)
+            row = rows.setdefault(
+                (recipe_item.item.name, base_unit),
+                {
+                    "item__name": recipe_item.item.name,
+                    "base_unit": base_unit,
+                    "quantity": 0.0,
+                    "first_unit": key,
+                    "last_unit": key,
+                },
+            )
+            row["quantity"] += recipe_item.quantity * factor
+            row["first_unit"] = min(row["first_unit"], key)
+            row["last_unit"] = max(row["last_unit"], key)
+    return list(shopping_list_entries(sorted(rows.values(), key=row_order())))
+
+
+def _shopping_list_from_rows(rows, breakdown):
+    if not breakdown:
+        return list(shopping_list_entries(rows))
+
+    shopping_list = {}
+    for row in rows:
+        key = (row["item__name"], row["base_unit"])
+        entry = shopping_list.setdefault(
+            key,
+            {
+                "item_name": row["item__name"],
+                "quantity": 0,
+                "quantity_type": row["base_unit"],
+                "recipes": [],
+                "source_units": set(),
+            },
+        )
+        entry["quantity"] += row["quantity"]
+        entry["source_units"].update((row["first_unit"], row["last_unit"]))
+        entry["recipes"].append(
+            {
+                "recipe_id": row["recipe_id"],
+                "recipe_title": row["recipe__title"],
+                "meals": row["meals"],
+                "quantity": row["quantity"],
+            }
+        )
+
+    # Every recipe's share is shown in the unit of the item's total.
+    for entry in shopping_list.values():
+        unit = display_unit(
+            entry["quantity_type"], entry["quantity"], entry.pop("source_units")
+        )
+        entry["quantity"] = render_quantity(entry["quantity"], unit)
+        if unit:
+            entry["quantity_type"] = unit.symbol
+        for recipe in entry["recipes"]:
+            recipe["quantity"] = render_quantity(recipe["quantity"], unit)
+    return list(shopping_list.values())
+
+
+def recurring_rows(user, end_date, start_date=None, breakdown=False):
+    """Shopping list rows of the user's recurring meals in the window."""
+    rules = rules_in_window(user, start_date, end_date)
+    return recurring_shopping_list_rows(rules, end_date, start_date, breakdown)
+
+
+def _with_recurring_rows(rows, extra_rows, breakdown):
+    if not extra_rows:
+        return rows
+    return sorted(
+        merge_shopping_list_rows(rows, extra_rows, breakdown),
+        key=row_order(breakdown),
+    )
+
+
+def get_shopping_list(user, end_date, start_date=None, breakdown=False):
+    """
+    Compute the items a user needs to cook every meal scheduled up to `end_date`.
+
+    Quantities are summed per item name and quantity type, and a recipe counts
+    once for every meal it is scheduled in, stored or recurring. Stored meals
+    come from a single grouped query; the per-recipe breakdown is only
+    returned when requested.
+    """
+    rows = shopping_list_rows(user, end_date, start_date, breakdown)
+    extra_rows = recurring_rows(user, end_date, start_date, breakdown)
+    return _shopping_list_from_rows(
+        _with_recurring_rows(rows, extra_rows, breakdown), breakdown
+    )
+
+
+async def aget_shopping_list(user, end_date, start_date=None, breakdown=False):
+    """Async version of get_shopping_list()."""
+    rows = shopping_list_rows(user, end_date, start_date, breakdown)
+    rows = [row async for row in rows]
+    extra_rows = await sync_to_async(recurring_rows)(
+        user, end_date, start_date, breakdown
+    )
+    return _shopping_list_from_rows(
+        _with_recurring_rows(rows, extra_rows, breakdown), breakdown
+    )
+
+
+def _shopping_list_key(user_id, version, window):
+    return f"manz:shopping-list:{user_id}:{version}:{':'.join(window)}"
+
+
+def _windows_key(user_id):
+    return f"manz:shopping-list-windows:{user_id}"
+
+
+def _window(end_date, start_date, breakdown):
+    return (
+        end_date.isoformat(),
+        start_date.isoformat() if start_date else "",
+        "breakdown" if breakdown else "",
+    )
+
+
+def get_cached_shopping_list(user, end_date, start_date=None, breakdown=False):
+    """
+    Same as get_shopping_list, materialized in the cache per user and window.
+
+    Entries are keyed on the user's data version (see manz.versioning), which
+    changes whenever one of their meals or recipes does.
+    """
+    window = _window(end_date, start_date, breakdown)
+    key = _shopping_list_key(user.id, get_user_version(user.id), window)
+
+    shopping_list = cache.get(key)
+    if shopping_list is None:
+        shopping_list = get_shopping_list(user, end_date, start_date, breakdown)
+        cache.set(key, shopping_list, settings.MANZ_SHOPPING_LIST_CACHE_TTL)
+        if settings.MANZ_SHOPPING_LIST_EAGER_REBUILD:
+            _remember_window(user.id, window)
+    return shopping_list
+
+
+async def aget_cached_shopping_list(user, end_date, start_date=None, breakdown=False):
+    """Async version of get_cached_shopping_list()."""
+    window = _window(end_date, start_date, breakdown)
+    key = _shopping_list_key(user.id, await aget_user_version(user.id), window)
+
+    shopping_list = await cache.aget(key)
+    if shopping_list is None:
+        shopping_list = await aget_shopping_list(user, end_date, start_date, breakdown)
+        await cache.aset(key, shopping_list, settings.MANZ_SHOPPING_LIST_CACHE_TTL)
+        if settings.MANZ_SHOPPING_LIST_EAGER_REBUILD:
+            await sync_to_async(_remember_window)(user.id, window)
+    return shopping_list
+
+
+def _remember_window(user_id, window):
+    windows = [w for w in cache.get(_windows_key(user_id), []) if w != window]
+    windows = [window, *windows][:REBUILT_WINDOWS]
+    cache.set(_windows_key(user_id), windows, settings.MANZ_SHOPPING_LIST_CACHE_TTL)
+
+
+def rebuild_shopping_lists(user_id):
+    """
+    Recompute the windows the user requested last, when eager rebuilds are
+    enabled, so the next read after a write is served from the cache.
+    """
+    if not settings.MANZ_SHOPPING_LIST_EAGER_REBUILD:
+        return
+
+    version = get_user_version(user_id)
+    for window in cache.get(_windows_key(user_id), []):
+        end_date, start_date, breakdown = window
+        try:
+            shopping_list = get_shopping_list(
+                user_id,
+                datetime.fromisoformat(end_date),
+                datetime.fromisoformat(start_date) if start_date else None,
+                bool(breakdown),
+            )
+        except TooManyOccurrences:
+            # A new recurring meal filled the window: reading it answers 400.
+            continue
+        cache.set(
+            _shopping_list_key(user_id, version, window),
+            shopping_list,
+            settings.MANZ_SHOPPING_LIST_CACHE_TTL,
+        )
@@ -0,0 +1,99 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache_key
+from .metrics import record_query
+from .models import Item, Meal, Recipe, RecipeItem, RecurringMeal
+from .search import item_index
+from .versioning import items_changed, user_data_changed
+
+_user_data_receivers_skipped = ContextVar(
+    "manz_user_data_receivers_skipped", default=False
+)
+
+
+@contextmanager
+def skip_user_data_receivers():
+    """
+    Skip the receivers invalidating a user's data below, for batch writes
+    that call user_data_changed() once rather than once per row.
+    """
+    token = _user_data_receivers_skipped.set(True)
+    try:
+        yield
+    finally:
+        _user_data_receivers_skipped.reset(token)
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    # The wrappers outlive the underlying connection, which is created again
+    # after being closed.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def forget_tokens_of_saved_user(sender, instance, created, **kwargs):
+    # The cached token holds a copy of the user: drop it whenever the user
+    # changes, so a deactivated user is rejected on the next request.
+    if created:
+        return
+    keys = Token.objects.filter(user=instance).values_list("key", flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+@receiver(post_save, sender=Meal)
+@receiver(post_delete, sender=Meal)
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_save, sender=RecurringMeal)
+@receiver(post_delete, sender=RecurringMeal)
+def meal_or_recipe_changed(sender, instance, **kwargs):
+    if _user_data_receivers_skipped.get():
+        return
+    user_data_changed(instance.user_id)
+
+
+@receiver(post_save, sender=RecipeItem)
+@receiver(post_delete, sender=RecipeItem)
+def recipe_item_changed(sender, instance, **kwargs):
+    if _user_data_receivers_skipped.get():
+        return
+    if RecipeItem.recipe.is_cached(instance):
+        user_id = instance.recipe.user_id
+    else:
+        user_id = (
+            Recipe.objects.filter(id=instance.recipe_id)
+            .values_list("user_id", flat=True)
+            .first()
+        )
+    # The recipe is gone when it was deleted with its items, and its own
+    # post_delete already invalidated the user's data.
+    if user_id is not None:
+        user_data_changed(user_id)
+
+
+@receiver(post_save, sender=Item)
+def item_saved(sender, instance, **kwargs):
+    entry = item_index.entry(instance)
+    items_changed(lambda version: item_index.item_saved(entry, version))
+
+
+@receiver(post_delete, sender=Item)
+def item_deleted(sender, instance, **kwargs):
+    # The instance loses its id once deleted.
+    item_id = instance.id
+    items_changed(lambda version: item_index.item_deleted(item_id, version))
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryCountMixin:
+    """
+    Assertions to catch N+1 regressions: an endpoint must run the same number
+    of queries whatever the amount of data it has to return.
+    """
+
+    query_count_sizes = (1, 5, 20)
+
+    def assertConstantQueryCount(self, grow, request, sizes=None):
+        """
+        Call `grow(size)` to bring the dataset to each size, then `request()`,
+        and assert every request ran the same number of queries. The cache is
+        cleared before each request, so queries are counted cold.
+
+        Returns the query count so callers can also pin its exact value.
+        """
+        counts = {}
+        for size in sizes or self.query_count_sizes:
+            grow(size)
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = request()
+            self.assertLess(response.status_code, 400, response.content)
+            counts[size] = len(context.captured_queries)
+
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            f"Query count depends on the data size: {counts}",
+        )
+        return next(iter(counts.values()))
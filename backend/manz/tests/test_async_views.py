@@ -0,0 +1,85 @@
+from django.test import TestCase, Client, AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Recipe, Item, RecipeItem, Meal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+
+
+class AsyncReadViews(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {"Authorization": f"Token {self.john_token.key}"}
+
+        egg_item = Item.objects.create(name="egg", quantity_type="units")
+        omelette_recipe = Recipe.objects.create(title="Omelette", user=self.john_user)
+        RecipeItem.objects.create(recipe=omelette_recipe, item=egg_item, quantity=3)
+        now = make_aware(datetime.now())
+        Meal.objects.create(
+            user=self.john_user,
+            recipe=omelette_recipe,
+            start_date=now,
+            end_date=now + timedelta(hours=1),
+        )
+        start_date = (now - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        end_date = (now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.window = f"?start_date={start_date}&end_date={end_date}"
+
+    def _assert_same_response(self, sync_url, async_url):
+        sync_response = Client().get(sync_url, headers=self.john_headers)
+        async_response = Client().get(async_url, headers=self.john_headers)
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_should_list_recipes_like_the_sync_view(self):
+        self._assert_same_response(
+            reverse("manz:api-recipe"), reverse("manz:api-async-recipe")
+        )
+
+    def test_should_list_meals_like_the_sync_view(self):
+        self._assert_same_response(
+            reverse("manz:api-schedule") + self.window,
+            reverse("manz:api-async-schedule") + self.window,
+        )
+
+    def test_should_list_items_like_the_sync_view(self):
+        self._assert_same_response(
+            reverse("manz:api-item") + self.window + "&breakdown=true",
+            reverse("manz:api-async-item") + self.window + "&breakdown=true",
+        )
+
+    async def test_should_serve_recipes_from_an_async_client(self):
+        response = await AsyncClient().get(
+            reverse("manz:api-async-recipe"), headers=self.john_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]["recipe_items"][0]["quantity"], 3)
+
+    async def test_should_reject_an_invalid_token(self):
+        response = await AsyncClient().get(
+            reverse("manz:api-async-recipe"), headers={"Authorization": "Token nope"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_should_require_both_dates_for_the_schedule(self):
+        response = Client().get(
+            reverse("manz:api-async-schedule"), headers=self.john_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_should_reject_an_invalid_date_for_the_schedule(self):
+        for url in [reverse("manz:api-async-schedule"), reverse("manz:api-schedule")]:
+            response = Client().get(
+                url + "?start_date=foo&end_date=2025-01-01T00:00:00Z",
+                headers=self.john_headers,
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("Invalid date format", response.json()["error"])
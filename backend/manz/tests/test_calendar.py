@@ -0,0 +1,150 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Recipe, Item, RecipeItem, Meal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime
+
+
+class CalendarView(TestCase):
+
+    def _get_calendar(self, start_date, end_date, **params):
+        return Client().get(
+            reverse("manz:api-calendar"),
+            {"start_date": start_date, "end_date": end_date, **params},
+            **self.john_headers,
+        )
+
+    def _days(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {
+            day["date"]: [meal["id"] for meal in day["meals"]]
+            for day in response.json()
+        }
+
+    def _schedule(self, start_date, end_date, recipe=None):
+        return Meal.objects.create(
+            user=self.john_user,
+            recipe=recipe or self.omelette,
+            start_date=datetime.fromisoformat(start_date),
+            end_date=datetime.fromisoformat(end_date),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        egg = Item.objects.create(name="egg", quantity_type="units")
+        self.omelette = Recipe.objects.create(title="Omelette", user=self.john_user)
+        RecipeItem.objects.create(recipe=self.omelette, item=egg, quantity=3)
+        self.soup = Recipe.objects.create(title="Soup", user=self.john_user)
+
+    def test_should_group_meals_by_day(self):
+        lunch = self._schedule("2025-01-01T12:00:00+00:00", "2025-01-01T13:00:00+00:00")
+        dinner = self._schedule(
+            "2025-01-01T19:00:00+00:00", "2025-01-01T20:00:00+00:00"
+        )
+        breakfast = self._schedule(
+            "2025-01-02T08:00:00+00:00", "2025-01-02T09:00:00+00:00"
+        )
+
+        response = self._get_calendar("2025-01-01T00:00:00Z", "2025-01-03T00:00:00Z")
+
+        self.assertEqual(
+            self._days(response),
+            {"2025-01-01": [lunch.id, dinner.id], "2025-01-02": [breakfast.id]},
+        )
+
+    def test_should_include_meals_overlapping_the_window(self):
+        started_before = self._schedule(
+            "2025-01-01T23:00:00+00:00", "2025-01-02T01:00:00+00:00"
+        )
+        self._schedule("2025-01-01T20:00:00+00:00", "2025-01-02T00:00:00+00:00")
+        self._schedule("2025-01-03T00:00:00+00:00", "2025-01-03T01:00:00+00:00")
+
+        response = self._get_calendar("2025-01-02T00:00:00Z", "2025-01-03T00:00:00Z")
+
+        self.assertEqual(self._days(response), {"2025-01-02": [started_before.id]})
+
+    def test_should_list_a_meal_on_every_day_it_overlaps(self):
+        meal = self._schedule("2025-01-01T23:00:00+00:00", "2025-01-02T01:00:00+00:00")
+
+        response = self._get_calendar("2025-01-01T00:00:00Z", "2025-01-03T00:00:00Z")
+
+        self.assertEqual(
+            self._days(response), {"2025-01-01": [meal.id], "2025-01-02": [meal.id]}
+        )
+
+    def test_should_group_by_day_in_the_requested_time_zone(self):
+        meal = self._schedule("2025-01-01T23:30:00+00:00", "2025-01-01T23:45:00+00:00")
+
+        response = self._get_calendar(
+            "2025-01-01T00:00:00", "2025-01-03T00:00:00", tz="Europe/Paris"
+        )
+
+        self.assertEqual(self._days(response), {"2025-01-02": [meal.id]})
+        self.assertEqual(
+            response.json()[0]["meals"][0]["start_date"], "2025-01-02T00:30:00+01:00"
+        )
+
+    def test_should_embed_the_recipe_and_its_ingredients(self):
+        self._schedule("2025-01-01T12:00:00+00:00", "2025-01-01T13:00:00+00:00")
+
+        response = self._get_calendar("2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z")
+
+        recipe = response.json()[0]["meals"][0]["recipe"]
+        self.assertEqual(recipe["title"], "Omelette")
+        self.assertEqual(recipe["recipe_items"][0]["item"]["name"], "egg")
+
+    def test_should_list_ingredients_in_the_order_of_the_recipe(self):
+        for name in ["salt", "butter"]:
+            item = Item.objects.create(name=name, quantity_type="grams")
+            RecipeItem.objects.create(recipe=self.omelette, item=item, quantity=10)
+        self._schedule("2025-01-01T12:00:00+00:00", "2025-01-01T13:00:00+00:00")
+
+        response = self._get_calendar("2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z")
+        recipe = Client().get(
+            reverse("manz:api-recipe-detail", args=[self.omelette.id]),
+            **self.john_headers,
+        )
+
+        recipe_items = response.json()[0]["meals"][0]["recipe"]["recipe_items"]
+        self.assertEqual(
+            [recipe_item["item"]["name"] for recipe_item in recipe_items],
+            ["egg", "salt", "butter"],
+        )
+        self.assertEqual(recipe_items, recipe.json()["recipe_items"])
+
+    def test_should_use_a_constant_number_of_queries(self):
+        for day in range(1, 29):
+            self._schedule(
+                f"2025-02-{day:02}T12:00:00+00:00",
+                f"2025-02-{day:02}T13:00:00+00:00",
+                recipe=self.omelette if day % 2 else self.soup,
+            )
+        self._get_calendar("2025-02-01T00:00:00Z", "2025-03-01T00:00:00Z")
+
+        # The token is cached: the meals and the recurring meals with their
+        # recipes, then the items.
+        with self.assertNumQueries(3):
+            response = self._get_calendar(
+                "2025-02-01T00:00:00Z", "2025-03-01T00:00:00Z"
+            )
+        self.assertEqual(len(response.json()), 28)
+
+    def test_should_reject_an_unknown_time_zone(self):
+        response = self._get_calendar(
+            "2025-01-01T00:00:00Z", "2025-01-02T00:00:00Z", tz="Mars/Olympus"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_should_reject_an_empty_window(self):
+        response = self._get_calendar("2025-01-02T00:00:00Z", "2025-01-01T00:00:00Z")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
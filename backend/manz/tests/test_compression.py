@@ -0,0 +1,170 @@
+import gzip
+import json
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from manz import renderers
+from manz.middleware import accepted_encodings, brotli
+from manz.models import Recipe
+from rest_framework.authtoken.models import Token
+
+
+class JsonRendering(TestCase):
+
+    def test_should_render_like_drf(self):
+        data = {
+            "title": "Crêpe  ",
+            "quantity": 1.5,
+            1: [None, True],
+        }
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_should_render_like_drf_without_orjson(self):
+        data = {"title": "Crêpe  ", "items": [1, 2.5]}
+        with mock.patch.object(renderers, "orjson", None):
+            self.assertEqual(renderers.dumps(data), JSONRenderer().render(data))
+
+    @skipUnless(renderers.orjson, "orjson is not installed")
+    def test_should_encode_with_orjson_like_drf(self):
+        data = {
+            "start_date": datetime(2025, 1, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            "day": date(2025, 1, 1),
+            "time": time(12, 30, 15, 123456),
+            "quantity": Decimal("2.50"),
+            "id": uuid.UUID(int=1),
+            "note": "one\u2028two\u2029",
+            2: {"items": [1.5, None, False]},
+        }
+        with mock.patch.object(
+            renderers.orjson, "dumps", wraps=renderers.orjson.dumps
+        ) as dumps:
+            content = renderers.dumps(data)
+
+        dumps.assert_called_once()
+        self.assertEqual(content, JSONRenderer().render(data))
+        self.assertIn(b"one\\u2028two\\u2029", content)
+
+    @skipUnless(renderers.orjson, "orjson is not installed")
+    def test_should_decode_with_orjson(self):
+        self.assertEqual(
+            renderers.loads(b'{"title": "Cr\\u00eape"}'), {"title": "Crêpe"}
+        )
+        with self.assertRaises(ValueError):
+            renderers.loads(b'{"title": ')
+
+
+@override_settings(MANZ_COMPRESSION_MIN_SIZE=1024)
+class ResponseCompression(TestCase):
+
+    def _get_recipes(self, **headers):
+        return self.client.get(
+            reverse("manz:api-recipe"), **self.john_headers, **headers
+        )
+
+    def _create_recipes(self, count):
+        Recipe.objects.bulk_create(
+            Recipe(title=f"Recipe {index}", user=self.john_user)
+            for index in range(count)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.client = Client()
+
+    def test_should_gzip_a_large_response(self):
+        self._create_recipes(50)
+
+        response = self._get_recipes(HTTP_ACCEPT_ENCODING="gzip, deflate")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(int(response["Content-Length"]), len(response.content))
+        recipes = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(recipes), 50)
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_should_prefer_brotli(self):
+        self._create_recipes(50)
+
+        response = self._get_recipes(HTTP_ACCEPT_ENCODING="gzip, br")
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        recipes = json.loads(brotli.decompress(response.content))
+        self.assertEqual(len(recipes), 50)
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_should_brotli_a_stream(self):
+        self._create_recipes(3)
+
+        response = self.client.get(
+            reverse(
+                "manz:api-export",
+                kwargs={"resource": "recipes", "export_format": "ndjson"},
+            ),
+            HTTP_ACCEPT_ENCODING="br",
+            **self.john_headers,
+        )
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        content = brotli.decompress(b"".join(response.streaming_content))
+        self.assertEqual(len(content.splitlines()), 3)
+
+    def test_should_not_compress_a_small_response(self):
+        self._create_recipes(1)
+
+        response = self._get_recipes(HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(len(response.json()), 1)
+
+    def test_should_not_compress_a_refused_encoding(self):
+        self._create_recipes(50)
+
+        response = self._get_recipes(HTTP_ACCEPT_ENCODING="gzip;q=0, identity")
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(len(response.json()), 50)
+
+    def test_should_answer_not_modified_with_the_weak_etag(self):
+        self._create_recipes(50)
+
+        response = self._get_recipes(HTTP_ACCEPT_ENCODING="gzip")
+        self.assertTrue(response["ETag"].startswith('W/"'))
+
+        response = self._get_recipes(
+            HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_should_reject_invalid_json(self):
+        response = self.client.post(
+            reverse("manz:api-recipe"),
+            data='{"title": ',
+            content_type="application/json",
+            **self.john_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_should_parse_accept_encoding_qualities(self):
+        self.assertEqual(
+            accepted_encodings("br;q=0.5, GZIP, deflate;q=0, identity;q=x"),
+            {"br", "gzip"},
+        )
@@ -0,0 +1,82 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Meal, Recipe
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+
+
+class ConditionalGet(TestCase):
+
+    def _create_user(self, username):
+        user = User.objects.create_user(
+            username=username, password="testpassword", email=f"{username}@a.com"
+        )
+        token = Token.objects.create(user=user)
+        return user, {"HTTP_AUTHORIZATION": f"Token {token.key}"}
+
+    def setUp(self):
+        cache.clear()
+        self.john_user, self.john_headers = self._create_user("john1")
+        self.alice_user, self.alice_headers = self._create_user("alice1")
+        self.recipe = Recipe.objects.create(title="Pancake", user=self.john_user)
+        self.recipe_url = reverse("manz:api-recipe")
+        now = make_aware(datetime.now())
+        start_date = (now - timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        end_date = (now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.schedule_url = (
+            reverse("manz:api-schedule")
+            + f"?start_date={start_date}&end_date={end_date}"
+        )
+
+    def _revalidate(self, url, response, headers):
+        return Client().get(url, HTTP_IF_NONE_MATCH=response["ETag"], **headers)
+
+    def test_should_answer_not_modified_without_queries(self):
+        response = Client().get(self.recipe_url, **self.john_headers)
+
+        with self.assertNumQueries(0):
+            response = self._revalidate(self.recipe_url, response, self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+
+    def test_should_send_the_body_again_once_the_data_changed(self):
+        response = Client().get(self.recipe_url, **self.john_headers)
+        Recipe.objects.create(title="Muffin", user=self.john_user)
+
+        response = self._revalidate(self.recipe_url, response, self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 2)
+
+    def test_should_not_be_invalidated_by_another_user(self):
+        response = Client().get(self.recipe_url, **self.john_headers)
+        Recipe.objects.create(title="Muffin", user=self.alice_user)
+
+        response = self._revalidate(self.recipe_url, response, self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_should_validate_each_query_separately(self):
+        response = Client().get(self.recipe_url, **self.john_headers)
+        page_url = self.recipe_url + "?page_size=1"
+
+        response = self._revalidate(page_url, response, self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_answer_not_modified_for_an_unchanged_schedule(self):
+        response = Client().get(self.schedule_url, **self.john_headers)
+
+        response = self._revalidate(self.schedule_url, response, self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        Meal.objects.create(
+            user=self.john_user,
+            recipe=self.recipe,
+            start_date=make_aware(datetime.now()),
+            end_date=make_aware(datetime.now() + timedelta(hours=1)),
+        )
+        response = self._revalidate(self.schedule_url, response, self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
@@ -0,0 +1,137 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Recipe, Item, RecipeItem, Meal, RecurringMeal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+from .helpers import QueryCountMixin
+
+
+class DashboardView(QueryCountMixin, TestCase):
+
+    def _get(self, url, **params):
+        return self.client.get(reverse(url), params, **self.john_headers)
+
+    def _window(self):
+        return {
+            "start_date": self.start_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end_date": self.end_date.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+
+    def _schedule(self, recipe, hours):
+        return Meal.objects.create(
+            user=self.john_user,
+            recipe=recipe,
+            start_date=self.start_date + timedelta(hours=hours),
+            end_date=self.start_date + timedelta(hours=hours + 1),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.client = Client()
+        self.start_date = make_aware(datetime.now()).replace(microsecond=0)
+        self.end_date = self.start_date + timedelta(days=7)
+
+        egg = Item.objects.create(name="Egg", quantity_type="units")
+        flour = Item.objects.create(name="Flour", quantity_type="kg")
+        milk = Item.objects.create(name="Milk", quantity_type=" ML")
+        self.omelette = Recipe.objects.create(title="Omelette", user=self.john_user)
+        RecipeItem.objects.create(recipe=self.omelette, item=egg, quantity=3)
+        self.pancake = Recipe.objects.create(title="Pancake", user=self.john_user)
+        RecipeItem.objects.create(recipe=self.pancake, item=flour, quantity=0.25)
+        RecipeItem.objects.create(recipe=self.pancake, item=milk, quantity=500)
+        RecipeItem.objects.create(recipe=self.pancake, item=egg, quantity=2)
+
+    def test_should_match_the_separate_endpoints(self):
+        self._schedule(self.omelette, 2)
+        self._schedule(self.pancake, 26)
+        self._schedule(self.pancake, 50)
+        RecurringMeal.objects.create(
+            user=self.john_user,
+            recipe=self.omelette,
+            start_date=self.start_date + timedelta(hours=8),
+            end_date=self.start_date + timedelta(hours=9),
+            frequency="daily",
+            count=3,
+        )
+        # Outside the window.
+        self._schedule(self.pancake, 24 * 8)
+
+        response = self._get("manz:api-dashboard", **self._window())
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        dashboard = response.json()
+        self.assertEqual(dashboard["recipes"], self._get("manz:api-recipe").json())
+        self.assertEqual(
+            dashboard["schedule"],
+            self._get("manz:api-schedule", **self._window()).json(),
+        )
+        self.assertEqual(
+            dashboard["shopping_list"],
+            self._get("manz:api-item", **self._window()).json(),
+        )
+        self.assertEqual(
+            dashboard["shopping_list"],
+            [
+                {"item_name": "Egg", "quantity": 16.0, "quantity_type": "units"},
+                {"item_name": "Flour", "quantity": 500.0, "quantity_type": "g"},
+                {"item_name": "Milk", "quantity": 1.0, "quantity_type": "l"},
+            ],
+        )
+
+    def test_should_require_a_window(self):
+        response = self._get(
+            "manz:api-dashboard", start_date=self._window()["start_date"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self._get(
+            "manz:api-dashboard",
+            start_date=self._window()["end_date"],
+            end_date=self._window()["start_date"],
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(MANZ_DASHBOARD_MAX_DAYS=7)
+    def test_should_cap_the_window(self):
+        start_date = self._window()["start_date"]
+        week = (self.start_date + timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        response = self._get("manz:api-dashboard", start_date=start_date, end_date=week)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self._get(
+            "manz:api-dashboard", start_date=start_date, end_date="9999-12-31T00:00:00Z"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_should_answer_not_modified_while_the_data_is_unchanged(self):
+        response = self._get("manz:api-dashboard", **self._window())
+
+        response = self.client.get(
+            reverse("manz:api-dashboard"),
+            self._window(),
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            **self.john_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_should_run_a_constant_number_of_queries(self):
+        def grow(size):
+            for hours in range(Meal.objects.count(), size):
+                self._schedule(self.pancake if hours % 2 else self.omelette, hours)
+
+        query_count = self.assertConstantQueryCount(
+            grow, lambda: self._get("manz:api-dashboard", **self._window())
+        )
+        # Token, recipes, their items, meals and recurring meals.
+        self.assertEqual(query_count, 5)
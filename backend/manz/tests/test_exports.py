@@ -0,0 +1,212 @@
+import csv
+import gzip
+import io
+import json
+from django.test import TestCase, Client, AsyncClient
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Recipe, Item, RecipeItem, Meal, RecurringMeal
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+from asgiref.sync import sync_to_async
+
+
+class Exports(TestCase):
+
+    def _export(self, resource, export_format, query=""):
+        url = reverse(
+            "manz:api-export",
+            kwargs={"resource": resource, "export_format": export_format},
+        )
+        return Client().get(url + query, **self.john_headers)
+
+    def _content(self, response):
+        return b"".join(response.streaming_content).decode()
+
+    async def _aexport(self, resource, export_format, query="", headers=None):
+        url = reverse(
+            "manz:api-export",
+            kwargs={"resource": resource, "export_format": export_format},
+        )
+        headers = {"Authorization": f"Token {self.john_token.key}", **(headers or {})}
+        return await AsyncClient().get(url + query, headers=headers)
+
+    async def _acontent(self, response):
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    def setUp(self):
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.jane_user = User.objects.create_user(
+            username="jane1", password="testpassword", email="jane@example.com"
+        )
+        self.now = make_aware(datetime.now())
+
+        egg = Item.objects.create(name="egg", quantity_type="units")
+        milk = Item.objects.create(name="milk", quantity_type="ml")
+        self.omelette = Recipe.objects.create(title="Omelette", user=self.john_user)
+        RecipeItem.objects.create(recipe=self.omelette, item=egg, quantity=3)
+        RecipeItem.objects.create(recipe=self.omelette, item=milk, quantity=50)
+        self.toast = Recipe.objects.create(title="Toast", user=self.john_user)
+        Recipe.objects.create(title="Jane's soup", user=self.jane_user)
+        self.meal = Meal.objects.create(
+            user=self.john_user,
+            recipe=self.omelette,
+            start_date=self.now,
+            end_date=self.now + timedelta(hours=1),
+        )
+
+    def test_should_stream_recipes_as_ndjson(self):
+        response = self._export("recipes", "ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        recipes = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([recipe["title"] for recipe in recipes], ["Omelette", "Toast"])
+        self.assertEqual(
+            [item["item"]["name"] for item in recipes[0]["recipe_items"]],
+            ["egg", "milk"],
+        )
+        self.assertEqual(recipes[1]["recipe_items"], [])
+
+    def test_should_stream_recipes_as_csv(self):
+        response = self._export("recipes", "csv")
+
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertIn("attachment", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0][:2], ["recipe_id", "title"])
+        self.assertEqual(
+            [row[1] for row in rows[1:]], ["Omelette", "Omelette", "Toast"]
+        )
+
+    def test_should_stream_meals(self):
+        response = self._export("meals", "ndjson")
+
+        meals = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(meals), 1)
+        self.assertEqual(meals[0]["id"], self.meal.id)
+        self.assertEqual(meals[0]["recipe_title"], "Omelette")
+
+    def _rule(self, **fields):
+        return RecurringMeal.objects.create(
+            user=self.john_user,
+            recipe=self.toast,
+            start_date=self.now - timedelta(days=1),
+            end_date=self.now - timedelta(days=1) + timedelta(hours=1),
+            frequency="daily",
+            **fields,
+        )
+
+    def test_should_stream_the_occurrences_of_recurring_meals(self):
+        rule = self._rule(count=3)
+
+        response = self._export("meals", "ndjson")
+
+        meals = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(
+            [(meal["id"], meal["recurring_meal_id"]) for meal in meals],
+            [(None, rule.id), (self.meal.id, None), (None, rule.id), (None, rule.id)],
+        )
+        self.assertEqual(meals[0]["recipe_title"], "Toast")
+
+    async def test_should_stream_the_same_occurrences_under_asgi(self):
+        await sync_to_async(self._rule)(count=3)
+
+        for export_format in ["ndjson", "csv"]:
+            response = await self._aexport("meals", export_format)
+            sync_response = await sync_to_async(self._export)("meals", export_format)
+            self.assertEqual(
+                (await self._acontent(response)).decode(),
+                await sync_to_async(self._content)(sync_response),
+            )
+
+    def test_should_export_the_meals_of_a_window(self):
+        rule = self._rule()
+        end_date = (self.now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        response = self._export("meals", "csv", f"?end_date={end_date}")
+
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0][-1], "recurring_meal_id")
+        self.assertEqual(
+            [row[-1] for row in rows[1:]], [str(rule.id), "", str(rule.id)]
+        )
+
+    def test_should_reject_an_endless_recurring_meal_without_end_date(self):
+        self._rule()
+
+        response = self._export("meals", "ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(response.streaming)
+
+    def test_should_stream_the_shopping_list(self):
+        tomorrow = (self.now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        response = self._export("shopping-list", "csv", f"?end_date={tomorrow}")
+
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(
+            rows,
+            [
+                ["item_name", "quantity", "quantity_type"],
+                ["egg", "3.0", "units"],
+                ["milk", "50.0", "ml"],
+            ],
+        )
+
+    async def test_should_stream_asynchronously_under_asgi(self):
+        tomorrow = (self.now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        for resource, query in [
+            ("recipes", ""),
+            ("meals", ""),
+            ("shopping-list", f"?end_date={tomorrow}"),
+        ]:
+            for export_format in ["ndjson", "csv"]:
+                response = await self._aexport(resource, export_format, query)
+
+                self.assertTrue(response.is_async)
+                sync_response = await sync_to_async(self._export)(
+                    resource, export_format, query
+                )
+                self.assertEqual(
+                    (await self._acontent(response)).decode(),
+                    await sync_to_async(self._content)(sync_response),
+                )
+
+    async def test_should_compress_an_async_stream(self):
+        response = await self._aexport(
+            "recipes", "ndjson", headers={"Accept-Encoding": "gzip"}
+        )
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        recipes = gzip.decompress(await self._acontent(response)).splitlines()
+        self.assertEqual(len(recipes), 2)
+
+    def test_should_require_an_end_date_for_the_shopping_list(self):
+        response = self._export("shopping-list", "ndjson")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_should_ignore_the_accept_header(self):
+        url = reverse(
+            "manz:api-export", kwargs={"resource": "meals", "export_format": "csv"}
+        )
+        response = Client().get(url, HTTP_ACCEPT="text/csv", **self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_require_authentication(self):
+        response = Client().get(
+            reverse(
+                "manz:api-export",
+                kwargs={"resource": "recipes", "export_format": "csv"},
+            )
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -66,3 +66,119 @@ class ItemView(TestCase):
         )
         return_items = response.json()
         self.assertEqual(len(return_items), 3)
+
+    def _get_items(self, url_parameters):
+        response = Client().get(
+            self.item_url + url_parameters,
+            content_type="application/json",
+            **self.john_headers,
+        )
+        return response.json()
+
+    def test_should_count_a_recipe_once_per_scheduled_meal(self):
+        start_date = datetime.now()
+        end_date = start_date + timedelta(hours=1)
+        self._schedule_recipe(
+            start_date, end_date, self.john_scrambled_eggs_recipe, self.john_user
+        )
+        self._schedule_recipe(
+            start_date + timedelta(hours=2),
+            end_date + timedelta(hours=2),
+            self.john_scrambled_eggs_recipe,
+            self.john_user,
+        )
+        tomorrow = datetime.now() + timedelta(days=1)
+
+        return_items = self._get_items(
+            f"?end_date={tomorrow.strftime("%Y-%m-%dT%H:%M:%SZ")}"
+        )
+        quantities = {item["item_name"]: item["quantity"] for item in return_items}
+        self.assertEqual(quantities, {"butter": 20, "egg": 4, "salt": 2})
+
+    def test_should_sum_the_same_item_across_recipes(self):
+        pancake_recipe = self._create_recipe("Pancake", "Fluffy", self.john_user)
+        self._create_recipe_item(pancake_recipe, Item.objects.get(name="egg"), 3)
+        start_date = datetime.now()
+        end_date = start_date + timedelta(hours=1)
+        self._schedule_recipe(
+            start_date, end_date, self.john_scrambled_eggs_recipe, self.john_user
+        )
+        self._schedule_recipe(start_date, end_date, pancake_recipe, self.john_user)
+        tomorrow = datetime.now() + timedelta(days=1)
+
+        return_items = self._get_items(
+            f"?end_date={tomorrow.strftime("%Y-%m-%dT%H:%M:%SZ")}"
+        )
+        eggs = [item for item in return_items if item["item_name"] == "egg"]
+        self.assertEqual(
+            eggs, [{"item_name": "egg", "quantity": 5, "quantity_type": "units"}]
+        )
+
+    def test_should_ignore_meals_before_the_start_date(self):
+        last_week = datetime.now() - timedelta(days=7)
+        self._schedule_recipe(
+            last_week,
+            last_week + timedelta(hours=1),
+            self.john_scrambled_eggs_recipe,
+            self.john_user,
+        )
+        yesterday = datetime.now() - timedelta(days=1)
+        tomorrow = datetime.now() + timedelta(days=1)
+
+        return_items = self._get_items(
+            f"?start_date={yesterday.strftime("%Y-%m-%dT%H:%M:%SZ")}"
+            f"&end_date={tomorrow.strftime("%Y-%m-%dT%H:%M:%SZ")}"
+        )
+        self.assertEqual(return_items, [])
+
+    def test_should_only_break_down_quantities_per_recipe_on_request(self):
+        start_date = datetime.now()
+        end_date = start_date + timedelta(hours=1)
+        self._schedule_recipe(
+            start_date, end_date, self.john_scrambled_eggs_recipe, self.john_user
+        )
+        self._schedule_recipe(
+            start_date, end_date, self.john_scrambled_eggs_recipe, self.john_user
+        )
+        tomorrow = datetime.now() + timedelta(days=1)
+        url_parameters = f"?end_date={tomorrow.strftime("%Y-%m-%dT%H:%M:%SZ")}"
+
+        self.assertNotIn("recipes", self._get_items(url_parameters)[0])
+
+        return_items = self._get_items(url_parameters + "&breakdown=true")
+        egg = next(item for item in return_items if item["item_name"] == "egg")
+        self.assertEqual(
+            egg["recipes"],
+            [
+                {
+                    "recipe_id": self.john_scrambled_eggs_recipe.id,
+                    "recipe_title": "Scrambled Eggs",
+                    "meals": 2,
+                    "quantity": 4,
+                }
+            ],
+        )
+
+    def test_should_count_each_meal_once_in_the_breakdown(self):
+        # A second egg line joins every meal twice for the same item.
+        egg_item = Item.objects.get(name="egg")
+        self._create_recipe_item(self.john_scrambled_eggs_recipe, egg_item, 1)
+        start_date = datetime.now()
+        end_date = start_date + timedelta(hours=1)
+        self._schedule_recipe(
+            start_date, end_date, self.john_scrambled_eggs_recipe, self.john_user
+        )
+        self._schedule_recipe(
+            start_date, end_date, self.john_scrambled_eggs_recipe, self.john_user
+        )
+        tomorrow = datetime.now() + timedelta(days=1)
+
+        return_items = self._get_items(
+            f"?end_date={tomorrow.strftime("%Y-%m-%dT%H:%M:%SZ")}&breakdown=true"
+        )
+        egg = next(item for item in return_items if item["item_name"] == "egg")
+        self.assertEqual(egg["quantity"], 6)
+        self.assertEqual(
+            [(recipe["meals"], recipe["quantity"]) for recipe in egg["recipes"]],
+            [(2, 6)],
+        )
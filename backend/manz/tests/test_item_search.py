@@ -0,0 +1,121 @@
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, Client
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Item
+from manz.search import item_index
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+
+class ItemSearch(TestCase):
+
+    def _search(self, query, **params):
+        response = Client().get(
+            reverse("manz:api-item-search"), {"q": query, **params}, **self.john_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["name"] for item in response.json()]
+
+    def setUp(self):
+        cache.clear()
+        item_index.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        for name in ["Tomato", "Tomato paste", "Olive oil", "Onion", "Egg"]:
+            Item.objects.create(name=name, quantity_type="units")
+
+    def test_should_find_items_by_name_prefix(self):
+        self.assertEqual(self._search("tom"), ["Tomato", "Tomato paste"])
+
+    def test_should_find_items_by_a_later_word(self):
+        self.assertEqual(self._search("oi"), ["Olive oil"])
+
+    def test_should_list_name_matches_before_word_matches(self):
+        self.assertEqual(self._search("o"), ["Olive oil", "Onion"])
+
+    def test_should_forgive_typos(self):
+        self.assertEqual(self._search("tomatto"), ["Tomato"])
+
+    def test_should_limit_the_results(self):
+        self.assertEqual(len(self._search("t", limit=1)), 1)
+
+    def test_should_return_nothing_for_an_empty_query(self):
+        self.assertEqual(self._search(" "), [])
+
+    def test_should_search_without_database_queries(self):
+        self._search("tom")
+
+        with self.assertNumQueries(0):
+            self._search("egg")
+
+    def test_should_search_without_database_queries_once_warmed_up(self):
+        item_index.warm_up()
+
+        with self.assertNumQueries(0):
+            names = [item["name"] for item in item_index.search("tom")]
+        self.assertEqual(names, ["Tomato", "Tomato paste"])
+
+    def test_should_leave_the_loading_to_the_first_search_on_a_database_error(self):
+        with mock.patch.object(
+            Item.objects, "using", side_effect=DatabaseError("no such table")
+        ), self.assertLogs("manz.search", "WARNING"):
+            item_index.warm_up()
+
+        self.assertEqual(self._search("tom"), ["Tomato", "Tomato paste"])
+
+    def test_should_find_items_created_by_seed_data(self):
+        self._search("tom")
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("seed_data", users=1, items=3, stdout=StringIO())
+
+        self.assertEqual(self._search("item"), ["item 0", "item 1", "item 2"])
+
+    def test_should_find_an_item_saved_after_the_index_was_loaded(self):
+        self._search("tom")
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.create(name="Tomatillo", quantity_type="units")
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self._search("tom"), ["Tomatillo", "Tomato", "Tomato paste"]
+            )
+
+    def test_should_forget_a_deleted_item(self):
+        self._search("tom")
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.get(name="Tomato").delete()
+
+        self.assertEqual(self._search("tom"), ["Tomato paste"])
+
+    def test_should_find_items_created_by_an_import(self):
+        self._search("tom")
+        recipe = {
+            "title": "Salad",
+            "recipe_items": [
+                {"item": {"name": "Tomberry", "quantity_type": "g"}, "quantity": 1}
+            ],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            Client().post(
+                reverse("manz:api-recipe"),
+                data=json.dumps(recipe),
+                content_type="application/json",
+                **self.john_headers,
+            )
+
+        self.assertEqual(self._search("tom"), ["Tomato", "Tomato paste", "Tomberry"])
+
+    def test_should_require_authentication(self):
+        response = Client().get(reverse("manz:api-item-search"), {"q": "tom"})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,295 @@
+import json
+from io import StringIO
+from unittest import mock, skipIf
+from datetime import datetime, timedelta
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.urls import reverse
+from django.utils.timezone import make_aware, now
+from rest_framework import status
+from django.contrib.auth.models import User
+from manz import jobs
+from manz.models import Item, Job, Meal, Recipe, RecipeItem
+from rest_framework.authtoken.models import Token
+
+
+class BackgroundJobs(TestCase):
+
+    def _run_jobs(self):
+        while (job := jobs.claim_job("test")) is not None:
+            jobs.run_job(job)
+
+    def _submit_shopping_list(self):
+        return self.client.post(
+            reverse("manz:api-job"),
+            data=json.dumps({"kind": "shopping_list", "payload": self.payload}),
+            content_type="application/json",
+            **self.john_headers,
+        )
+
+    def _result(self, job_id):
+        return self.client.get(
+            reverse("manz:api-job-result", args=[job_id]), **self.john_headers
+        )
+
+    def setUp(self):
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.client = Client()
+        self.now = make_aware(datetime.now())
+        self.str_end_date = (self.now + timedelta(days=7)).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        self.payload = {"end_date": self.str_end_date}
+
+        recipe = Recipe.objects.create(title="Omelette", user=self.john_user)
+        egg = Item.objects.create(name="Egg", quantity_type="units")
+        RecipeItem.objects.create(recipe=recipe, item=egg, quantity=3)
+        Meal.objects.create(
+            user=self.john_user,
+            recipe=recipe,
+            start_date=self.now + timedelta(hours=1),
+            end_date=self.now + timedelta(hours=2),
+        )
+
+    def test_should_compute_a_shopping_list_in_the_background(self):
+        response = self._submit_shopping_list()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.json()["id"]
+        self.assertEqual(response.json()["status"], "pending")
+        self.assertEqual(
+            response["Location"], reverse("manz:api-job-detail", args=[job_id])
+        )
+        self.assertEqual(self._result(job_id).status_code, status.HTTP_202_ACCEPTED)
+
+        self._run_jobs()
+
+        response = self.client.get(response["Location"], **self.john_headers)
+        self.assertEqual(response.json()["status"], "succeeded")
+        response = self._result(job_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        inline = self.client.get(
+            reverse("manz:api-item") + f"?end_date={self.str_end_date}",
+            **self.john_headers,
+        )
+        self.assertEqual(response.json(), inline.json())
+
+    def test_should_validate_a_job_when_submitted(self):
+        response = self.client.post(
+            reverse("manz:api-job"),
+            data=json.dumps({"kind": "shopping_list", "payload": {}}),
+            content_type="application/json",
+            **self.john_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post(
+            reverse("manz:api-job"),
+            data=json.dumps({"kind": "unknown"}),
+            content_type="application/json",
+            **self.john_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+    def test_should_import_recipes_in_the_background(self):
+        recipes_data = [
+            {
+                "title": "Pancake",
+                "description": "",
+                "recipe_items": [
+                    {"item": {"name": "Flour", "quantity_type": "g"}, "quantity": 200}
+                ],
+            }
+        ]
+
+        response = self.client.post(
+            reverse("manz:api-recipe-import") + "?async=1",
+            data=json.dumps(recipes_data),
+            content_type="application/json",
+            **self.john_headers,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(Recipe.objects.filter(title="Pancake").exists())
+
+        self._run_jobs()
+
+        recipe = Recipe.objects.get(title="Pancake")
+        self.assertEqual(recipe.recipe_items.get().item.name, "Flour")
+        result = self._result(response.json()["id"]).json()
+        self.assertEqual(result, {"created": 1, "ids": [recipe.id]})
+
+    def test_should_record_a_failed_job(self):
+        job = jobs.submit(self.john_user, "shopping_list", {"end_date": "never"})
+
+        with self.assertLogs("manz.jobs", "ERROR"):
+            self._run_jobs()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("ValueError", job.error)
+        response = self._result(job.id)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertNotIn("ValueError", response.content.decode())
+
+    def test_should_retry_storing_the_outcome_of_a_job(self):
+        jobs.submit(self.john_user, "shopping_list", self.payload)
+        job = jobs.claim_job("test")
+        update = QuerySet.update
+        failures = [DatabaseError("database table is locked")]
+
+        def flaky_update(queryset, **kwargs):
+            if failures:
+                raise failures.pop()
+            return update(queryset, **kwargs)
+
+        with (
+            mock.patch.object(QuerySet, "update", flaky_update),
+            mock.patch("manz.jobs.time.sleep"),
+            self.assertLogs("manz.jobs", "WARNING"),
+        ):
+            jobs.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+
+    def test_should_not_import_recipes_twice_when_storing_fails(self):
+        recipes_data = [
+            {
+                "title": "Pancake",
+                "description": "",
+                "recipe_items": [
+                    {"item": {"name": "Flour", "quantity_type": "g"}, "quantity": 200}
+                ],
+            }
+        ]
+        job = jobs.submit(self.john_user, "recipe_import", {"recipes": recipes_data})
+        claimed = jobs.claim_job("test")
+        update = QuerySet.update
+
+        def failing_update(queryset, **kwargs):
+            if "result" in kwargs:
+                raise DatabaseError("disk I/O error")
+            return update(queryset, **kwargs)
+
+        with (
+            mock.patch.object(QuerySet, "update", failing_update),
+            mock.patch("manz.jobs.time.sleep"),
+            self.assertLogs("manz.jobs", "WARNING"),
+            self.assertRaises(DatabaseError),
+        ):
+            jobs.run_job(claimed)
+        self.assertFalse(Recipe.objects.filter(title="Pancake").exists())
+
+        # Released by the worker, then run again.
+        jobs.release_job(claimed)
+        self._run_jobs()
+
+        self.assertEqual(Recipe.objects.filter(title="Pancake").count(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+
+    def test_should_claim_a_job_once(self):
+        job = jobs.submit(self.john_user, "shopping_list", self.payload)
+
+        self.assertEqual(jobs.claim_job("first").id, job.id)
+        self.assertIsNone(jobs.claim_job("second"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (Job.RUNNING, "first"))
+
+    @override_settings(MANZ_JOB_TIMEOUT=60)
+    def test_should_run_the_jobs_of_a_lost_worker_again(self):
+        job = jobs.submit(self.john_user, "shopping_list", self.payload)
+        lost = jobs.claim_job("lost")
+        Job.objects.filter(id=job.id).update(started_at=now() - timedelta(minutes=2))
+
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+        claimed = jobs.claim_job("second")
+        self.assertEqual(claimed.id, job.id)
+
+        # The lost worker finishing late does not overwrite the new run.
+        with self.assertLogs("manz.jobs", "WARNING"):
+            jobs.run_job(lost)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker), (Job.RUNNING, "second"))
+
+    def test_should_not_show_the_job_of_another_user(self):
+        jane_user = User.objects.create_user(
+            username="jane1", password="testpassword", email="jane@example.com"
+        )
+        job = jobs.submit(jane_user, "shopping_list", self.payload)
+
+        response = self.client.get(
+            reverse("manz:api-job-detail", args=[job.id]), **self.john_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self._result(job.id).status_code, status.HTTP_404_NOT_FOUND)
+
+
+# The workers run in the test process, so they share its cache.
+@override_settings(MANZ_SHARED_CACHE=True)
+class RunJobsCommand(TransactionTestCase):
+
+    def _submit_jobs(self, count):
+        user = User.objects.create_user(username="john1", password="testpassword")
+        end_date = (now() + timedelta(days=1)).isoformat()
+        for _ in range(count):
+            jobs.submit(user, "shopping_list", {"end_date": end_date})
+
+    def _assert_all_succeeded(self):
+        self.assertEqual(
+            list(Job.objects.values_list("status", flat=True).distinct()),
+            [Job.SUCCEEDED],
+        )
+        self.assertTrue(all(job.result == [] for job in Job.objects.all()))
+
+    def test_should_run_every_pending_job_once(self):
+        self._submit_jobs(3)
+
+        call_command("run_jobs", concurrency=1, once=True, stdout=StringIO())
+
+        self._assert_all_succeeded()
+
+    # SQLite locks the whole database on each write, failing concurrent
+    # workers with "database table is locked".
+    @skipIf(connection.vendor == "sqlite", "SQLite serializes writes")
+    def test_should_run_every_pending_job_once_with_several_workers(self):
+        self._submit_jobs(6)
+
+        call_command("run_jobs", concurrency=3, once=True, stdout=StringIO())
+
+        self._assert_all_succeeded()
+
+    def test_should_release_a_job_it_could_not_finish(self):
+        self._submit_jobs(1)
+        failures = [DatabaseError("database table is locked")]
+
+        def run_job(job):
+            if failures:
+                raise failures.pop()
+            return jobs.run_job(job)
+
+        with (
+            mock.patch("manz.management.commands.run_jobs.run_job", run_job),
+            self.assertLogs("manz.jobs", "ERROR"),
+        ):
+            call_command(
+                "run_jobs", concurrency=1, once=True, poll_interval=0, stdout=StringIO()
+            )
+
+        # Claimed again by the same worker, which went on.
+        self._assert_all_succeeded()
+
+    @override_settings(MANZ_SHARED_CACHE=False)
+    def test_should_refuse_a_cache_of_its_own(self):
+        with self.assertRaises(CommandError):
+            call_command("run_jobs", once=True, stdout=StringIO())
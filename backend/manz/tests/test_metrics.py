@@ -0,0 +1,127 @@
+import re
+from unittest import mock
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from manz import metrics
+from manz.models import Recipe
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+
+
+@override_settings(MANZ_SERVER_TIMING=True, MANZ_METRICS_TOKEN="scraper-secret")
+class Instrumentation(TestCase):
+
+    def _server_timing(self, response):
+        return dict(
+            re.match(r"(\w+);dur=([\d.]+)", metric.strip()).groups()
+            for metric in response["Server-Timing"].split(",")
+        )
+
+    def setUp(self):
+        cache.clear()
+        for histogram in metrics.HISTOGRAMS:
+            histogram.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        Recipe.objects.create(title="Omelette", user=self.john_user)
+
+    def test_should_send_a_server_timing_header(self):
+        response = Client().get(reverse("manz:api-recipe"), **self.john_headers)
+
+        self.assertEqual(
+            set(self._server_timing(response)), {"db", "serialize", "render", "total"}
+        )
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    def test_should_count_the_queries_of_async_views(self):
+        response = Client().get(reverse("manz:api-async-recipe"), **self.john_headers)
+
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    @override_settings(MANZ_SERVER_TIMING=False)
+    def test_should_not_send_the_header_when_disabled(self):
+        response = Client().get(reverse("manz:api-recipe"), **self.john_headers)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_should_expose_request_histograms(self):
+        client = Client()
+        client.get(reverse("manz:api-recipe"), **self.john_headers)
+        client.get(reverse("manz:api-recipe"), **self.john_headers)
+
+        response = client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer scraper-secret"
+        )
+
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        body = response.content.decode()
+        self.assertIn("# TYPE manz_request_duration_seconds histogram", body)
+        self.assertIn(
+            'manz_request_duration_seconds_count{view="manz:api-recipe",method="GET"} 2',
+            body,
+        )
+        self.assertIn(
+            'manz_db_queries_bucket{view="manz:api-recipe",method="GET",le="2"} 1',
+            body,
+        )
+        self.assertIn(
+            'manz_serialize_duration_seconds_count{view="manz:api-recipe",method="GET"} 2',
+            body,
+        )
+        self.assertIn("manz_token_cache_hits_total", body)
+
+    def test_should_only_expose_metrics_to_the_scraper_and_staff(self):
+        url = reverse("metrics")
+        client = Client()
+
+        self.assertEqual(client.get(url).status_code, 401)
+        self.assertEqual(client.get(url, **self.john_headers).status_code, 403)
+        response = client.get(url, HTTP_AUTHORIZATION="Bearer wrong-secret")
+        self.assertEqual(response.status_code, 401)
+
+        self.john_user.is_staff = True
+        self.john_user.save()
+        self.assertEqual(client.get(url, **self.john_headers).status_code, 200)
+
+    @override_settings(MANZ_METRICS_TOKEN="")
+    def test_should_not_accept_an_empty_metrics_token(self):
+        response = Client().get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer ")
+        self.assertEqual(response.status_code, 401)
+
+    def test_should_time_serialization_without_its_queries(self):
+        timings, token = metrics.start_request()
+        try:
+            # 3 seconds, 2 of them running queries.
+            with mock.patch("manz.metrics.time.perf_counter", side_effect=[10, 13]):
+                with metrics.serializing():
+                    timings.db_duration += 2
+                    with metrics.serializing():
+                        pass
+        finally:
+            metrics.end_request(token)
+
+        self.assertEqual(timings.serialize, 1)
+
+
+class HistogramExposition(TestCase):
+
+    def test_should_count_observations_in_cumulative_buckets(self):
+        histogram = metrics.Histogram("latency", "Latency.", ("view",), (1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(("home",), value)
+
+        self.assertEqual(
+            histogram.exposition()[2:],
+            [
+                'latency_bucket{view="home",le="1"} 2',
+                'latency_bucket{view="home",le="5"} 3',
+                'latency_bucket{view="home",le="+Inf"} 4',
+                'latency_sum{view="home"} 14.5',
+                'latency_count{view="home"} 4',
+            ],
+        )
@@ -0,0 +1,99 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Meal, Recipe
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+
+
+class RecipePagination(TestCase):
+
+    def setUp(self):
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.recipe_url = reverse("manz:api-recipe")
+        self.recipes = [
+            Recipe.objects.create(title=f"Recipe {index}", user=self.john_user)
+            for index in range(5)
+        ]
+        # Give two recipes the same creation date to check ties are ordered by id.
+        Recipe.objects.filter(id=self.recipes[2].id).update(
+            created_at=self.recipes[1].created_at
+        )
+
+    def _walk_pages(self, url):
+        ids = []
+        while url:
+            response = Client().get(url, **self.john_headers)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [recipe["id"] for recipe in response.json()["results"]]
+            url = response.json()["next"]
+        return ids
+
+    def test_should_return_a_plain_list_without_pagination_parameters(self):
+        response = Client().get(self.recipe_url, **self.john_headers)
+        self.assertEqual(len(response.json()), 5)
+
+    def test_should_walk_every_recipe_once_in_creation_order(self):
+        ids = self._walk_pages(self.recipe_url + "?page_size=2")
+        self.assertEqual(ids, [recipe.id for recipe in self.recipes])
+
+    def test_should_return_no_next_page_on_the_last_page(self):
+        response = Client().get(self.recipe_url + "?page_size=5", **self.john_headers)
+        self.assertIsNone(response.json()["next"])
+
+    @override_settings(MANZ_MAX_PAGE_SIZE=3)
+    def test_should_cap_the_page_size(self):
+        response = Client().get(self.recipe_url + "?page_size=100", **self.john_headers)
+        self.assertEqual(len(response.json()["results"]), 3)
+
+    def test_should_reject_an_invalid_cursor(self):
+        response = Client().get(
+            self.recipe_url + "?cursor=garbage", **self.john_headers
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class MealPagination(TestCase):
+
+    def setUp(self):
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        recipe = Recipe.objects.create(title="Onion soup", user=self.john_user)
+        now = make_aware(datetime.now())
+        self.meals = [
+            Meal.objects.create(
+                user=self.john_user,
+                recipe=recipe,
+                start_date=now + timedelta(hours=index // 2),
+                end_date=now + timedelta(hours=index // 2 + 1),
+            )
+            for index in range(5)
+        ]
+        start_date = (now - timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        end_date = (now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.schedule_url = (
+            reverse("manz:api-schedule")
+            + f"?start_date={start_date}&end_date={end_date}"
+        )
+
+    def test_should_walk_every_meal_once_in_start_date_order(self):
+        ids = []
+        url = self.schedule_url + "&page_size=2"
+        while url:
+            response = Client().get(url, **self.john_headers)
+            ids += [meal["id"] for meal in response.json()["results"]]
+            url = response.json()["next"]
+        self.assertEqual(ids, [meal.id for meal in self.meals])
@@ -0,0 +1,131 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from manz import projections
+from manz.models import Recipe, Item, RecipeItem, Meal, RecurringMeal
+from manz.recurrence import expand, merge_meals, rules_in_window
+from manz.serializers import MealSerializer, RecipeSerializer
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+
+
+class ListProjections(TestCase):
+
+    def _render(self, data):
+        return JSONRenderer().render(data)
+
+    def _window(self):
+        return (
+            f"?start_date={self.start_date.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+            f"&end_date={self.end_date.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.client = Client()
+        self.start_date = make_aware(datetime.now()).replace(microsecond=0)
+        self.end_date = self.start_date + timedelta(days=7)
+
+        egg = Item.objects.create(name="Egg", quantity_type="units")
+        flour = Item.objects.create(
+            name="Farine", quantity_type="g", image_url="https://example.com/f.png"
+        )
+        omelette = Recipe.objects.create(title="Omelette", user=self.john_user)
+        RecipeItem.objects.create(recipe=omelette, item=egg, quantity=3)
+        crepe = Recipe.objects.create(
+            title="Crêpe", description="Très fine", user=self.john_user
+        )
+        RecipeItem.objects.create(recipe=crepe, item=flour, quantity=250.5)
+        RecipeItem.objects.create(recipe=crepe, item=egg, quantity=2)
+        Recipe.objects.create(title="Empty", description="", user=self.john_user)
+
+        jane_user = User.objects.create_user(username="jane1", password="x")
+        other = Recipe.objects.create(title="Other", user=jane_user)
+        RecipeItem.objects.create(recipe=other, item=egg, quantity=1)
+
+        for hours, recipe in [(5, crepe), (2, omelette), (5, omelette)]:
+            Meal.objects.create(
+                user=self.john_user,
+                recipe=recipe,
+                start_date=self.start_date + timedelta(hours=hours),
+                end_date=self.start_date + timedelta(hours=hours + 1),
+            )
+        # Its occurrences start with the meals at 5 hours.
+        RecurringMeal.objects.create(
+            user=self.john_user,
+            recipe=crepe,
+            start_date=self.start_date + timedelta(hours=5),
+            end_date=self.start_date + timedelta(hours=6),
+            frequency="daily",
+            count=3,
+        )
+
+    def test_should_project_recipes_like_the_serializer(self):
+        recipes = Recipe.objects.filter(user=self.john_user)
+
+        self.assertEqual(
+            self._render(projections.recipe_list(recipes)),
+            self._render(RecipeSerializer(recipes.with_items(), many=True).data),
+        )
+
+    def test_should_project_meals_like_the_serializer(self):
+        meals = Meal.objects.filter(
+            user=self.john_user,
+            start_date__gte=self.start_date,
+            start_date__lt=self.end_date,
+        )
+        rules = rules_in_window(self.john_user, self.start_date, self.end_date)
+        occurrences = expand(rules, self.start_date, self.end_date)
+
+        data = MealSerializer(merge_meals(meals, occurrences), many=True).data
+        self.assertEqual(len(data), 6)
+        self.assertEqual(
+            self._render(projections.meal_list(meals, occurrences)),
+            self._render(data),
+        )
+
+    def test_should_render_the_same_bytes_as_the_serializers(self):
+        response = self.client.get(reverse("manz:api-recipe"), **self.john_headers)
+        recipes = Recipe.objects.filter(user=self.john_user).with_items()
+        self.assertEqual(
+            response.content,
+            self._render(RecipeSerializer(recipes, many=True).data),
+        )
+
+        response = self.client.get(
+            reverse("manz:api-schedule") + self._window(), **self.john_headers
+        )
+        meals = merge_meals(
+            Meal.objects.filter(user=self.john_user),
+            expand(
+                rules_in_window(self.john_user, self.start_date, self.end_date),
+                self.start_date,
+                self.end_date,
+            ),
+        )
+        self.assertEqual(
+            response.content, self._render(MealSerializer(meals, many=True).data)
+        )
+
+    def test_should_match_the_async_views(self):
+        for sync_url, async_url in [
+            (reverse("manz:api-recipe"), reverse("manz:api-async-recipe")),
+            (
+                reverse("manz:api-schedule") + self._window(),
+                reverse("manz:api-async-schedule") + self._window(),
+            ),
+        ]:
+            self.assertEqual(
+                self.client.get(async_url, **self.john_headers).content,
+                self.client.get(sync_url, **self.john_headers).content,
+            )
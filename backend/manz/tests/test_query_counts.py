@@ -0,0 +1,77 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from manz.models import Recipe, Item, RecipeItem, Meal
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+from .helpers import QueryCountMixin
+
+
+class EndpointQueryCount(QueryCountMixin, TestCase):
+
+    def _grow_recipes(self, size):
+        for index in range(Recipe.objects.filter(user=self.john_user).count(), size):
+            recipe = Recipe.objects.create(
+                title=f"Recipe {index}", description="", user=self.john_user
+            )
+            for item_index in range(index + 1):
+                item, _ = Item.objects.get_or_create(
+                    name=f"Item {item_index}", defaults={"quantity_type": "grams"}
+                )
+                RecipeItem.objects.create(recipe=recipe, item=item, quantity=1)
+
+    def _grow_meals(self, size):
+        self._grow_recipes(size)
+        recipes = list(Recipe.objects.filter(user=self.john_user).order_by("id"))
+        for index in range(Meal.objects.filter(user=self.john_user).count(), size):
+            Meal.objects.create(
+                user=self.john_user,
+                recipe=recipes[index],
+                start_date=self.now + timedelta(hours=index),
+                end_date=self.now + timedelta(hours=index + 1),
+            )
+
+    def _get(self, url):
+        return lambda: self.client.get(url, **self.john_headers)
+
+    def setUp(self):
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.client = Client()
+        self.now = make_aware(datetime.now())
+        self.str_start_date = (self.now - timedelta(hours=1)).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+        self.str_end_date = (self.now + timedelta(days=7)).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+
+    def test_recipe_list_should_run_a_constant_number_of_queries(self):
+        query_count = self.assertConstantQueryCount(
+            self._grow_recipes, self._get(reverse("manz:api-recipe"))
+        )
+        # Token lookup, recipes, prefetched recipe items with their item.
+        self.assertEqual(query_count, 3)
+
+    def test_schedule_list_should_run_a_constant_number_of_queries(self):
+        url = (
+            reverse("manz:api-schedule")
+            + f"?start_date={self.str_start_date}&end_date={self.str_end_date}"
+        )
+        self.assertConstantQueryCount(self._grow_meals, self._get(url))
+
+    def test_shopping_list_should_run_a_constant_number_of_queries(self):
+        url = reverse("manz:api-item") + f"?end_date={self.str_end_date}"
+        query_count = self.assertConstantQueryCount(self._grow_meals, self._get(url))
+        # Token lookup, the grouped shopping list query and the recurring meals.
+        self.assertEqual(query_count, 3)
+
+    def test_shopping_list_breakdown_should_run_a_constant_number_of_queries(self):
+        url = reverse("manz:api-item") + f"?end_date={self.str_end_date}&breakdown=1"
+        self.assertConstantQueryCount(self._grow_meals, self._get(url))
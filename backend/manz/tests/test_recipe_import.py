@@ -0,0 +1,138 @@
+import json
+from django.db import IntegrityError, transaction
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from rest_framework import status
+from django.contrib.auth.models import User
+from manz.models import Recipe, Item, RecipeItem
+from rest_framework.authtoken.models import Token
+from .helpers import QueryCountMixin
+
+
+class RecipeImportView(QueryCountMixin, TestCase):
+
+    def _recipe(self, title, *item_names):
+        return {
+            "title": title,
+            "description": f"A delicious {title} recipe.",
+            "recipe_items": [
+                {"item": {"name": name, "quantity_type": "grams"}, "quantity": 100}
+                for name in item_names
+            ],
+        }
+
+    def _import(self, data, content_type="application/json"):
+        return self.client.post(
+            self.import_url, data=data, content_type=content_type, **self.headers
+        )
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="testpassword"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.token.key}",
+        }
+        self.client = Client()
+        self.import_url = reverse("manz:api-recipe-import")
+        self.recipes_data = [
+            self._recipe("Chocolate Cake", "Flour", "Sugar", "Chocolate"),
+            self._recipe("Pancake", "Flour", "Milk", "Egg"),
+        ]
+
+    def test_should_import_every_recipe_with_its_items(self):
+        response = self._import(json.dumps(self.recipes_data))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.json()["created"], 2)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(RecipeItem.objects.count(), 6)
+        self.assertEqual(Item.objects.count(), 5)
+
+    def test_should_import_an_ndjson_stream(self):
+        ndjson = "\n".join(json.dumps(recipe) for recipe in self.recipes_data) + "\n"
+
+        response = self._import(ndjson, content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Recipe.objects.filter(user=self.user).count(), 2)
+
+    @override_settings(MANZ_IMPORT_MAX_RECIPES=2)
+    def test_should_reject_too_many_recipes(self):
+        response = self._import(json.dumps(self.recipes_data * 2))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {"error": "Cannot import more than 2 recipes at once."}
+        )
+        self.assertFalse(Recipe.objects.exists())
+
+    @override_settings(MANZ_IMPORT_MAX_RECIPES=2)
+    def test_should_stop_parsing_an_ndjson_stream_past_the_limit(self):
+        # The invalid last line is never parsed.
+        lines = [json.dumps(recipe) for recipe in self.recipes_data * 2] + ["{"]
+
+        response = self._import("\n".join(lines), content_type="application/x-ndjson")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json(), {"error": "Cannot import more than 2 recipes at once."}
+        )
+
+    def test_should_reuse_existing_items(self):
+        flour = Item.objects.create(name="Flour", quantity_type="cups")
+
+        self._import(json.dumps(self.recipes_data))
+
+        self.assertEqual(Item.objects.filter(name="Flour").count(), 1)
+        self.assertEqual(flour.recipe_items.count(), 2)
+
+    def test_should_report_invalid_recipes_and_import_nothing(self):
+        self.recipes_data.append({"title": "", "recipe_items": []})
+
+        response = self._import(json.dumps(self.recipes_data))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual([error["index"] for error in response.json()["errors"]], [2])
+        self.assertIn("title", response.json()["errors"][0]["errors"])
+        self.assertFalse(Recipe.objects.exists())
+        self.assertFalse(Item.objects.exists())
+
+    def test_should_reject_a_payload_that_is_not_a_list(self):
+        response = self._import(json.dumps(self.recipes_data[0]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_should_import_with_a_constant_number_of_queries(self):
+        def grow(size):
+            self.recipes_data = [
+                self._recipe(
+                    f"Recipe {size}-{index}",
+                    *(f"Item {size}-{index}-{n}" for n in range(index + 1)),
+                )
+                for index in range(size)
+            ]
+
+        self.assertConstantQueryCount(
+            grow, lambda: self._import(json.dumps(self.recipes_data))
+        )
+
+    def test_should_reuse_existing_items_whatever_the_case_of_their_name(self):
+        Item.objects.create(name="Flour", quantity_type="cups")
+        self.recipes_data.append(self._recipe("Bread", " flour ", "Water"))
+
+        self._import(json.dumps(self.recipes_data))
+
+        self.assertEqual(Item.objects.filter(name__iexact="flour").count(), 1)
+
+    def test_should_reuse_existing_items_whatever_the_spaces_around_their_name(self):
+        flour = Item.objects.create(name=" Flour ", quantity_type="cups")
+
+        self._import(json.dumps(self.recipes_data))
+
+        self.assertEqual(Item.objects.filter(name__icontains="flour").count(), 1)
+        self.assertEqual(
+            RecipeItem.objects.filter(item=flour).count(), len(self.recipes_data)
+        )
+        with transaction.atomic(), self.assertRaises(IntegrityError):
+            Item.objects.create(name="flour  ", quantity_type="cups")
@@ -0,0 +1,155 @@
+import json
+from django.test import TestCase, Client
+from django.urls import reverse
+from rest_framework import status
+from django.contrib.auth.models import User
+from manz.models import Recipe, Item, RecipeItem
+from rest_framework.authtoken.models import Token
+from .helpers import QueryCountMixin
+
+
+class RecipeDetailView(QueryCountMixin, TestCase):
+
+    def _create_recipe(self, size, user=None):
+        recipe = Recipe.objects.create(
+            title="Soup", description="Hot", user=user or self.john_user
+        )
+        for index in range(size):
+            item, _ = Item.objects.get_or_create(
+                name=f"Item {index}", defaults={"quantity_type": "g"}
+            )
+            RecipeItem.objects.create(recipe=recipe, item=item, quantity=index + 1)
+        return recipe
+
+    def _recipe_items_data(self, recipe):
+        return [
+            {"item": {"name": recipe_item.item.name}, "quantity": recipe_item.quantity}
+            for recipe_item in recipe.recipe_items.select_related("item").order_by("id")
+        ]
+
+    def _send(self, method, recipe, data):
+        return getattr(self.client, method)(
+            reverse("manz:api-recipe-detail", args=[recipe.id]),
+            data=json.dumps(data),
+            content_type="application/json",
+            **self.john_headers,
+        )
+
+    def setUp(self):
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.client = Client()
+
+    def test_should_return_a_recipe(self):
+        recipe = self._create_recipe(2)
+
+        response = self.client.get(
+            reverse("manz:api-recipe-detail", args=[recipe.id]), **self.john_headers
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["title"], "Soup")
+        self.assertEqual(len(response.json()["recipe_items"]), 2)
+
+    def test_should_only_rewrite_the_changed_ingredients(self):
+        recipe = self._create_recipe(3)
+        kept, changed, removed = recipe.recipe_items.order_by("id")
+        recipe_items_data = self._recipe_items_data(recipe)
+        recipe_items_data[1]["quantity"] = 10
+        del recipe_items_data[2]
+        recipe_items_data.append({"item": {"name": "Salt"}, "quantity": 1})
+
+        response = self._send(
+            "put",
+            recipe,
+            {"title": "Soup", "description": "", "recipe_items": recipe_items_data},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        self.assertEqual(
+            [
+                (recipe_item["item"]["name"], recipe_item["quantity"])
+                for recipe_item in response.json()["recipe_items"]
+            ],
+            [("Item 0", 1), ("Item 1", 10), ("Salt", 1)],
+        )
+        rows = list(recipe.recipe_items.order_by("id"))
+        self.assertEqual(rows[0].id, kept.id)
+        self.assertEqual(rows[1].id, changed.id)
+        self.assertFalse(RecipeItem.objects.filter(id=removed.id).exists())
+        self.assertEqual(Recipe.objects.count(), 1)
+
+    def test_should_keep_the_ingredients_on_a_patch_without_them(self):
+        recipe = self._create_recipe(2)
+        updated_at = recipe.updated_at
+
+        response = self._send("patch", recipe, {"title": "Broth"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK, response.content)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Broth")
+        self.assertEqual(recipe.description, "Hot")
+        self.assertEqual(recipe.recipe_items.count(), 2)
+        self.assertGreater(recipe.updated_at, updated_at)
+
+    def test_should_require_every_field_on_a_put(self):
+        recipe = self._create_recipe(2)
+
+        response = self._send("put", recipe, {"title": "Broth"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("recipe_items", response.json())
+
+    def test_should_not_update_the_recipe_of_another_user(self):
+        jane_user = User.objects.create_user(
+            username="jane1", password="testpassword", email="jane@example.com"
+        )
+        recipe = self._create_recipe(1, user=jane_user)
+
+        response = self._send("patch", recipe, {"title": "Mine"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        recipe.refresh_from_db()
+        self.assertEqual(recipe.title, "Soup")
+
+    def test_should_invalidate_the_etag_of_the_recipe_list(self):
+        recipe = self._create_recipe(1)
+        response = self.client.get(reverse("manz:api-recipe"), **self.john_headers)
+
+        self._send("patch", recipe, {"title": "Broth"})
+
+        response = self.client.get(
+            reverse("manz:api-recipe"),
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            **self.john_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]["title"], "Broth")
+
+    def test_update_should_run_a_constant_number_of_queries(self):
+        Item.objects.create(name="Salt", quantity_type="g")
+        updates = []
+
+        def grow(size):
+            recipe = self._create_recipe(size)
+            recipe_items_data = self._recipe_items_data(recipe)
+            # One changed, one removed and one new ingredient.
+            recipe_items_data[0]["quantity"] += 1
+            del recipe_items_data[-1]
+            recipe_items_data.append({"item": {"name": "Salt"}, "quantity": 1})
+            updates.append(
+                (recipe, {"title": "Soup", "recipe_items": recipe_items_data})
+            )
+
+        query_count = self.assertConstantQueryCount(
+            grow, lambda: self._send("put", *updates[-1]), sizes=(5, 40)
+        )
+        # Token, recipe, savepoint, recipe update, items, existing rows, bulk
+        # update, bulk create, rows to delete and their delete, savepoint
+        # release, then the reloaded recipe and its items.
+        self.assertEqual(query_count, 13)
@@ -0,0 +1,301 @@
+import json
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from rest_framework import status
+from manz.models import Recipe, Item, RecipeItem, Meal, RecurringMeal
+from manz.recurrence import (
+    TooManyOccurrences,
+    check_occurrence_count,
+    occurrence_starts,
+)
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta, timezone
+
+
+def _date(value):
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+def _format(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class OccurrenceStarts(TestCase):
+
+    def _rule(self, **fields):
+        fields = {
+            "start_date": _date("2000-01-01T12:00"),
+            "end_date": _date("2000-01-01T13:00"),
+            "frequency": "daily",
+            **fields,
+        }
+        return RecurringMeal(**fields)
+
+    def test_should_start_at_the_first_occurrence_of_the_window(self):
+        rule = self._rule()
+
+        starts = list(
+            occurrence_starts(
+                rule, _date("2025-01-01T00:00"), _date("2025-01-03T00:00")
+            )
+        )
+
+        self.assertEqual(starts, [_date("2025-01-01T12:00"), _date("2025-01-02T12:00")])
+
+    def test_should_include_an_occurrence_overlapping_the_window(self):
+        rule = self._rule(frequency="weekly", interval=2)
+        lower = _date("2000-01-15T12:30")
+
+        self.assertEqual(
+            next(occurrence_starts(rule, lower, overlap=True)),
+            _date("2000-01-15T12:00"),
+        )
+        self.assertEqual(
+            next(occurrence_starts(rule, lower)), _date("2000-01-29T12:00")
+        )
+
+    def test_should_stop_after_count_or_until(self):
+        self.assertEqual(len(list(occurrence_starts(self._rule(count=3)))), 3)
+        rule = self._rule(until=_date("2000-01-05T12:00"))
+        self.assertEqual(len(list(occurrence_starts(rule))), 5)
+
+    def test_should_skip_exceptions(self):
+        rule = self._rule(count=3, exceptions=["2000-01-02T12:00:00+00:00"])
+
+        self.assertEqual(
+            list(occurrence_starts(rule)),
+            [_date("2000-01-01T12:00"), _date("2000-01-03T12:00")],
+        )
+
+    def test_should_include_the_upper_bound_on_demand(self):
+        rule = self._rule()
+        upper = _date("2000-01-03T12:00")
+
+        self.assertEqual(len(list(occurrence_starts(rule, upper=upper))), 2)
+        self.assertEqual(
+            len(list(occurrence_starts(rule, upper=upper, include_upper=True))), 3
+        )
+
+    @override_settings(MANZ_MAX_OCCURRENCES_PER_REQUEST=10)
+    def test_should_count_occurrences_without_building_them(self):
+        rules = [self._rule(), self._rule(count=5)]
+
+        check_occurrence_count(rules, None, _date("2000-01-06T00:00"))
+        with self.assertRaises(TooManyOccurrences):
+            check_occurrence_count(rules, None, _date("2000-01-07T00:00"))
+        with self.assertRaises(TooManyOccurrences):
+            check_occurrence_count(rules, _date("2000-01-01T00:00"), None)
+
+
+class RecurringMealView(TestCase):
+
+    def _post_rule(self, **fields):
+        rule = {
+            "recipe_id": self.pasta.id,
+            "start_date": _format(self.start),
+            "end_date": _format(self.start + timedelta(hours=1)),
+            "frequency": "weekly",
+            **fields,
+        }
+        return Client().post(
+            reverse("manz:api-recurring-meal"),
+            data=json.dumps(rule),
+            content_type="application/json",
+            **self.john_headers,
+        )
+
+    def _get_schedule(self, weeks, extra=""):
+        url = (
+            reverse("manz:api-schedule")
+            + f"?start_date={_format(self.start)}"
+            + f"&end_date={_format(self.start + timedelta(weeks=weeks))}"
+        )
+        return Client().get(url + extra, **self.john_headers)
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.pasta = Recipe.objects.create(title="Pasta", user=self.john_user)
+        spaghetti = Item.objects.create(name="spaghetti", quantity_type="g")
+        RecipeItem.objects.create(recipe=self.pasta, item=spaghetti, quantity=200)
+        self.start = (datetime.now(timezone.utc) + timedelta(days=1)).replace(
+            hour=19, minute=0, second=0, microsecond=0
+        )
+
+    def test_should_store_one_row_per_rule(self):
+        response = self._post_rule()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(RecurringMeal.objects.count(), 1)
+        self.assertFalse(Meal.objects.exists())
+
+    def test_should_expand_occurrences_in_the_schedule(self):
+        rule_id = self._post_rule().json()["id"]
+        meal = Meal.objects.create(
+            user=self.john_user,
+            recipe=self.pasta,
+            start_date=self.start + timedelta(days=1),
+            end_date=self.start + timedelta(days=1, hours=1),
+        )
+
+        meals = self._get_schedule(weeks=3).json()
+
+        self.assertEqual(
+            [(meal["id"], meal["recurring_meal_id"]) for meal in meals],
+            [(None, rule_id), (meal.id, None), (None, rule_id), (None, rule_id)],
+        )
+
+    def test_should_skip_the_exceptions_of_a_rule(self):
+        rule_id = self._post_rule(count=3).json()["id"]
+        response = Client().patch(
+            reverse("manz:api-recurring-meal-detail", kwargs={"pk": rule_id}),
+            data=json.dumps({"exceptions": [_format(self.start + timedelta(weeks=1))]}),
+            content_type="application/json",
+            **self.john_headers,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        meals = self._get_schedule(weeks=10).json()
+
+        self.assertEqual(
+            [meal["start_date"] for meal in meals],
+            [_format(self.start), _format(self.start + timedelta(weeks=2))],
+        )
+
+    def test_should_page_through_occurrences_once(self):
+        self._post_rule()
+        for day in range(4):
+            Meal.objects.create(
+                user=self.john_user,
+                recipe=self.pasta,
+                start_date=self.start + timedelta(days=3 + 7 * day),
+                end_date=self.start + timedelta(days=3 + 7 * day, hours=1),
+            )
+
+        start_dates = []
+        url = self._get_schedule(weeks=4, extra="&page_size=1").json()
+        while True:
+            start_dates += [meal["start_date"] for meal in url["results"]]
+            if not url["next"]:
+                break
+            url = Client().get(url["next"], **self.john_headers).json()
+
+        self.assertEqual(len(start_dates), 8)
+        self.assertEqual(start_dates, sorted(start_dates))
+
+    def test_should_cap_each_page_when_a_rule_is_active(self):
+        self._post_rule(frequency="daily")
+        Meal.objects.create(
+            user=self.john_user,
+            recipe=self.pasta,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=1),
+        )
+
+        response = self._get_schedule(weeks=52, extra="&page_size=5").json()
+
+        self.assertEqual(len(response["results"]), 5)
+        self.assertIsNotNone(response["next"])
+
+        start_dates = []
+        url = self._get_schedule(weeks=52, extra="&page_size=200").json()
+        while True:
+            self.assertLessEqual(len(url["results"]), 200)
+            start_dates += [meal["start_date"] for meal in url["results"]]
+            if not url["next"]:
+                break
+            url = Client().get(url["next"], **self.john_headers).json()
+        self.assertEqual(len(start_dates), 52 * 7 + 1)
+        self.assertEqual(start_dates, sorted(start_dates))
+
+    @override_settings(MANZ_MAX_OCCURRENCES_PER_REQUEST=100)
+    def test_should_reject_a_window_with_too_many_occurrences(self):
+        self._post_rule(frequency="daily")
+        window = {
+            "start_date": _format(self.start),
+            "end_date": "9999-12-31T00:00:00Z",
+        }
+
+        for url in [
+            reverse("manz:api-schedule"),
+            reverse("manz:api-async-schedule"),
+            reverse("manz:api-calendar"),
+            reverse("manz:api-dashboard"),
+            reverse("manz:api-item"),
+            reverse("manz:api-async-item"),
+        ]:
+            response = Client().get(url, window, **self.john_headers)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, url)
+
+        response = self._get_schedule(weeks=52, extra="&page_size=5")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_add_occurrences_to_the_shopping_list(self):
+        self._post_rule(count=2)
+        Meal.objects.create(
+            user=self.john_user,
+            recipe=self.pasta,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=1),
+        )
+        end_date = _format(self.start + timedelta(weeks=4))
+
+        response = Client().get(
+            reverse("manz:api-item") + f"?end_date={end_date}", **self.john_headers
+        )
+
+        self.assertEqual(
+            response.json(),
+            [{"item_name": "spaghetti", "quantity": 600, "quantity_type": "g"}],
+        )
+
+    def test_should_list_occurrences_in_the_calendar(self):
+        rule_id = self._post_rule().json()["id"]
+
+        response = Client().get(
+            reverse("manz:api-calendar"),
+            {
+                "start_date": _format(self.start + timedelta(minutes=30)),
+                "end_date": _format(self.start + timedelta(days=8)),
+            },
+            **self.john_headers,
+        )
+
+        meals = [meal for day in response.json() for meal in day["meals"]]
+        self.assertEqual([meal["recurring_meal_id"] for meal in meals], [rule_id] * 2)
+        self.assertEqual(meals[0]["recipe"]["title"], "Pasta")
+
+    def test_should_reject_count_and_until_together(self):
+        response = self._post_rule(
+            count=2, until=_format(self.start + timedelta(weeks=2))
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_should_not_change_the_rules_of_another_user(self):
+        alice_user = User.objects.create_user(
+            username="alice1", password="testpassword", email="alice@example.com"
+        )
+        alice_recipe = Recipe.objects.create(title="Pancake", user=alice_user)
+        rule = RecurringMeal.objects.create(
+            user=alice_user,
+            recipe=alice_recipe,
+            start_date=self.start,
+            end_date=self.start + timedelta(hours=1),
+            frequency="daily",
+        )
+
+        response = Client().delete(
+            reverse("manz:api-recurring-meal-detail", kwargs={"pk": rule.id}),
+            **self.john_headers,
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(RecurringMeal.objects.filter(id=rule.id).exists())
@@ -0,0 +1,183 @@
+import json
+from datetime import datetime, timedelta, timezone
+from django.test import (
+    Client,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections, router
+from django.http import HttpResponse
+from django.utils.functional import SimpleLazyObject
+from manz.middleware import ReplicaMiddleware
+from manz.models import Job, Recipe
+from rest_framework.authtoken.models import Token
+
+
+@override_settings(MANZ_REPLICA_DATABASES=["replica0"])
+class ReplicaRouting(TestCase):
+
+    def _read_database(self, method="get", user=None, model=Recipe):
+        """Database a view reads `model` from, once it authenticated `user`."""
+        databases = []
+
+        def view(request):
+            if user is not None:
+                request.user = user
+            databases.append(router.db_for_read(model))
+            return HttpResponse()
+
+        request = getattr(RequestFactory(), method)("/")
+        request.user = SimpleLazyObject(lambda: self.fail("Session user loaded"))
+        ReplicaMiddleware(view)(request)
+        return databases[0]
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+
+    def test_should_read_from_a_replica_on_get(self):
+        self.assertEqual(self._read_database(user=self.john_user), "replica0")
+
+    def test_should_read_from_the_primary_on_post(self):
+        self.assertEqual(self._read_database("post", self.john_user), "default")
+
+    def test_should_read_from_the_primary_before_authentication(self):
+        self.assertEqual(self._read_database(), "default")
+
+    def test_should_read_tokens_and_users_from_the_primary(self):
+        self.assertEqual(
+            self._read_database(user=self.john_user, model=Token), "default"
+        )
+        self.assertEqual(
+            self._read_database(user=self.john_user, model=User), "default"
+        )
+
+    def test_should_pin_a_user_to_the_primary_after_a_write(self):
+        Recipe.objects.create(title="Omelette", user=self.john_user)
+
+        self.assertEqual(self._read_database(user=self.john_user), "default")
+
+        other_user = User.objects.create_user(
+            username="jane1", password="testpassword", email="jane@example.com"
+        )
+        self.assertEqual(self._read_database(user=other_user), "replica0")
+
+    def test_should_read_from_a_replica_again_when_the_pin_expires(self):
+        Recipe.objects.create(title="Omelette", user=self.john_user)
+        cache.delete(f"manz:primary:{self.john_user.pk}")
+
+        self.assertEqual(self._read_database(user=self.john_user), "replica0")
+
+    def test_should_read_jobs_from_the_primary(self):
+        self.assertEqual(self._read_database(user=self.john_user, model=Job), "default")
+
+    def test_should_read_from_the_primary_outside_requests(self):
+        self.assertEqual(router.db_for_read(Recipe), "default")
+
+    def test_should_write_to_the_primary(self):
+        recipe = Recipe.objects.create(title="Omelette", user=self.john_user)
+        recipe._state.db = "replica0"
+
+        self.assertEqual(router.db_for_write(Recipe, instance=recipe), "default")
+
+    @override_settings(MANZ_REPLICA_DATABASES=[])
+    def test_should_not_use_the_middleware_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaMiddleware(lambda request: HttpResponse())
+
+
+# "replica0" is a second connection to the test database, see the settings.
+@override_settings(MANZ_REPLICA_DATABASES=["replica0"])
+class ReplicaDatabase(TransactionTestCase):
+    databases = {"default", "replica0"}
+
+    def _databases_reading(self, table, method, url, data=None):
+        """Response of a request, and the databases it read `table` from."""
+        with (
+            CaptureQueriesContext(connections["default"]) as primary,
+            CaptureQueriesContext(connections["replica0"]) as replica,
+        ):
+            response = getattr(self.client, method)(
+                url,
+                data=json.dumps(data) if data else None,
+                content_type="application/json",
+                **self.john_headers,
+            )
+        databases = [
+            alias
+            for alias, queries in [("default", primary), ("replica0", replica)]
+            if any(
+                query["sql"].lstrip().startswith("SELECT")
+                and f'"{table}"' in query["sql"]
+                for query in queries
+            )
+        ]
+        return response, databases
+
+    def setUp(self):
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.client = Client()
+        Recipe.objects.create(title="Omelette", user=self.john_user)
+        # Replicated by now: not pinned to the primary.
+        cache.clear()
+
+    def test_should_serve_a_get_from_the_replica(self):
+        response, databases = self._databases_reading(
+            "manz_recipe", "get", reverse("manz:api-recipe")
+        )
+
+        self.assertEqual(databases, ["replica0"])
+        self.assertEqual([recipe["title"] for recipe in response.json()], ["Omelette"])
+
+    def test_should_read_from_the_primary_after_a_write(self):
+        response, _ = self._databases_reading(
+            "manz_recipe",
+            "post",
+            reverse("manz:api-recipe"),
+            {"title": "Crêpe", "description": "", "recipe_items": []},
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response, databases = self._databases_reading(
+            "manz_recipe", "get", reverse("manz:api-recipe")
+        )
+
+        self.assertEqual(databases, ["default"])
+        self.assertEqual(len(response.json()), 2)
+
+    def test_should_poll_a_new_job_on_the_primary(self):
+        end_date = datetime.now(timezone.utc) + timedelta(days=1)
+        response, _ = self._databases_reading(
+            "manz_job",
+            "post",
+            reverse("manz:api-job"),
+            {
+                "kind": "shopping_list",
+                "payload": {"end_date": end_date.strftime("%Y-%m-%dT%H:%M:%SZ")},
+            },
+        )
+        self.assertEqual(response.status_code, 202)
+        # Not pinned by the submission.
+        cache.clear()
+
+        response, databases = self._databases_reading(
+            "manz_job", "get", response["Location"]
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(databases, ["default"])
@@ -83,3 +83,90 @@ class ScheduleMealView(TestCase):
         )
         meal = Meal.objects.filter(user=self.john_user).first()
         self.assertIsNone(meal)
+
+    def _post_schedule(self, data):
+        return Client().post(
+            self.schedule_url,
+            data=json.dumps(data),
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Token {self.john_token.key}",
+        )
+
+    def test_should_schedule_a_list_of_meals(self):
+        onion_soup_schedule_detail = dict(
+            self.john_chocolate_schedule_detail,
+            recipe_id=self.john_onion_soup_recipe.id,
+        )
+
+        response = self._post_schedule(
+            [self.john_chocolate_schedule_detail, onion_soup_schedule_detail]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.json()), 2)
+        self.assertEqual(Meal.objects.filter(user=self.john_user).count(), 2)
+
+    def test_should_not_schedule_any_meal_of_a_list_with_a_foreign_recipe(self):
+        alice_user = User.objects.create_user(
+            username="alice1", password="testpassword", email="alice@example.com"
+        )
+        alice_recipe = Recipe.objects.create(title="Pancake", user=alice_user)
+        alice_schedule_detail = dict(
+            self.john_chocolate_schedule_detail, recipe_id=alice_recipe.id
+        )
+
+        response = self._post_schedule(
+            [self.john_chocolate_schedule_detail, alice_schedule_detail]
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Meal.objects.exists())
+
+    def test_should_schedule_a_weekly_meal_a_number_of_times(self):
+        response = self._post_schedule(
+            dict(
+                self.john_chocolate_schedule_detail,
+                recurrence={"frequency": "weekly", "count": 4},
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        start_dates = list(
+            Meal.objects.order_by("start_date").values_list("start_date", flat=True)
+        )
+        self.assertEqual(len(start_dates), 4)
+        self.assertEqual(start_dates[3] - start_dates[0], timedelta(weeks=3))
+
+    def test_should_schedule_a_daily_meal_until_a_date(self):
+        until = self.now + timedelta(days=9)
+
+        self._post_schedule(
+            dict(
+                self.john_chocolate_schedule_detail,
+                recurrence={
+                    "frequency": "daily",
+                    "interval": 3,
+                    "until": until.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                },
+            )
+        )
+
+        self.assertEqual(Meal.objects.count(), 4)
+
+    def test_should_not_schedule_a_recurrence_over_the_limit(self):
+        response = self._post_schedule(
+            dict(
+                self.john_chocolate_schedule_detail,
+                recurrence={"frequency": "daily", "count": 100000},
+            )
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Meal.objects.exists())
+
+    def test_should_check_recipes_of_a_list_of_meals_in_one_query(self):
+        meals = [self.john_chocolate_schedule_detail] * 30
+
+        # Token lookup, recipe ownership, then the transaction around the insert.
+        with self.assertNumQueries(5):
+            self._post_schedule(meals)
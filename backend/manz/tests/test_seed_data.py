@@ -0,0 +1,59 @@
+from datetime import date
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from manz.models import Recipe, RecipeItem, Meal
+from django.contrib.auth.models import User
+from rest_framework.authtoken.models import Token
+
+
+class SeedData(TestCase):
+
+    def _seed(self, **options):
+        options = {"users": 3, "recipes": 4, "items": 20, "days": 5, **options}
+        call_command("seed_data", stdout=StringIO(), **options)
+
+    def _snapshot(self):
+        return (
+            list(Token.objects.order_by("user__username").values_list("key")),
+            list(
+                RecipeItem.objects.order_by("id").values_list(
+                    "recipe__title", "item__name", "quantity"
+                )
+            ),
+            list(
+                Meal.objects.order_by("id").values_list("recipe__title", "start_date")
+            ),
+        )
+
+    def test_should_create_the_requested_dataset(self):
+        self._seed(start_date=date(2025, 1, 1))
+
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Token.objects.count(), 3)
+        self.assertEqual(Recipe.objects.count(), 12)
+        self.assertEqual(Meal.objects.count(), 3 * 5 * 2)
+        self.assertTrue(User.objects.get(username="user0").check_password("benchmark"))
+        for meal in Meal.objects.select_related("recipe"):
+            self.assertEqual(meal.recipe.user_id, meal.user_id)
+
+    def test_should_be_reproducible(self):
+        self._seed(start_date=date(2025, 1, 1))
+        first = self._snapshot()
+        User.objects.all().delete()
+
+        self._seed(start_date=date(2025, 1, 1))
+        self.assertEqual(self._snapshot(), first)
+
+    def test_should_batch_the_inserts(self):
+        self._seed(users=5, batch_size=8)
+        self.assertEqual(Recipe.objects.count(), 20)
+
+    def test_should_refuse_to_create_existing_users(self):
+        self._seed()
+        with self.assertRaises(CommandError):
+            self._seed()
+
+        self._seed(prefix="bench")
+        self.assertEqual(User.objects.count(), 6)
@@ -0,0 +1,96 @@
+import json
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from manz.models import Recipe, Item, RecipeItem, Meal
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+
+
+class ShoppingListCache(TestCase):
+
+    def _get_items(self):
+        response = Client().get(self.item_url, **self.john_headers)
+        return {item["item_name"]: item["quantity"] for item in response.json()}
+
+    def _schedule(self, recipe):
+        return Meal.objects.create(
+            user=self.john_user,
+            recipe=recipe,
+            start_date=self.now,
+            end_date=self.now + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.now = make_aware(datetime.now())
+        tomorrow = (self.now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.item_url = reverse("manz:api-item") + f"?end_date={tomorrow}"
+
+        self.egg_item = Item.objects.create(name="egg", quantity_type="units")
+        self.omelette_recipe = Recipe.objects.create(
+            title="Omelette", user=self.john_user
+        )
+        self.omelette_egg = RecipeItem.objects.create(
+            recipe=self.omelette_recipe, item=self.egg_item, quantity=3
+        )
+        self.meal = self._schedule(self.omelette_recipe)
+
+    def test_should_serve_a_cached_shopping_list_without_queries(self):
+        self._get_items()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_items(), {"egg": 3})
+
+    def test_should_recompute_after_a_meal_is_scheduled(self):
+        self._get_items()
+        self._schedule(self.omelette_recipe)
+
+        self.assertEqual(self._get_items(), {"egg": 6})
+
+    def test_should_recompute_after_a_meal_is_deleted(self):
+        self._get_items()
+        self.meal.delete()
+
+        self.assertEqual(self._get_items(), {})
+
+    def test_should_recompute_after_an_ingredient_changes(self):
+        self._get_items()
+        self.omelette_egg.quantity = 4
+        self.omelette_egg.save()
+
+        self.assertEqual(self._get_items(), {"egg": 4})
+
+    def test_should_recompute_after_meals_are_scheduled_in_bulk(self):
+        self._get_items()
+        meal = {
+            "recipe_id": self.omelette_recipe.id,
+            "start_date": self.now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end_date": (self.now + timedelta(hours=1)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        Client().post(
+            reverse("manz:api-schedule"),
+            data=json.dumps([meal, meal]),
+            content_type="application/json",
+            **self.john_headers,
+        )
+
+        self.assertEqual(self._get_items(), {"egg": 9})
+
+    @override_settings(MANZ_SHOPPING_LIST_EAGER_REBUILD=True)
+    def test_should_rebuild_the_shopping_list_after_a_write_when_eager(self):
+        self._get_items()
+        with self.captureOnCommitCallbacks(execute=True):
+            self._schedule(self.omelette_recipe)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self._get_items(), {"egg": 6})
@@ -0,0 +1,67 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from rest_framework import status
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from manz.authentication import token_cache_stats
+
+
+class CachedTokenAuthentication(TestCase):
+
+    def _get_recipes(self):
+        return Client().get(self.recipe_url, **self.john_headers)
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.recipe_url = reverse("manz:api-recipe")
+
+    def test_should_not_query_the_token_once_cached(self):
+        self._get_recipes()
+
+        # Only the (empty) recipe list is queried.
+        with self.assertNumQueries(1):
+            response = self._get_recipes()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_should_reject_a_deleted_token(self):
+        self._get_recipes()
+        self.john_token.delete()
+
+        response = self._get_recipes()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_should_reject_a_deactivated_user(self):
+        self._get_recipes()
+        self.john_user.is_active = False
+        self.john_user.save()
+
+        response = self._get_recipes()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_should_count_cache_hits_and_misses(self):
+        hits, misses = token_cache_stats.hits, token_cache_stats.misses
+
+        self._get_recipes()
+        self._get_recipes()
+
+        self.assertEqual(token_cache_stats.misses - misses, 1)
+        self.assertEqual(token_cache_stats.hits - hits, 1)
+
+    def test_should_only_show_cache_stats_to_admins(self):
+        stats_url = reverse("manz:api-token-cache-stats")
+
+        response = Client().get(stats_url, **self.john_headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.john_user.is_staff = True
+        self.john_user.save()
+        response = Client().get(stats_url, **self.john_headers)
+        self.assertIn("hit_rate", response.json())
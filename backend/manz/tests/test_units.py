@@ -0,0 +1,105 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from manz.models import Recipe, Item, RecipeItem, Meal
+from manz.units import display_unit, get_unit, render_quantity
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from datetime import datetime, timedelta
+from django.utils.timezone import make_aware
+
+
+class Units(TestCase):
+
+    def _display(self, base_symbol, quantity, *source_units):
+        unit = display_unit(base_symbol, quantity, source_units)
+        return render_quantity(quantity, unit), unit.symbol if unit else base_symbol
+
+    def test_should_find_units_by_alias(self):
+        self.assertEqual(get_unit(" Grams ").symbol, "g")
+        self.assertEqual(get_unit("Tablespoons").symbol, "tbsp")
+        self.assertEqual(get_unit("fluid  ounce").symbol, "fl oz")
+        self.assertIsNone(get_unit("pinch"))
+
+    def test_should_scale_metric_totals(self):
+        self.assertEqual(self._display("g", 1500, "g"), (1.5, "kg"))
+        self.assertEqual(self._display("g", 250, "kg"), (250, "g"))
+        self.assertEqual(self._display("g", 0.5, "g"), (500, "mg"))
+        self.assertEqual(self._display("ml", 2000, "ml", "tsp"), (2, "l"))
+
+    def test_should_keep_a_single_non_metric_unit(self):
+        self.assertEqual(self._display("ml", 473.176473, "cups"), (2, "cups"))
+        self.assertEqual(self._display("units", 24, "dozen"), (2, "dozen"))
+
+    def test_should_keep_unknown_units(self):
+        self.assertEqual(self._display("pinch", 3, "pinch"), (3, "pinch"))
+
+
+class ShoppingListUnits(TestCase):
+
+    def _get_items(self):
+        tomorrow = (self.now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        response = Client().get(
+            reverse("manz:api-item") + f"?end_date={tomorrow}", **self.john_headers
+        )
+        return {
+            item["item_name"]: (item["quantity"], item["quantity_type"])
+            for item in response.json()
+        }
+
+    def _schedule(self, title, ingredients):
+        recipe = Recipe.objects.create(title=title, user=self.john_user)
+        for item, quantity in ingredients:
+            RecipeItem.objects.create(recipe=recipe, item=item, quantity=quantity)
+        Meal.objects.create(
+            user=self.john_user,
+            recipe=recipe,
+            start_date=self.now,
+            end_date=self.now + timedelta(hours=1),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.john_user = User.objects.create_user(
+            username="john1", password="testpassword", email="john@example.com"
+        )
+        self.john_token = Token.objects.create(user=self.john_user)
+        self.john_headers = {
+            "HTTP_AUTHORIZATION": f"Token {self.john_token.key}",
+        }
+        self.now = make_aware(datetime.now())
+
+    def test_should_convert_and_render_quantities(self):
+        flour = Item.objects.create(name="Flour", quantity_type="Grams")
+        milk = Item.objects.create(name="Milk", quantity_type="cup")
+        salt = Item.objects.create(name="Salt", quantity_type="pinch")
+        self._schedule("Bread", [(flour, 600), (salt, 1)])
+        self._schedule("Pancakes", [(flour, 650), (milk, 1.5), (salt, 2)])
+
+        self.assertEqual(
+            self._get_items(),
+            {
+                "Flour": (1.25, "kg"),
+                "Milk": (1.5, "cups"),
+                "Salt": (3, "pinch"),
+            },
+        )
+
+    def test_should_render_the_breakdown_in_the_unit_of_the_total(self):
+        flour = Item.objects.create(name="Flour", quantity_type="g")
+        self._schedule("Bread", [(flour, 600)])
+        self._schedule("Pancakes", [(flour, 900)])
+        tomorrow = (self.now + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        response = Client().get(
+            reverse("manz:api-item") + f"?end_date={tomorrow}&breakdown=true",
+            **self.john_headers,
+        )
+
+        (flour_entry,) = response.json()
+        self.assertEqual(
+            (flour_entry["quantity"], flour_entry["quantity_type"]), (1.5, "kg")
+        )
+        self.assertEqual(
+            [recipe["quantity"] for recipe in flour_entry["recipes"]], [0.6, 0.9]
+        )
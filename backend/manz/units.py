@@ -0,0 +1,155 @@
+"""
+Units of the mass, volume and count quantities of items.
+
+Item.quantity_type is free text: every alias of a known unit maps to one
+Unit, converted to the base unit of its dimension (g, ml or units) to be
+summed, then rendered back in a unit fit for a shopping list. Unknown units
+are kept as they were written.
+"""
+
+from typing import NamedTuple
+
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Lower, Trim
+
+
+class Unit(NamedTuple):
+    symbol: str
+    dimension: str
+    # Size of the unit in the base unit of its dimension.
+    factor: float
+    aliases: tuple = ()
+
+
+UNITS = [
+    Unit("mg", "mass", 0.001, ("milligram", "milligrams")),
+    Unit("g", "mass", 1, ("gr", "gram", "grams", "gramme", "grammes")),
+    Unit("kg", "mass", 1000, ("kgs", "kilo", "kilos", "kilogram", "kilograms")),
+    Unit("oz", "mass", 28.349523125, ("ounce", "ounces")),
+    Unit("lb", "mass", 453.59237, ("lbs", "pound", "pounds")),
+    Unit("ml", "volume", 1, ("milliliter", "milliliters", "millilitre", "millilitres")),
+    Unit(
+        "cl", "volume", 10, ("centiliter", "centiliters", "centilitre", "centilitres")
+    ),
+    Unit("dl", "volume", 100, ("deciliter", "deciliters", "decilitre", "decilitres")),
+    Unit("l", "volume", 1000, ("liter", "liters", "litre", "litres")),
+    Unit("tsp", "volume", 4.92892159375, ("teaspoon", "teaspoons")),
+    Unit("tbsp", "volume", 14.78676478125, ("tablespoon", "tablespoons")),
+    Unit("fl oz", "volume", 29.5735295625, ("fluid ounce", "fluid ounces")),
+    Unit("cups", "volume", 236.5882365, ("cup",)),
+    Unit("units", "count", 1, ("unit", "pc", "pcs", "piece", "pieces")),
+    Unit("dozen", "count", 12, ("dozens",)),
+]
+
+BASE_UNITS = {"mass": "g", "volume": "ml", "count": "units"}
+
+# Units a total is scaled through, smallest first: 1500 g is shown as 1.5 kg.
+SCALES = {
+    "mass": ["mg", "g", "kg"],
+    "volume": ["ml", "l"],
+    "count": ["units"],
+}
+
+UNITS_BY_NAME = {name: unit for unit in UNITS for name in (unit.symbol, *unit.aliases)}
+UNITS_BY_SYMBOL = {unit.symbol: unit for unit in UNITS}
+
+# Decimals kept in rendered quantities.
+PRECISION = 2
+
+
+def normalize_unit_name(name):
+    return " ".join((name or "").lower().split())
+
+
+def get_unit(name):
+    """Return the Unit called `name`, or None when it is not a known unit."""
+    return UNITS_BY_NAME.get(normalize_unit_name(name))
+
+
+def unit_key(field):
+    """SQL version of normalize_unit_name(), for a quantity type column."""
+    return Lower(Trim(field))
+
+
+def base_unit_expression(key, field):
+    """
+    SQL expression of the base unit of the unit named in `key`, or of the
+    unit in `field`, as written, when it is unknown.
+    """
+    return Case(
+        *(
+            When(
+                **{
+                    f"{key}__in": [
+                        name
+                        for unit in UNITS
+                        if unit.dimension == dimension
+                        for name in (unit.symbol, *unit.aliases)
+                    ]
+                },
+                then=Value(base),
+            )
+            for dimension, base in BASE_UNITS.items()
+        ),
+        default=F(field),
+    )
+
+
+def factor_expression(key):
+    """SQL expression of the factor converting the unit in `key` to its base."""
+    return Case(
+        *(
+            When(
+                **{f"{key}__in": [unit.symbol, *unit.aliases]},
+                then=Value(float(unit.factor)),
+            )
+            for unit in UNITS
+        ),
+        default=Value(1.0),
+        output_field=FloatField(),
+    )
+
+
+def convert_to_base(quantity_type):
+    """
+    Python version of unit_key(), base_unit_expression() and
+    factor_expression() for one quantity type: its key, its base unit and
+    the factor converting it to the base unit.
+    """
+    key = quantity_type.strip(" ").lower()
+    unit = UNITS_BY_NAME.get(key)
+    if unit is None:
+        return key, quantity_type, 1.0
+    return key, BASE_UNITS[unit.dimension], float(unit.factor)
+
+
+def display_unit(base_symbol, quantity, source_units):
+    """
+    Pick the unit a total of `quantity` base units is shown in.
+
+    When every summed quantity was written in the same unit outside the
+    metric scales, e.g. cups, the total stays in it. Otherwise it is scaled
+    to the largest unit of its dimension it holds at least one of.
+    """
+    base = UNITS_BY_SYMBOL.get(base_symbol)
+    if base is None or base.symbol != BASE_UNITS[base.dimension]:
+        return None
+
+    sources = {get_unit(name) for name in source_units}
+    if len(sources) == 1:
+        (source,) = sources
+        if source is not None and source.symbol not in SCALES[base.dimension]:
+            return source
+
+    scale = [UNITS_BY_SYMBOL[symbol] for symbol in SCALES[base.dimension]]
+    for unit in reversed(scale):
+        if abs(quantity) >= unit.factor:
+            return unit
+    return scale[0] if quantity else base
+
+
+def render_quantity(quantity, unit):
+    """Express `quantity` base units in `unit`, rounded for display."""
+    if unit is None:
+        return quantity
+    return round(quantity / unit.factor, PRECISION)
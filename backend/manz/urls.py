@@ -1,10 +1,23 @@
-from django.urls import path
+from django.urls import path, re_path
+from . import async_views
 from .views import (
     UserRegistrationView,
     EmailAuthTokenView,
     RecipeCreateView,
+    RecipeDetailView,
+    RecipeImportView,
     ScheduleMealView,
     ItemView,
+    TokenCacheStatsView,
+    ExportView,
+    ItemSearchView,
+    CalendarView,
+    DashboardView,
+    RecurringMealView,
+    RecurringMealDetailView,
+    JobView,
+    JobDetailView,
+    JobResultView,
 )
 
 app_name = "manz"
@@ -12,6 +25,33 @@ urlpatterns = [
     path("register/", UserRegistrationView.as_view(), name="api-register"),
     path("login/", EmailAuthTokenView.as_view(), name="api-authentification"),
     path("recipe/", RecipeCreateView.as_view(), name="api-recipe"),
+    path("recipe/<int:pk>/", RecipeDetailView.as_view(), name="api-recipe-detail"),
+    path("recipe/import/", RecipeImportView.as_view(), name="api-recipe-import"),
     path("schedule/", ScheduleMealView.as_view(), name="api-schedule"),
+    path("recurring-meal/", RecurringMealView.as_view(), name="api-recurring-meal"),
+    path(
+        "recurring-meal/<int:pk>/",
+        RecurringMealDetailView.as_view(),
+        name="api-recurring-meal-detail",
+    ),
+    path("calendar/", CalendarView.as_view(), name="api-calendar"),
+    path("dashboard/", DashboardView.as_view(), name="api-dashboard"),
     path("item/", ItemView.as_view(), name="api-item"),
+    path("item/search/", ItemSearchView.as_view(), name="api-item-search"),
+    path("job/", JobView.as_view(), name="api-job"),
+    path("job/<int:pk>/", JobDetailView.as_view(), name="api-job-detail"),
+    path("job/<int:pk>/result/", JobResultView.as_view(), name="api-job-result"),
+    re_path(
+        r"^export/(?P<resource>recipes|meals|shopping-list)\.(?P<export_format>ndjson|csv)$",
+        ExportView.as_view(),
+        name="api-export",
+    ),
+    path("async/recipe/", async_views.recipe_list, name="api-async-recipe"),
+    path("async/schedule/", async_views.schedule_list, name="api-async-schedule"),
+    path("async/item/", async_views.item_list, name="api-async-item"),
+    path(
+        "auth/cache-stats/",
+        TokenCacheStatsView.as_view(),
+        name="api-token-cache-stats",
+    ),
 ]
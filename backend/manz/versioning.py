@@ -0,0 +1,94 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+ITEMS_VERSION_KEY = "manz:items-version"
+
+
+def _user_version_key(user_id):
+    return f"manz:user-version:{user_id}"
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock rather than 1: a version evicted from the cache
+        # must not come back with a value that was already used.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # No version yet, nothing cached to invalidate.
+        return _get_version(key)
+
+
+def get_user_version(user_id):
+    """
+    Return the version of a user's data, to be part of the key of anything
+    cached from it. The version changes on every write, so stale entries are
+    never read again and simply expire.
+    """
+    return _get_version(_user_version_key(user_id))
+
+
+async def aget_user_version(user_id):
+    """Async version of get_user_version()."""
+    key = _user_version_key(user_id)
+    version = await cache.aget(key)
+    if version is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        version = await cache.aget(key)
+    return version
+
+
+def bump_user_version(user_id):
+    return _bump_version(_user_version_key(user_id))
+
+
+def user_data_changed(user_id):
+    """
+    Invalidate everything cached from a user's data, and pin the user to
+    the primary database so they read their write (see manz.routers).
+
+    The version is bumped right away, then again once the transaction commits
+    so a read racing with the write cannot cache the old data under the new
+    version.
+    """
+    from .routers import pin_user
+    from .shopping_list import rebuild_shopping_lists
+
+    bump_user_version(user_id)
+    pin_user(user_id)
+
+    def after_commit():
+        # The pin lasts from the commit, when replicas start catching up.
+        pin_user(user_id)
+        bump_user_version(user_id)
+        rebuild_shopping_lists(user_id)
+
+    transaction.on_commit(after_commit)
+
+
+def get_items_version():
+    """Version of the items shared by every user, see get_user_version()."""
+    return _get_version(ITEMS_VERSION_KEY)
+
+
+def items_changed(on_commit=None):
+    """
+    Bump the items version once the transaction commits, then call
+    `on_commit` with the new version.
+    """
+
+    def after_commit():
+        version = _bump_version(ITEMS_VERSION_KEY)
+        if on_commit is not None:
+            on_commit(version)
+
+    transaction.on_commit(after_commit)
@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "manzapi.settings")
 
 application = get_asgi_application()
+
+# Each worker builds its item search index before serving its first request.
+from django.db import connections  # noqa: E402
+from manz.search import item_index  # noqa: E402
+
+item_index.warm_up()
+connections.close_all()
@@ -10,9 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+from importlib.util import find_spec
 from pathlib import Path
 import environ
 import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -53,8 +57,11 @@ CORS_ALLOW_HEADERS = [
     "accept",
     "origin",
     "user-agent",
+    "if-none-match",
 ]
 
+CORS_EXPOSE_HEADERS = ["etag", "server-timing"]
+
 
 # Application definition
 
@@ -72,6 +79,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "manz.middleware.InstrumentationMiddleware",
+    "manz.middleware.CompressionMiddleware",
+    "manz.middleware.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -117,12 +127,150 @@ DATABASES = {
     #    }
 }
 
+# Seconds a connection stays open to serve the next requests of its thread
+# (0 closes it after each request), and whether it is checked before being
+# reused. ASGI workers run sync code in threads that come and go: keep 0
+# there and use the pool below instead.
+DATABASES["default"]["CONN_MAX_AGE"] = env.int(
+    "DATABASE_CONN_MAX_AGE", default=DATABASES["default"].get("CONN_MAX_AGE", 0)
+)
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = env.bool(
+    "DATABASE_CONN_HEALTH_CHECKS", default=True
+)
+
+# Connection pool of the PostgreSQL backend, shared by every thread of a
+# worker. It needs psycopg 3 and psycopg_pool, and replaces persistent
+# connections: a request takes a connection from the pool and gives it back.
+if env.bool("DATABASE_POOL", default=False):
+    if DATABASES["default"]["ENGINE"] != "django.db.backends.postgresql":
+        raise ImproperlyConfigured("DATABASE_POOL requires a PostgreSQL database.")
+    if find_spec("psycopg") is None or find_spec("psycopg_pool") is None:
+        raise ImproperlyConfigured(
+            "DATABASE_POOL requires the psycopg and psycopg_pool packages, "
+            "install them with `poetry install --extras pool`."
+        )
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": env.int("DATABASE_POOL_MIN_SIZE", default=2),
+        "max_size": env.int("DATABASE_POOL_MAX_SIZE", default=10),
+        # Seconds a request waits for a free connection before failing.
+        "timeout": env.float("DATABASE_POOL_TIMEOUT", default=10),
+        # Seconds before an idle connection above min_size is closed, and
+        # before any connection is replaced.
+        "max_idle": env.float("DATABASE_POOL_MAX_IDLE", default=600),
+        "max_lifetime": env.float("DATABASE_POOL_MAX_LIFETIME", default=3600),
+    }
+
+# Read replicas of the default database, receiving the reads of GET
+# requests, see manz.routers. A user who wrote reads from the primary for
+# MANZ_REPLICA_PIN_SECONDS, which should exceed the replication lag.
+DATABASE_REPLICA_URLS = env.list("DATABASE_REPLICA_URLS", default=[])
+MANZ_REPLICA_DATABASES = []
+for index, url in enumerate(DATABASE_REPLICA_URLS):
+    alias = f"replica{index}"
+    DATABASES[alias] = env.db_url_config(url)
+    for name in ("CONN_MAX_AGE", "CONN_HEALTH_CHECKS"):
+        DATABASES[alias][name] = DATABASES["default"][name]
+    if "pool" in DATABASES["default"].get("OPTIONS", {}):
+        DATABASES[alias].setdefault("OPTIONS", {})["pool"] = dict(
+            DATABASES["default"]["OPTIONS"]["pool"]
+        )
+    # Tests read the replicas' data from the test database.
+    DATABASES[alias]["TEST"] = {"MIRROR": "default"}
+    MANZ_REPLICA_DATABASES.append(alias)
+if not DATABASE_REPLICA_URLS and sys.argv[1:2] == ["test"]:
+    # A second connection to the test database, for the router's tests: only
+    # used where they override MANZ_REPLICA_DATABASES.
+    DATABASES["replica0"] = dict(DATABASES["default"], TEST={"MIRROR": "default"})
+MANZ_REPLICA_PIN_SECONDS = env.int("MANZ_REPLICA_PIN_SECONDS", default=5)
+
+DATABASE_ROUTERS = ["manz.routers.ReplicaRouter"]
+
+# Token invalidation, the versions behind cached shopping lists and ETags,
+# and the read-your-writes pins of the replicas live in this cache: every
+# process serving the API or running jobs must share it. The default, a
+# cache per process, only suits a single process such as runserver.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://"),
+}
+MANZ_SHARED_CACHE = CACHES["default"]["BACKEND"] not in (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+# Number of worker processes, read by gunicorn and uvicorn too.
+WEB_CONCURRENCY = env.int("WEB_CONCURRENCY", default=1)
+if not MANZ_SHARED_CACHE and (MANZ_REPLICA_DATABASES or WEB_CONCURRENCY > 1):
+    raise ImproperlyConfigured(
+        "Several workers or DATABASE_REPLICA_URLS require a CACHE_URL shared "
+        "by every process, e.g. redis://127.0.0.1:6379/1."
+    )
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "manz.authentication.CachedTokenAuthentication",
+    ],
+    # orjson when installed, see manz.renderers.
+    "DEFAULT_RENDERER_CLASSES": [
+        "manz.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "manz.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
     ],
 }
 
+# Seconds a token and its user stay cached by CachedTokenAuthentication.
+MANZ_TOKEN_CACHE_TTL = env.int("MANZ_TOKEN_CACHE_TTL", default=300)
+
+# Seconds a computed shopping list stays cached, and whether the lists a user
+# requested last are recomputed right after each of their writes.
+MANZ_SHOPPING_LIST_CACHE_TTL = env.int("MANZ_SHOPPING_LIST_CACHE_TTL", default=3600)
+MANZ_SHOPPING_LIST_EAGER_REBUILD = env.bool(
+    "MANZ_SHOPPING_LIST_EAGER_REBUILD", default=False
+)
+
+# Cursor pagination of the list endpoints, used when a client sends
+# `cursor` or `page_size`.
+MANZ_PAGE_SIZE = env.int("MANZ_PAGE_SIZE", default=50)
+MANZ_MAX_PAGE_SIZE = env.int("MANZ_MAX_PAGE_SIZE", default=200)
+
+# Largest number of recipes accepted by one call to the recipe import API.
+MANZ_IMPORT_MAX_RECIPES = env.int("MANZ_IMPORT_MAX_RECIPES", default=1000)
+
+# Largest number of meals scheduled by one call to the schedule API, as a
+# list or as a recurrence.
+MANZ_MAX_MEALS_PER_REQUEST = env.int("MANZ_MAX_MEALS_PER_REQUEST", default=366)
+
+# Longest window of the dashboard, in days: the home page shows a week, with
+# room for a daylight saving time change.
+MANZ_DASHBOARD_MAX_DAYS = env.int("MANZ_DASHBOARD_MAX_DAYS", default=14)
+
+# Largest number of occurrences of recurring meals expanded by one read of the
+# schedule, calendar, dashboard, shopping list or meals export. Paginated
+# schedules only expand one page at a time.
+MANZ_MAX_OCCURRENCES_PER_REQUEST = env.int(
+    "MANZ_MAX_OCCURRENCES_PER_REQUEST", default=5000
+)
+
+# Seconds after which a background job still running is considered lost with
+# its worker and queued again, see manz.jobs.
+MANZ_JOB_TIMEOUT = env.int("MANZ_JOB_TIMEOUT", default=3600)
+
+# Whether responses carry a Server-Timing header with their database,
+# serialize, render and total time, see manz.middleware.InstrumentationMiddleware.
+# Off by default: it shows every client the internals of the server.
+MANZ_SERVER_TIMING = env.bool("MANZ_SERVER_TIMING", default=False)
+
+# Secret the Prometheus scraper sends as `Authorization: Bearer <token>` to
+# read /metrics, which staff users can also read with their API token.
+MANZ_METRICS_TOKEN = env.str("MANZ_METRICS_TOKEN", default="")
+
+# Smallest response body compressed by manz.middleware.CompressionMiddleware,
+# in bytes. Streamed exports are always compressed.
+MANZ_COMPRESSION_MIN_SIZE = env.int("MANZ_COMPRESSION_MIN_SIZE", default=1024)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
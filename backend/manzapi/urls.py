@@ -16,9 +16,10 @@ Including another URLconf
 """
 
 from django.urls import path, include
-from manz import views
+from manz import async_views, views
 
 urlpatterns = [
     path("api/", include("manz.urls")),
-    path("health/", views.health_check, name="health_check"),
+    path("health/", async_views.health_check, name="health_check"),
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
 ]
@@ -4,7 +4,6 @@ import { useState, useEffect } from 'react'
 import { useRouter } from 'next/navigation'
 
 interface Item {
-    recipe_title: string;
     item_name: string;
     quantity: number;
     quantity_type: string;
@@ -56,7 +55,6 @@ export default function ShoppingList() {
                         <p>
                             <span className="font-semibold">{item.item_name}</span> - {item.quantity} {item.quantity_type}
                         </p>
-                        <p className="text-sm text-gray-500">Recipe: {item.recipe_title}</p>
                     </li>
                 ))}
             </ul>